@@ -1,2 +1,4 @@
 from client.client_side import ClientSide
-from client.client_credentials import Credentials
\ No newline at end of file
+from client.client_credentials import Credentials
+from client.strategy_runner import Strategy, StrategyRunner
+from client.sync_client import SyncClient
@@ -2,20 +2,117 @@ import asyncio
 import aiohttp
 import websockets
 import json
-from typing import Optional, Dict, Any, Callable
+import random
+import re
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Iterable, AsyncIterator, List, Hashable, Set
 from client.client_credentials import Credentials
+from client.response_cache import ResponseCache
+
+# Durée des unités d'intervalle des klines, en secondes
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_INTERVAL_PATTERN = re.compile(r"^\s*(\d+)\s*(s|m|min|h|d|w)\s*$")
+
+
+def interval_to_nanoseconds(interval: str) -> int:
+    """'15m' -> 900 * 10^9 ; ValueError pour une notation inconnue"""
+    match = _INTERVAL_PATTERN.match(interval)
+    if not match:
+        raise ValueError(f"Intervalle inconnu : {interval}")
+    value, unit = match.groups()
+    return int(value) * INTERVAL_UNITS["m" if unit == "min" else unit] * 1_000_000_000
+
+
+def normalize_interval(interval: str) -> str:
+    """Notation des messages du serveur : '60m' -> '1h', '1440m' -> '1d' (inchangée si inconnue, ex: '1M')"""
+    try:
+        seconds = interval_to_nanoseconds(interval) // 1_000_000_000
+    except ValueError:
+        return interval
+    for unit in ("w", "d", "h", "m"):
+        if seconds >= INTERVAL_UNITS[unit] and seconds % INTERVAL_UNITS[unit] == 0:
+            return f"{seconds // INTERVAL_UNITS[unit]}{unit}"
+    return f"{seconds}s"
+
+
+class StreamQueue:
+    """
+    File bornée d'un consommateur : quand elle est pleine, l'évènement le plus
+    ancien est perdu. Avec maxsize=1 seule la dernière valeur est gardée (conflation).
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self.items = deque(maxlen=maxsize)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        # Temps passé dans la file par le dernier évènement lu (secondes)
+        self.last_wait = 0.0
+
+    def put(self, item):
+        if len(self.items) == self.items.maxlen:
+            self.dropped += 1
+        self.items.append((time.perf_counter(), item))
+        self.ready.set()
+
+    async def get(self):
+        while not self.items:
+            self.ready.clear()
+            await self.ready.wait()
+        queued_at, item = self.items.popleft()
+        self.last_wait = time.perf_counter() - queued_at
+        return item
+
 
 class ClientSide:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(self, base_url: str = "http://localhost:8000", cache: bool = False, cache_ttls: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            base_url: URL du serveur
+            cache: Active le cache des réponses (exchanges, paires, klines), voir ResponseCache
+            cache_ttls: Durée de validité par endpoint ("exchanges", "pairs", "klines"), en secondes
+        """
         self.base_url = base_url
         self.ws_url = f"ws://{base_url.split('://')[-1]}/ws"
         self.token: Optional[str] = None
         self.session: Optional[aiohttp.ClientSession] = None
+        self.credentials: Optional[Credentials] = None
         self.ws: Optional[websockets.WebSocketClientProtocol] = None
         self.ws_connected: bool = False
-        self.keep_ws: Optional[asyncio.Task] = None
+
+        # Session WebSocket : reconnexion avec backoff exponentiel (secondes)
+        self.reconnect_delay = 0.5
+        self.max_reconnect_delay = 30.0
+        # Au-delà de ce délai sans message, un évènement {"type": "stale"} est émis
+        self.stale_after = 5.0
+        self.ws_task: Optional[asyncio.Task] = None
+        self.ws_ready: Optional[asyncio.Event] = None
+        self._ws_lock = asyncio.Lock()
+        self.last_message_at: Optional[float] = None
+        self.reconnections = 0
+
+        # Abonnements rejoués à chaque reconnexion
         self.subscribed_symbols = set()
-        
+        self.kline_subscriptions = set()  # (exchange, symbole, intervalle)
+        self.portfolio_subscribed = False
+        self.orders_subscribed = False
+        self.ticker_subscriptions = set()
+
+        # Files des consommateurs par clé : ("order_book", symbole), ("kline", exchange, symbole, intervalle),
+        # ("ticker", symbole), ("portfolio",), ("order",), ou None pour tous les évènements (stream)
+        self.stream_queues: Dict[Optional[Hashable], Set[StreamQueue]] = {}
+        # Dernières valeurs reçues, lisibles sans attendre
+        self.order_books: Dict[str, Dict[str, Any]] = {}
+        self.latest_klines: Dict[tuple, Dict[str, Any]] = {}
+        self.latest_tickers: Dict[str, Dict[str, Any]] = {}
+        self.portfolio: Optional[Dict[str, Any]] = None
+        self.orders: Dict[str, Dict[str, Any]] = {}  # statut des ordres suivis, par order_id
+
+        # Cache des réponses REST (opt-in). Les valeurs renvoyées sont partagées : ne pas les modifier.
+        self.cache: Optional[ResponseCache] = ResponseCache(cache_ttls) if cache else None
+        # Nombre maximal de bougies gardées par série dans le cache
+        self.max_cached_klines = 5000
+
     async def __aenter__(self):
         """Permet l'utilisation du client"""
         self.session = aiohttp.ClientSession()
@@ -23,27 +120,91 @@ class ClientSide:
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Ferme la session HTTP"""
+        await self.close_websocket()
         if self.session:
             await self.session.close()
-        if self.ws:
-            await self.ws.close()
     
     async def _ensure_connexion(self):
         """S'assure qu'une session HTTP est active."""
         if self.session is None:
             self.session = aiohttp.ClientSession()
 
-    async def _keep_ws_connexion(self):
-        """Maintien la connexion avec WebSocket"""
-        try:
-            while True:
-                if self.ws and not self.ws_connected:
-                    await self.ws.ping()
-                await asyncio.sleep(20)  # Ping toutes les 20 secondes
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            print(f"Problème dans le ping vers WS : {e}")
+    async def _fetch(self, path: str, params: Dict[str, Any] = None, binary: bool = False, etag: Optional[str] = None):
+        """GET, renvoie (valeur, etag) ; valeur None si le serveur répond 304 (version inchangée)"""
+        headers = {"If-None-Match": etag} if etag else None
+        async with self.session.get(f"{self.base_url}{path}", params=params, headers=headers) as response:
+            if response.status == 304:
+                return None, etag
+            response.raise_for_status()
+            value = await response.read() if binary else await response.json()
+            return value, response.headers.get("ETag")
+
+    async def _get(self, path: str, endpoint: str, params: Dict[str, Any] = None, binary: bool = False):
+        """GET servi par le cache client s'il est activé (TTL, revalidation ETag, requêtes fusionnées)"""
+        await self._ensure_connexion()
+        if self.cache is None:
+            return (await self._fetch(path, params, binary))[0]
+
+        key = (path, tuple(sorted((params or {}).items())))
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            self.cache.hits += 1
+            return entry.value
+
+        async def revalidate():
+            value, etag = await self._fetch(path, params, binary, entry.etag if entry is not None else None)
+            if value is None:
+                self.cache.revalidated += 1
+                value = entry.value
+            else:
+                self.cache.misses += 1
+            self.cache.store(key, endpoint, value, etag)
+            return value
+
+        return await self.cache.coalesce(key, revalidate)
+
+    async def _get_klines_incremental(self, exchange: str, symbol: str, interval: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Klines servies depuis la série en cache : seules les bougies postérieures à la
+        dernière connue (qui était peut-être en cours) sont demandées au serveur.
+        """
+        key = ("klines", exchange.lower(), symbol.upper(), interval)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh and len(entry.value) >= limit:
+            self.cache.hits += 1
+            return entry.value[-limit:]
+
+        async def refresh():
+            cached = entry.value if entry is not None and len(entry.value) >= limit else None
+            to_fetch = limit
+            if cached:
+                try:
+                    interval_ns = interval_to_nanoseconds(interval)
+                    elapsed = time.time_ns() - cached[-1]["timestamp"]
+                    to_fetch = int(min(limit, max(elapsed, 0) // interval_ns + 1))
+                except ValueError:
+                    cached = None
+            fresh, _ = await self._fetch(f"/klines/{exchange}/{symbol}", {"interval": interval, "limit": to_fetch, "format": "json"})
+            if cached and fresh and fresh[0]["timestamp"] > cached[-1]["timestamp"] + interval_ns:
+                # Série en cache trop ancienne : les bougies reçues ne la prolongent pas, elle est remplacée
+                cached = None
+            if cached and fresh:
+                self.cache.revalidated += 1
+                first = fresh[0]["timestamp"]
+                series = cached[:]
+                while series and series[-1]["timestamp"] >= first:
+                    series.pop()
+                series.extend(fresh)
+            elif cached:
+                series = cached
+            else:
+                self.cache.misses += 1
+                series = fresh
+            series = series[-max(limit, self.max_cached_klines):]
+            self.cache.store(key, "klines", series)
+            return series[-limit:]
+
+        return await self.cache.coalesce((*key, limit), refresh)
 
     async def login(self, credentials: Credentials):
         """
@@ -65,16 +226,16 @@ class ClientSide:
             response.raise_for_status()
             data = await response.json()
             self.token = data["token"]
+            # Pour se ré-authentifier si le token n'est plus reconnu après une reconnexion
+            self.credentials = credentials
             return True
         
     async def ws_authenticate(self):
-        """Authentifie l'utilisateur sur WebSocket"""
+        """Authentifie l'utilisateur sur WebSocket (fait automatiquement à chaque reconnexion)"""
         if self.token is None:
             raise ValueError("Vous devez être authentifié pour vous connecter à WebSocket")
-        
-        
-        await self.ws.send(json.dumps({"action": "authenticate", "token": self.token}))
-                 
+        await self._ws_send({"action": "authenticate", "token": self.token})
+
     async def get_supported_exchanges(self):
         """
         Récupère la liste des exchanges supportés.
@@ -83,11 +244,7 @@ class ClientSide:
         Returns:
             List[str]: Liste des noms d'exchanges
         """
-        await self._ensure_connexion()
-
-        async with self.session.get(f"{self.base_url}/exchanges") as response:
-            response.raise_for_status()
-            return await response.json()
+        return await self._get("/exchanges", "exchanges")
             
     async def get_trading_pairs(self, exchange: str):
         """
@@ -99,13 +256,9 @@ class ClientSide:
         Returns:
             List[str]: Liste des paires de trading
         """
-        await self._ensure_connexion()
-
-        async with self.session.get(f"{self.base_url}/pairs/{exchange}") as response:
-            response.raise_for_status()
-            return await response.json()
+        return await self._get(f"/pairs/{exchange}", "pairs")
             
-    async def get_klines(self, exchange: str, symbol: str, interval: str = "1m", limit: int = 10):
+    async def get_klines(self, exchange: str, symbol: str, interval: str = "1m", limit: int = 10, format: str = "json", as_frame: bool = False):
         """
         Récupère les données klines pour une paire de trading.
         
@@ -114,16 +267,50 @@ class ClientSide:
             symbol: Symbole de la paire (ex: 'BTCUSDT')
             interval: Intervalle de temps (ex: '1m', '15m', '1h')
             limit: Nombre de klines à récupérer
+            format: Format de transfert ('json', 'columnar' ou 'arrow')
+            as_frame: Renvoie un DataFrame pandas construit directement depuis les colonnes
             
         Returns:
             List[Dict[str, Any]]: Liste des klines avec timestamp, open, high, low, close, volume
+            (Dict[str, list] en format 'columnar', pyarrow.Table en 'arrow', pd.DataFrame si as_frame)
+        """
+        if self.cache is not None and format == "json":
+            await self._ensure_connexion()
+            content = await self._get_klines_incremental(exchange, symbol, interval, limit)
+        else:
+            content = await self._get(f"/klines/{exchange}/{symbol}", "klines",
+                                      {"interval": interval, "limit": limit, "format": format}, binary=format == "arrow")
+
+        if format == "arrow":
+            import pyarrow as pa
+            table = pa.ipc.open_stream(content).read_all()
+            # split_blocks : chaque colonne numérique reste une vue sur le buffer Arrow, sans copie
+            return table.to_pandas(split_blocks=True) if as_frame else table
+
+        if as_frame:
+            import pandas as pd
+            return pd.DataFrame(content)
+        return content
+        
+    async def get_klines_many(self, requests: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Récupère les klines de plusieurs paires en une seule requête (POST /klines/batch).
+        Les résultats sont produits au fur et à mesure qu'ils arrivent du serveur.
+        
+        Args:
+            requests: Requêtes {"exchange", "symbol", "interval", "limit"} (interval et limit optionnels)
+            
+        Yields:
+            Dict[str, Any]: {"index", "exchange", "symbol", "interval", "klines"} ou {..., "error", "status_code"}
         """
         await self._ensure_connexion()
 
-        async with self.session.get(f"{self.base_url}/klines/{exchange}/{symbol}",
-                                    params={"interval": interval, "limit": limit}) as response:
+        async with self.session.post(f"{self.base_url}/klines/batch",
+                                     json={"requests": list(requests)}) as response:
             response.raise_for_status()
-            return await response.json()
+            async for line in response.content:
+                if line.strip():
+                    yield json.loads(line)
         
     async def create_twap_order(self, exchange: str, symbol: str, side: str, quantity: float, slices: int, duration_seconds: int, limit_price: Optional[float] = None):
         """
@@ -162,9 +349,37 @@ class ClientSide:
             data = await response.json()
             return data['order_id']
 
+    async def create_order(self, exchange: str, symbol: str, side: str, quantity: float, algorithm: str = "twap", **parameters) -> str:
+        """
+        Crée un ordre exécuté par un algorithme du serveur
+
+        Args:
+            exchange: Nom de l'exchange (ex: 'binance', 'kraken')
+            symbol: Symbole de la paire (ex: 'BTCUSDT')
+            side: Type d'ordre ('buy' ou 'sell')
+            quantity: Quantité totale à acheter/vendre
+            algorithm: 'twap', 'vwap' (slices, duration_seconds), 'pov' (participation_rate)
+                ou 'iceberg' (display_quantity, limit_price)
+            parameters: Paramètres de l'algorithme, et limit_price optionnel
+
+        Returns:
+            id de l'ordre crée
+        """
+        await self._ensure_connexion()
+
+        if self.token is None:
+            raise ValueError("Vous devez être authentifié pour créer un ordre")
+
+        order = {"exchange": exchange, "symbol": symbol, "side": side, "quantity": quantity,
+                 "algorithm": algorithm, **parameters}
+        async with self.session.post(f"{self.base_url}/orders", params={"token": self.token}, json=order) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data['order_id']
+
     async def get_order_status(self, order_id: str) -> Dict[str, Any]:
         """
-        Récupère le statut d'un ordre TWAP via son id
+        Récupère le statut d'un ordre via son id
 
         Args:
             order_id: ID de l'ordre
@@ -177,43 +392,399 @@ class ClientSide:
         async with self.session.get(f"{self.base_url}/orders/{order_id}", params={"token": self.token}) as response:
             response.raise_for_status()
             return await response.json()
+
+    async def get_portfolio(self) -> Dict[str, Any]:
+        """
+        Récupère le portefeuille fictif de l'utilisateur
+
+        Returns:
+            Dict : positions (quantité, prix moyen, mid, PnL réalisé et latent), cash et PnL total
+        """
+        await self._ensure_connexion()
+
+        async with self.session.get(f"{self.base_url}/portfolio", params={"token": self.token}) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def list_orders(self, status: Optional[str] = None, symbol: Optional[str] = None, limit: int = 50) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parcourt les ordres de l'utilisateur, du plus récent au plus ancien (les pages sont chargées au fur et à mesure)
+
+        Args:
+            status: Filtre sur le statut ('active', 'completed', 'cancelled', 'error')
+            symbol: Filtre sur le symbole
+            limit: Taille des pages
+        """
+        await self._ensure_connexion()
+
+        params = {"token": self.token, "limit": limit}
+        if status is not None:
+            params["status"] = status
+        if symbol is not None:
+            params["symbol"] = symbol
+
+        while True:
+            async with self.session.get(f"{self.base_url}/orders", params=params) as response:
+                response.raise_for_status()
+                page = await response.json()
+            for order in page["orders"]:
+                yield order
+            if page["next_cursor"] is None:
+                return
+            params["cursor"] = page["next_cursor"]
+
+    async def create_twap_orders(self, orders: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Crée plusieurs ordres en une requête
+
+        Args:
+            orders: Paramètres de chaque ordre (mêmes clés que create_order, algorithme twap par défaut)
+
+        Returns:
+            Liste de résultats, dans l'ordre : {"order_id", "status": "accepted"} ou {"status": "rejected", "error"}
+        """
+        await self._ensure_connexion()
+
+        if self.token is None:
+            raise ValueError("Vous devez être authentifié pour créer un ordre")
+
+        async with self.session.post(f"{self.base_url}/orders/batch", params={"token": self.token},
+                                     json={"orders": list(orders)}) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def cancel_order(self, order_id: str) -> Dict[str, Any]:
+        """
+        Annule un ordre en cours
+
+        Args:
+            order_id: ID de l'ordre
+
+        Returns:
+            Dict : Statut de l'ordre annulé
+        """
+        await self._ensure_connexion()
+
+        async with self.session.delete(f"{self.base_url}/orders/{order_id}", params={"token": self.token}) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def amend_order(self, order_id: str, limit_price: Optional[float] = None, remaining_duration_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Modifie un ordre en cours
+
+        Args:
+            order_id: ID de l'ordre
+            limit_price: Nouveau prix limite
+            remaining_duration_seconds: Nouvelle durée restante, répartie sur les tranches restantes
+
+        Returns:
+            Dict : Statut de l'ordre modifié
+        """
+        await self._ensure_connexion()
+
+        params = {"token": self.token}
+        if limit_price is not None:
+            params["limit_price"] = limit_price
+        if remaining_duration_seconds is not None:
+            params["remaining_duration_seconds"] = remaining_duration_seconds
+
+        async with self.session.patch(f"{self.base_url}/orders/{order_id}", params=params) as response:
+            response.raise_for_status()
+            return await response.json()
         
-    async def connect_websocket(self):
-        """Établit une connexion WebSocket et la maintien ouverte"""
-        self.ws = await websockets.connect(self.ws_url)
-        self.ws_connected = True
-        print("Connexion WebSocket établie")
-        
-        if self.keep_ws is None and self.ws_connected:
-            print("Lancement du ping WS")
-            self.keep_ws = asyncio.create_task(self._keep_ws_connexion())
+    async def connect_websocket(self, timeout: float = 10.0):
+        """
+        Démarre la session WebSocket et attend la première connexion.
+        La session se reconnecte seule (backoff exponentiel), se ré-authentifie et
+        rejoue les abonnements ; les changements d'état sont émis dans stream() :
+        {"type": "connection", "connected": ...} et {"type": "stale", "seconds": ...}
+        """
+        if self.ws_task is None or self.ws_task.done():
+            self.ws_ready = asyncio.Event()
+            self.ws_task = asyncio.create_task(self._run_websocket())
+        await asyncio.wait_for(self.ws_ready.wait(), timeout)
+
+    async def close_websocket(self):
+        """Arrête la session WebSocket"""
+        if self.ws_task is not None:
+            self.ws_task.cancel()
+            try:
+                await self.ws_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.ws_task = None
+        if self.ws is not None:
+            await self.ws.close()
+        self.ws_connected = False
+
+    async def _run_websocket(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=20, ping_timeout=20) as ws:
+                    self.ws = ws
+                    await self._resume_websocket(ws)
+                    if self.ws_ready.is_set():
+                        self.reconnections += 1
+                    self.ws_ready.set()
+                    self._push_event({"type": "connection", "connected": True})
+                    delay = self.reconnect_delay
+                    await self._receive_websocket(ws)
+                reason = "connexion fermée"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                reason = str(e) or type(e).__name__
+            self.ws_connected = False
+            # Jitter : les clients coupés en même temps ne se reconnectent pas tous ensemble
+            wait = delay * random.uniform(0.5, 1.0)
+            print(f"WebSocket déconnecté ({reason}), reconnexion dans {wait:.1f}s")
+            self._push_event({"type": "connection", "connected": False, "reason": reason, "retry_in": wait})
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _resume_websocket(self, ws):
+        """Authentification puis rejeu des abonnements, avant tout autre envoi"""
+        async with self._ws_lock:
+            if self.token is not None:
+                if not await self._authenticate_websocket(ws) and self.credentials is not None:
+                    # Token inconnu du serveur (redémarrage) : nouveau login
+                    if not await self.login(self.credentials) or not await self._authenticate_websocket(ws):
+                        raise PermissionError("Authentification WebSocket refusée")
+            for symbol in list(self.subscribed_symbols):
+                await ws.send(json.dumps({"action": "subscribe", "symbol": symbol}))
+            for exchange, symbol, interval in list(self.kline_subscriptions):
+                await ws.send(json.dumps({"action": "subscribe", "channel": "klines", "exchange": exchange, "symbol": symbol, "interval": interval}))
+            for symbol in list(self.ticker_subscriptions):
+                await ws.send(json.dumps({"action": "subscribe", "channel": "ticker", "symbol": symbol}))
+            if self.portfolio_subscribed:
+                await ws.send(json.dumps({"action": "subscribe", "channel": "portfolio"}))
+            if self.orders_subscribed:
+                await ws.send(json.dumps({"action": "subscribe", "channel": "orders"}))
+            self.ws_connected = True
+            self.last_message_at = time.monotonic()
+
+    async def _authenticate_websocket(self, ws) -> bool:
+        await ws.send(json.dumps({"action": "authenticate", "token": self.token}))
+        while True:
+            data = json.loads(await asyncio.wait_for(ws.recv(), 10))
+            if isinstance(data, dict) and ("authenticated" in data or "error" in data):
+                return bool(data.get("authenticated"))
+
+    async def _receive_websocket(self, ws):
+        while True:
+            try:
+                message = await asyncio.wait_for(ws.recv(), self.stale_after)
+            except asyncio.TimeoutError:
+                if self.subscribed_symbols or self.kline_subscriptions or self.ticker_subscriptions or self.portfolio_subscribed or self.orders_subscribed:
+                    self._push_event({"type": "stale", "seconds": self.staleness()})
+                continue
+            self.last_message_at = time.monotonic()
+            data = json.loads(message)
+            if isinstance(data, list):
+                for event in data:
+                    self._push_event(event)
+            else:
+                # Message de contrôle (authentification, erreur)
+                self._push_event({"type": "control", **data})
+
+    def _push_event(self, event: Dict[str, Any]):
+        """Met à jour le cache local et distribue l'évènement aux files de sa clé"""
+        kind = event.get("type")
+        if kind == "order_book":
+            key = ("order_book", event["symbol"])
+            self.order_books[event["symbol"]] = event
+        elif kind == "kline":
+            key = ("kline", event["exchange"], event["symbol"], event["interval"])
+            self.latest_klines[key[1:]] = event
+        elif kind == "ticker":
+            key = ("ticker", event["symbol"])
+            self.latest_tickers[event["symbol"]] = event
+        elif kind == "portfolio":
+            key = ("portfolio",)
+            self.portfolio = event
+        elif kind == "order":
+            key = ("order",)
+            self.orders[event["order_id"]] = event
+        else:
+            key = None
+        if key is not None:
+            for queue in self.stream_queues.get(key, ()):
+                queue.put(event)
+        for queue in self.stream_queues.get(None, ()):
+            queue.put(event)
+
+    def open_stream(self, key: Optional[Hashable], conflate: bool = False, maxsize: int = 1000) -> StreamQueue:
+        """File recevant les évènements de key (None : tous), à fermer avec close_stream"""
+        queue = StreamQueue(1 if conflate else maxsize)
+        self.stream_queues.setdefault(key, set()).add(queue)
+        return queue
+
+    def close_stream(self, key: Optional[Hashable], queue: StreamQueue):
+        self.stream_queues.get(key, set()).discard(queue)
+
+    async def _iterate(self, key: Optional[Hashable], conflate: bool, maxsize: int) -> AsyncIterator[Dict[str, Any]]:
+        queue = self.open_stream(key, conflate, maxsize)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.close_stream(key, queue)
+
+    def get_order_book(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Dernier carnet consolidé reçu pour symbol (None si aucun)"""
+        return self.order_books.get(symbol.upper())
+
+    def get_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Dernier ticker reçu pour symbol (None si aucun)"""
+        return self.latest_tickers.get(symbol.upper())
+
+    async def _ws_send(self, message: Dict[str, Any]):
+        """Envoie si connecté ; sinon le message sera rejoué à la reconnexion"""
+        async with self._ws_lock:
+            if self.ws_connected:
+                try:
+                    await self.ws.send(json.dumps(message))
+                except websockets.ConnectionClosed:
+                    pass
+
+    def staleness(self) -> Optional[float]:
+        """Secondes depuis le dernier message reçu (None si jamais connecté)"""
+        if self.last_message_at is None:
+            return None
+        return time.monotonic() - self.last_message_at
+
+    async def stream(self, maxsize: int = 10_000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Tous les évènements WebSocket (carnets, bougies, portefeuille, état de la connexion) :
+            async for event in client.stream(): ...
+        """
+        async for event in self._iterate(None, False, maxsize):
+            yield event
+
+    async def books(self, symbol: str, conflate: bool = True, maxsize: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Carnets consolidés d'un symbole (abonnement automatique) :
+            async for book in client.books("BTCUSDT"): ...
+        Avec conflate, un consommateur lent reçoit directement le dernier carnet.
+        """
+        symbol = symbol.upper()
+        if symbol not in self.subscribed_symbols:
+            await self.subscribe_symbol(symbol)
+        async for book in self._iterate(("order_book", symbol), conflate, maxsize):
+            yield book
+
+    async def tickers(self, symbol: str, conflate: bool = True, maxsize: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Tickers d'un symbole (abonnement automatique), sans les carnets :
+            async for ticker in client.tickers("BTCUSDT"): print(ticker["bid"], ticker["ask"])
+        """
+        symbol = symbol.upper()
+        if symbol not in self.ticker_subscriptions:
+            await self.subscribe_ticker(symbol)
+        async for ticker in self._iterate(("ticker", symbol), conflate, maxsize):
+            yield ticker
+
+    async def klines(self, exchange: str, symbol: str, interval: str = "1m", conflate: bool = False, maxsize: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Bougies d'un symbole (abonnement automatique), sans conflation par défaut pour ne perdre aucune clôture"""
+        # Clé écrite comme dans les messages du serveur
+        exchange, symbol, interval = exchange.lower(), symbol.upper(), normalize_interval(interval)
+        if (exchange, symbol, interval) not in self.kline_subscriptions:
+            await self.subscribe_klines(exchange, symbol, interval)
+        async for kline in self._iterate(("kline", exchange, symbol, interval), conflate, maxsize):
+            yield kline
+
+    def on_book(self, symbol: str, callback: Callable[[Dict[str, Any]], None], blocking: bool = False) -> asyncio.Task:
+        """
+        Appelle callback pour chaque carnet de symbol, dans sa propre tâche : un callback
+        lent ne retarde que son symbole (il reçoit alors le dernier carnet). Avec blocking,
+        le callback est exécuté dans un thread de l'executor. Annuler la tâche renvoyée
+        arrête les appels.
+        """
+        return asyncio.create_task(self._run_callback(self.books(symbol), callback, blocking))
+
+    @staticmethod
+    async def _run_callback(events: AsyncIterator[Dict[str, Any]], callback: Callable[[Dict[str, Any]], None], blocking: bool):
+        loop = asyncio.get_running_loop()
+        async for event in events:
+            try:
+                if blocking:
+                    await loop.run_in_executor(None, callback, event)
+                else:
+                    callback(event)
+            except Exception as e:
+                print("Error in callback", e)
 
     async def subscribe_symbol(self, symbol: str):
         """S'abonne aux mises à jour d'un symbole"""
-        await self.ws.send(json.dumps({"action": "subscribe","symbol": symbol}))
-        
+        self.subscribed_symbols.add(symbol)
+        await self._ws_send({"action": "subscribe", "symbol": symbol})
+
     async def unsubscribe_symbol(self, symbol: str):
         """Se désabonne des mises à jour d'un symbole"""
-        await self.ws.send(json.dumps({"action": "unsubscribe","symbol": symbol}))
+        self.subscribed_symbols.discard(symbol)
+        await self._ws_send({"action": "unsubscribe", "symbol": symbol})
 
-    async def listen_websocket_updates(self, callback: Callable[[Dict[str, Any]], None]):
+    async def subscribe_klines(self, exchange: str, symbol: str, interval: str = "1m"):
         """
-        Mises à jour WebSocket pendant une durée spécifiée et applique le callback à chaque message
-        
+        S'abonne au flux de bougies d'un symbole : messages {"type": "kline", "closed": ..., "timestamp", "open", ...}
+        La bougie en cours est mise à jour au fil des trades, closed passe à True à sa clôture.
+        """
+        exchange, symbol, interval = exchange.lower(), symbol.upper(), normalize_interval(interval)
+        self.kline_subscriptions.add((exchange, symbol, interval))
+        await self._ws_send({"action": "subscribe", "channel": "klines", "exchange": exchange, "symbol": symbol, "interval": interval})
+
+    async def subscribe_ticker(self, symbol: str):
+        """
+        S'abonne au ticker d'un symbole : messages {"type": "ticker", "bid", "ask", "spread", "mid",
+        "arbitrage", "spread_ewma", "mid_volatility_bps", "imbalance", ...} à chaque changement de meilleur prix
+        """
+        symbol = symbol.upper()
+        self.ticker_subscriptions.add(symbol)
+        await self._ws_send({"action": "subscribe", "channel": "ticker", "symbol": symbol})
+
+    async def unsubscribe_ticker(self, symbol: str):
+        symbol = symbol.upper()
+        self.ticker_subscriptions.discard(symbol)
+        await self._ws_send({"action": "unsubscribe", "channel": "ticker", "symbol": symbol})
+
+    async def subscribe_portfolio(self):
+        """S'abonne au portefeuille : messages {"type": "portfolio", ...} à chaque exécution ou mouvement de prix"""
+        self.portfolio_subscribed = True
+        await self._ws_send({"action": "subscribe", "channel": "portfolio"})
+
+    async def subscribe_orders(self):
+        """
+        S'abonne aux ordres de l'utilisateur : messages {"type": "order", "order_id", "status", ...}
+        pour chaque ordre actif, puis à chaque exécution ou changement (au plus un par ordre et par seconde)
+        """
+        self.orders_subscribed = True
+        await self._ws_send({"action": "subscribe", "channel": "orders"})
+
+    async def unsubscribe_orders(self):
+        self.orders_subscribed = False
+        await self._ws_send({"action": "unsubscribe", "channel": "orders"})
+
+    async def order_updates(self, maxsize: int = 10_000) -> AsyncIterator[Dict[str, Any]]:
+        """Statuts poussés des ordres de l'utilisateur (abonnement automatique)"""
+        if not self.orders_subscribed:
+            await self.subscribe_orders()
+        async for order in self._iterate(("order",), False, maxsize):
+            yield order
+
+    async def unsubscribe_klines(self, exchange: str, symbol: str, interval: str = "1m"):
+        """Se désabonne du flux de bougies"""
+        exchange, symbol, interval = exchange.lower(), symbol.upper(), normalize_interval(interval)
+        self.kline_subscriptions.discard((exchange, symbol, interval))
+        await self._ws_send({"action": "unsubscribe", "channel": "klines", "exchange": exchange, "symbol": symbol, "interval": interval})
+
+    async def listen_websocket_updates(self, callback: Callable[[Dict[str, Any]], None], blocking: bool = False):
+        """
+        Applique le callback à chaque évènement WebSocket, reconnexions comprises
+
         Args:
             callback: Fonction à appeler pour chaque message reçu
-            duration_seconds: Durée d'écoute en secondes
+            blocking: Exécute le callback dans un thread de l'executor (callback lent ou bloquant)
         """
-
-        try:
-            while True: 
-                message = await self.ws.recv()
-                data = json.loads(message)
-                for event in data:
-                    try:
-                        callback(event)
-                    except Exception as e:
-                        print("Error in callback", e)
-        except Exception as e:
-            print(f"Erreur lors de l'écoute WebSocket: {e}")
-            
+        await self._run_callback(self.stream(), callback, blocking)
@@ -0,0 +1,22 @@
+import time
+from client.shm_book_reader import SharedMemoryBookReader
+
+# Exemple : lecture des carnets en mémoire partagée, sur la même machine que le serveur
+# lancé avec SHM_BOOKS_NAME=cryptoapi_books (et un client abonné au symbole)
+def main():
+    with SharedMemoryBookReader("cryptoapi_books") as reader:
+        print(f"Carnets publiés: {reader.symbols()}")
+
+        version = 0
+        for _ in range(20):
+            version = reader.wait_for_update("binance", "BTCUSDT", version)
+            print(f"  v{version} Binance BTCUSDT (bid, ask): {reader.top_of_book('binance', 'BTCUSDT')}")
+
+        start = time.perf_counter()
+        book = reader.consolidated_book("BTCUSDT")
+        print(f"Carnet consolidé lu en {(time.perf_counter() - start) * 1e6:.1f} µs")
+        print(f"  Meilleur bid: {book['bids'][:1]}, meilleur ask: {book['asks'][:1]}")
+
+if __name__ == "__main__":
+    print("Lecture des carnets en mémoire partagée:\n")
+    main()
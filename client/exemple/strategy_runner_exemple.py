@@ -0,0 +1,58 @@
+import asyncio
+from client.client_credentials import Credentials
+from client.client_side import ClientSide
+from client.strategy_runner import Strategy, StrategyRunner
+
+
+class SpreadWatcher(Strategy):
+    """Affiche le spread consolidé d'un symbole"""
+
+    def __init__(self, symbol: str):
+        super().__init__(name=f"spread_{symbol}")
+        self.symbols = [symbol]
+
+    def on_book(self, book):
+        if book["bids"] and book["asks"]:
+            print(f"{book['symbol']} spread: {book['asks'][0][0] - book['bids'][0][0]:.4f}")
+
+
+class MidCross(Strategy):
+    """Achète par TWAP quand le mid passe au-dessus de sa moyenne des 20 derniers carnets"""
+
+    symbols = ["BTCUSDT"]
+
+    def __init__(self):
+        super().__init__()
+        self.mids = []
+        self.ordered = False
+
+    async def on_book(self, book):
+        if not book["bids"] or not book["asks"]:
+            return
+        mid = (book["bids"][0][0] + book["asks"][0][0]) / 2
+        self.mids = (self.mids + [mid])[-20:]
+        if not self.ordered and len(self.mids) == 20 and mid > sum(self.mids) / 20:
+            self.ordered = True
+            order_id = await self.client.create_order("binance", "BTCUSDT", "buy", 0.01, slices=5, duration_seconds=60)
+            print(f"Ordre TWAP créé avec ID: {order_id}")
+
+
+# Exemple
+async def main():
+    # Un seul client (session HTTP et WebSocket) pour toutes les stratégies
+    async with ClientSide() as client:
+        if not await client.login(Credentials(username="Tristan", password="Tristan")):
+            print("Erreur login")
+            return
+
+        runner = StrategyRunner(client)
+        for symbol in ["BTCUSDT", "ETHUSDT", "SOLUSDT"]:
+            runner.add(SpreadWatcher(symbol))
+        runner.add(MidCross())
+
+        await runner.run(duration_seconds=60)
+        for name, stats in runner.get_stats().items():
+            print(name, stats)
+
+if __name__ == "__main__":
+    asyncio.run(main())
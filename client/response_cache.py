@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+# Durée de validité par défaut des réponses, par endpoint (secondes)
+DEFAULT_TTLS = {
+    "exchanges": 3600.0,
+    "pairs": 300.0,
+    "klines": 5.0,
+}
+
+
+class CacheEntry:
+    def __init__(self, value: Any, etag: Optional[str], ttl: float):
+        self.value = value
+        self.etag = etag
+        self.expires_at = time.monotonic() + ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class ResponseCache:
+    """
+    Cache des réponses du serveur côté client.
+
+    - une réponse est resservie sans requête pendant le TTL de son endpoint
+    - passé le TTL, elle est revalidée avec If-None-Match : un 304 la prolonge
+      sans retransférer le corps
+    - les requêtes identiques en cours sont fusionnées (un seul appel réseau)
+    """
+
+    def __init__(self, ttls: Dict[str, float] = None):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.entries: Dict[Hashable, CacheEntry] = {}
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+
+        # Compteurs
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, 0.0)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        return self.entries.get(key)
+
+    def store(self, key: Hashable, endpoint: str, value: Any, etag: Optional[str] = None) -> CacheEntry:
+        entry = self.entries[key] = CacheEntry(value, etag, self.ttl(endpoint))
+        return entry
+
+    async def coalesce(self, key: Hashable, request: Callable[[], Awaitable[Any]]):
+        """Une seule requête en cours par clé, les autres appelants attendent son résultat"""
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(request())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self.in_flight.pop(key) if self.in_flight.get(key) is done else None)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,150 @@
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, Optional, Tuple
+import time
+import numpy as np
+
+
+def _book_dtypes(depth: int, ring: int):
+    """Même layout que server/services/shm_books.py"""
+    header = np.dtype([
+        ("magic", "S8"), ("version", "<u4"), ("n_slots", "<u4"),
+        ("depth", "<u4"), ("ring", "<u4"), ("reserved", "V40"),
+    ])
+    directory = np.dtype([("exchange", "S16"), ("symbol", "S16")])
+    entry = np.dtype([
+        ("timestamp", "<f8"), ("n_bids", "<u4"), ("n_asks", "<u4"),
+        ("bids", "<f8", (depth, 2)), ("asks", "<f8", (depth, 2)),
+    ])
+    slot = np.dtype([("seq", "<u8"), ("entries", entry, (ring,))])
+    return header, directory, slot
+
+
+class SharedMemoryBookReader:
+    """
+    Lecteur des carnets publiés en mémoire partagée par le serveur
+    (lancé avec SHM_BOOKS_NAME), pour les stratégies tournant sur la même machine.
+
+    Les tableaux sont des vues NumPy directement sur le segment : aucune
+    désérialisation. La lecture suit le protocole seqlock du serveur et ne
+    renvoie jamais un carnet en cours d'écriture.
+
+    Exemple:
+        reader = SharedMemoryBookReader("cryptoapi_books")
+        bid, ask = reader.top_of_book("binance", "BTCUSDT")
+    """
+
+    def __init__(self, name: str, max_retries: int = 100):
+        self.name = name
+        self.max_retries = max_retries
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Le segment appartient au serveur : on évite que le resource tracker le supprime à la sortie
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        header = np.ndarray((1,), dtype=_book_dtypes(1, 1)[0], buffer=self.shm.buf)[0]
+        if header["magic"] != b"CRYPTOBK":
+            raise ValueError(f"Le segment {name} ne contient pas de carnets")
+        self.n_slots = int(header["n_slots"])
+        self.depth = int(header["depth"])
+        self.ring = int(header["ring"])
+
+        header_dtype, directory_dtype, slot_dtype = _book_dtypes(self.depth, self.ring)
+        offset = header_dtype.itemsize
+        self.directory = np.ndarray((self.n_slots,), dtype=directory_dtype, buffer=self.shm.buf, offset=offset)
+        offset += self.n_slots * directory_dtype.itemsize
+        self.slots = np.ndarray((self.n_slots,), dtype=slot_dtype, buffer=self.shm.buf, offset=offset)
+        self.seq = self.slots["seq"]
+        self._index: Dict[Tuple[str, str], int] = {}
+
+    def close(self):
+        self.directory = self.slots = self.seq = None
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def symbols(self):
+        """Liste des (exchange, symbole) publiés"""
+        return [
+            (exchange.decode(), symbol.decode())
+            for exchange, symbol in self.directory.tolist()
+            if symbol
+        ]
+
+    def _slot(self, exchange: str, symbol: str) -> Optional[int]:
+        key = (exchange.lower(), symbol.upper())
+        index = self._index.get(key)
+        if index is None:
+            matches = np.nonzero(
+                (self.directory["exchange"] == key[0].encode()) & (self.directory["symbol"] == key[1].encode())
+            )[0]
+            if len(matches) == 0:
+                return None
+            index = self._index[key] = int(matches[0])
+        return index
+
+    def _read(self, index: int, reader):
+        """Applique reader(entry) sur le dernier carnet publié, en respectant le seqlock"""
+        for _ in range(self.max_retries):
+            start = int(self.seq[index])
+            if start < 2:
+                return None  # rien de publié pour l'instant
+            entry = self.slots[index]["entries"][(start // 2 - 1) % self.ring]
+            result = reader(entry)
+            # Valide tant que l'écrivain n'a pas refait le tour de l'anneau
+            if int(self.seq[index]) - start < 2 * (self.ring - 1):
+                return result
+        raise TimeoutError(f"Lecture impossible du slot {index} (écritures trop rapides)")
+
+    def version(self, exchange: str, symbol: str) -> int:
+        """Nombre de carnets publiés pour ce symbole, pour détecter un changement sans lire"""
+        index = self._slot(exchange, symbol)
+        return 0 if index is None else int(self.seq[index]) // 2
+
+    def top_of_book(self, exchange: str, symbol: str) -> Optional[Tuple[float, float]]:
+        """(meilleur bid, meilleur ask) sans aucune copie de tableau"""
+        index = self._slot(exchange, symbol)
+        if index is None:
+            return None
+        return self._read(index, lambda entry: (
+            float(entry["bids"][0, 0]) if entry["n_bids"] else None,
+            float(entry["asks"][0, 0]) if entry["n_asks"] else None,
+        ))
+
+    def order_book(self, exchange: str, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """Carnet complet : bids et asks en tableaux (n, 2) [prix, quantité]"""
+        index = self._slot(exchange, symbol)
+        if index is None:
+            return None
+        return self._read(index, lambda entry: {
+            "timestamp": float(entry["timestamp"]),
+            "bids": entry["bids"][:entry["n_bids"]].copy(),
+            "asks": entry["asks"][:entry["n_asks"]].copy(),
+        })
+
+    def consolidated_book(self, symbol: str) -> Dict[str, np.ndarray]:
+        """Carnet consolidé de tous les exchanges qui publient ce symbole"""
+        books = [
+            self.order_book(exchange, name)
+            for exchange, name in self.symbols()
+            if name == symbol.upper()
+        ]
+        books = [book for book in books if book is not None]
+        bids = np.concatenate([book["bids"] for book in books]) if books else np.empty((0, 2))
+        asks = np.concatenate([book["asks"] for book in books]) if books else np.empty((0, 2))
+        return {
+            "bids": bids[np.argsort(-bids[:, 0], kind="stable")],
+            "asks": asks[np.argsort(asks[:, 0], kind="stable")],
+        }
+
+    def wait_for_update(self, exchange: str, symbol: str, last_version: int, timeout: float = 1.0, poll_interval: float = 0.0005) -> int:
+        """Attend (en scrutant le compteur) qu'un nouveau carnet soit publié, renvoie la nouvelle version"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            version = self.version(exchange, symbol)
+            if version != last_version:
+                return version
+            time.sleep(poll_interval)
+        return last_version
@@ -0,0 +1,199 @@
+import asyncio
+import inspect
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from client.client_side import ClientSide, normalize_interval
+
+
+class Strategy:
+    """
+    Stratégie hébergée par un StrategyRunner. Surcharger les callbacks utiles
+    (fonctions ou coroutines) et déclarer les flux voulus :
+
+        class Momentum(Strategy):
+            symbols = ["BTCUSDT"]
+
+            async def on_book(self, book):
+                ...
+                await self.client.create_order(...)
+
+    self.client est le client partagé par toutes les stratégies du runner.
+    """
+
+    symbols: List[str] = []
+    kline_streams: List[Tuple[str, str, str]] = []  # (exchange, symbole, intervalle)
+    ticker_symbols: List[str] = []  # meilleurs prix et statistiques seulement, sans les carnets
+    portfolio: bool = False
+
+    def __init__(self, name: str = None):
+        self.name = name or type(self).__name__
+        self.client: Optional[ClientSide] = None
+
+    async def on_start(self):
+        pass
+
+    def on_book(self, book: Dict[str, Any]):
+        pass
+
+    def on_kline(self, kline: Dict[str, Any]):
+        pass
+
+    def on_ticker(self, ticker: Dict[str, Any]):
+        pass
+
+    def on_portfolio(self, portfolio: Dict[str, Any]):
+        pass
+
+    async def on_stop(self):
+        pass
+
+
+class StrategyStats:
+    """Latences d'une stratégie : attente dans sa file et durée de ses callbacks"""
+
+    def __init__(self, window: int = 1000):
+        self.events = 0
+        self.errors = 0
+        self.waits = deque(maxlen=window)
+        self.durations = deque(maxlen=window)
+
+    def record(self, wait: float, duration: float):
+        self.events += 1
+        self.waits.append(wait)
+        self.durations.append(duration)
+
+    @staticmethod
+    def _summary(values) -> Dict[str, Optional[float]]:
+        if not values:
+            return {"mean_ms": None, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        ordered = sorted(values)
+        return {
+            "mean_ms": 1000 * sum(ordered) / len(ordered),
+            "p50_ms": 1000 * ordered[len(ordered) // 2],
+            "p99_ms": 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+            "max_ms": 1000 * ordered[-1],
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "errors": self.errors,
+            "queue_wait": self._summary(self.waits),
+            "callback": self._summary(self.durations),
+        }
+
+
+class StrategyRunner:
+    """
+    Héberge plusieurs stratégies dans un process, sur un seul client : une
+    session HTTP (pool de connexions) et une connexion WebSocket multiplexée.
+
+    Chaque flux de chaque stratégie a sa propre file et sa propre tâche : une
+    stratégie lente ou en erreur ne retarde pas les autres. Une stratégie qui
+    lève max_errors exceptions est arrêtée.
+    """
+
+    def __init__(self, client: ClientSide = None, max_errors: int = 10):
+        self.client = client or ClientSide()
+        self.max_errors = max_errors
+        self.strategies: Dict[str, Strategy] = {}
+        self.tasks: Dict[str, List[asyncio.Task]] = {}
+        self.stats: Dict[str, StrategyStats] = {}
+
+    def add(self, strategy: Strategy):
+        if strategy.name in self.strategies:
+            raise ValueError(f"Stratégie déjà enregistrée : {strategy.name}")
+        self.strategies[strategy.name] = strategy
+        self.stats[strategy.name] = StrategyStats()
+
+    async def start(self):
+        await self.client.connect_websocket()
+        for strategy in self.strategies.values():
+            await self.start_strategy(strategy)
+
+    async def start_strategy(self, strategy: Strategy):
+        strategy.client = self.client
+        try:
+            await strategy.on_start()
+        except Exception as e:
+            self.stats[strategy.name].errors += 1
+            print(f"[{strategy.name}] Erreur au démarrage : {e}")
+            return
+
+        streams = []
+        for symbol in strategy.symbols:
+            symbol = symbol.upper()
+            if symbol not in self.client.subscribed_symbols:
+                await self.client.subscribe_symbol(symbol)
+            # Un carnet en retard est remplacé par le suivant
+            streams.append((("order_book", symbol), strategy.on_book, True))
+        for exchange, symbol, interval in strategy.kline_streams:
+            exchange, symbol, interval = exchange.lower(), symbol.upper(), normalize_interval(interval)
+            if (exchange, symbol, interval) not in self.client.kline_subscriptions:
+                await self.client.subscribe_klines(exchange, symbol, interval)
+            streams.append((("kline", exchange, symbol, interval), strategy.on_kline, False))
+        for symbol in strategy.ticker_symbols:
+            symbol = symbol.upper()
+            if symbol not in self.client.ticker_subscriptions:
+                await self.client.subscribe_ticker(symbol)
+            streams.append((("ticker", symbol), strategy.on_ticker, True))
+        if strategy.portfolio:
+            if not self.client.portfolio_subscribed:
+                await self.client.subscribe_portfolio()
+            streams.append((("portfolio",), strategy.on_portfolio, True))
+
+        self.tasks[strategy.name] = [
+            asyncio.create_task(self._consume(strategy, key, handler, conflate))
+            for key, handler, conflate in streams
+        ]
+
+    async def _consume(self, strategy: Strategy, key, handler: Callable[[Dict[str, Any]], Any], conflate: bool):
+        queue = self.client.open_stream(key, conflate)
+        stats = self.stats[strategy.name]
+        try:
+            while True:
+                event = await queue.get()
+                started = time.perf_counter()
+                try:
+                    result = handler(event)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    stats.errors += 1
+                    print(f"[{strategy.name}] Erreur dans {handler.__name__} : {e}")
+                    if stats.errors >= self.max_errors:
+                        print(f"[{strategy.name}] Arrêtée après {stats.errors} erreurs")
+                        asyncio.create_task(self.stop_strategy(strategy.name))
+                        return
+                stats.record(queue.last_wait, time.perf_counter() - started)
+        finally:
+            self.client.close_stream(key, queue)
+
+    async def stop_strategy(self, name: str):
+        tasks = self.tasks.pop(name, [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await self.strategies[name].on_stop()
+        except Exception as e:
+            print(f"[{name}] Erreur à l'arrêt : {e}")
+
+    async def stop(self):
+        await asyncio.gather(*(self.stop_strategy(name) for name in list(self.tasks)))
+
+    async def run(self, duration_seconds: float = None):
+        """Démarre les stratégies et les exécute pendant duration_seconds (sans limite si None)"""
+        await self.start()
+        try:
+            if duration_seconds is None:
+                await asyncio.Event().wait()
+            else:
+                await asyncio.sleep(duration_seconds)
+        finally:
+            await self.stop()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latences par stratégie (attente en file et durée des callbacks, en ms)"""
+        return {name: {"running": name in self.tasks, **stats.get_stats()} for name, stats in self.stats.items()}
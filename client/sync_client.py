@@ -0,0 +1,85 @@
+import asyncio
+import inspect
+import threading
+from typing import Any, Iterator, Optional
+from client.client_side import ClientSide
+
+# Timeout par défaut de SyncClient (None signifie : pas de timeout)
+_DEFAULT_TIMEOUT = object()
+
+
+class SyncClient:
+    """
+    Façade synchrone de ClientSide, pour les notebooks et les scripts :
+
+        client = SyncClient()
+        client.login(Credentials("Tristan", "Tristan"))
+        klines = client.get_klines("binance", "BTCUSDT", "1m", 100)
+        for book in client.books("BTCUSDT"):
+            ...
+
+    Une seule boucle asyncio tourne dans un thread dédié pendant toute la vie
+    de l'objet : la session HTTP et la connexion WebSocket sont conservées entre
+    les appels, au lieu d'une nouvelle boucle (asyncio.run) par appel.
+    """
+
+    def __init__(self, *args, timeout: float = 30.0, **kwargs):
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="SyncClient", daemon=True)
+        self.thread.start()
+        self.client: ClientSide = self._run(self._create(*args, **kwargs))
+
+    @staticmethod
+    async def _create(*args, **kwargs) -> ClientSide:
+        # Créé dans la boucle du thread : la session HTTP y est rattachée
+        return ClientSide(*args, **kwargs)
+
+    def _run(self, coroutine, timeout: Optional[float] = _DEFAULT_TIMEOUT):
+        """Exécute coroutine dans la boucle du client ; timeout=None attend sans limite"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(self.timeout if timeout is _DEFAULT_TIMEOUT else timeout)
+        except BaseException:
+            # Timeout ou KeyboardInterrupt : la coroutine ne doit pas continuer dans la boucle
+            future.cancel()
+            raise
+
+    @staticmethod
+    async def _aclose(generator):
+        # Un __anext__ annulé se termine au prochain tour de boucle ; aclose() échoue avant
+        while generator.ag_running:
+            await asyncio.sleep(0)
+        await generator.aclose()
+
+    def _iterate(self, generator) -> Iterator[Any]:
+        """Parcourt un générateur asynchrone du client depuis le thread appelant, sans timeout entre deux évènements"""
+        try:
+            while True:
+                try:
+                    yield self._run(generator.__anext__(), timeout=None)
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(self._aclose(generator))
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if inspect.iscoroutinefunction(attribute):
+            return lambda *args, **kwargs: self._run(attribute(*args, **kwargs))
+        if inspect.isasyncgenfunction(attribute):
+            return lambda *args, **kwargs: self._iterate(attribute(*args, **kwargs))
+        return attribute
+
+    def close(self):
+        """Ferme la session HTTP et la connexion WebSocket, puis arrête la boucle"""
+        if self.loop.is_running():
+            self._run(self.client.__aexit__(None, None, None))
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(self.timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,20 +1,31 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import asyncio
+import queue
 import threading
-import pandas as pd
-from client.client_side import ClientSide
+from client.client_side import ClientSide, interval_to_nanoseconds, normalize_interval
 from client.client_credentials import Credentials
+from gui.candlestick_chart import CandlestickChart
+from gui.order_book_view import OrderBookView
+from gui.order_blotter import OrderBlotter
+from gui.watchlist_view import WatchlistView
 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+# Intervalle des bougies affichées
+KLINES_INTERVAL = "15m"
 
 class APIGUI:
-    def __init__(self, root):
+    def __init__(self, root, fps: int = 20):
         self.root = root
         self.root.title("Trading Platform")
+
+        # Tkinter n'est pas thread-safe : le thread asyncio dépose les mises à jour
+        # dans cette file, vidée par le thread Tk au plus fps fois par seconde
+        self.ui_queue = queue.SimpleQueue()
+        self.frame_interval_ms = max(1, int(1000 / fps))
+        # Appelés à chaque image, après les mises à jour reçues (travail borné par image)
+        self.frame_listeners = []
         
-        self.client = ClientSide()
+        self.client = ClientSide(cache=True)  # paires et klines resservies depuis le cache
         self.loop = asyncio.new_event_loop()
         threading.Thread(target=self.start_loop, daemon=True).start()
         
@@ -22,9 +33,14 @@ class APIGUI:
         
         self.create_scrollable_frame()
 
+        # Abonnements WebSocket : tickers des symboles de la watchlist, carnet du symbole affiché
         self.ws_subscribed_symbols = set()
+        self.ws_ticker_symbols = set()
         self.subscribed_symbol = None
-        self.klines_data = {}
+        # Flux de bougies en direct du graphique : (exchange, symbole, intervalle)
+        self.kline_stream = None
+
+        self.root.after(self.frame_interval_ms, self.process_ui_queue)
 
     def create_scrollable_frame(self):
         self.canvas = tk.Canvas(self.root, width=715, height=1000)
@@ -47,13 +63,50 @@ class APIGUI:
     def run_async(self, coro):
         return asyncio.run_coroutine_threadsafe(coro, self.loop)
 
+    def post(self, callback, *args, key=None):
+        """
+        Planifie callback(*args) dans le thread Tk, depuis n'importe quel thread.
+        Les appels de même key reçus pendant une image sont fusionnés : seul le
+        dernier est exécuté (ex. un carnet remplacé par le suivant).
+        """
+        self.ui_queue.put((key, callback, args))
+
+    def process_ui_queue(self):
+        pending = {}
+        # Seulement les messages déjà présents : un flux continu ne bloque pas l'image
+        for _ in range(self.ui_queue.qsize()):
+            try:
+                key, callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if key is None:
+                key = object()
+            pending.pop(key, None)  # l'appel fusionné prend la place du dernier reçu
+            pending[key] = (callback, args)
+        for callback, args in pending.values():
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Erreur GUI : {e}")
+        for listener in self.frame_listeners:
+            listener()
+        self.root.after(self.frame_interval_ms, self.process_ui_queue)
+
     async def connect_and_listen_websocket(self):
         await self.client.connect_websocket()
         await self.client.listen_websocket_updates(self.on_websocket_update)
     
     def on_websocket_update(self, data):
+        # Thread asyncio : tout affichage passe par post
         if data["type"]=="order_book":
-            self.update_order_book(data)
+            self.post(self.update_order_book, data, key=("order_book", data["symbol"]))
+        elif data["type"] == "ticker":
+            self.post(self.watchlist.update_ticker, data, key=("ticker", data["symbol"]))
+        elif data["type"] == "kline" and (data["exchange"], data["symbol"], data["interval"]) == self.kline_stream:
+            # Une clé par bougie : la version finale d'une bougie close n'est jamais écrasée
+            self.post(self.chart.update_kline, data, key=("kline", data["timestamp"]))
+        elif data["type"] == "order":
+            self.post(self.order_blotter.push, data, key=("order", data["order_id"]))
 
     def create_widgets(self):
         self.scrollable_frame.columnconfigure(0, weight=1)
@@ -65,6 +118,7 @@ class APIGUI:
 
         self.frame_connexion()
         self.frame_exchange_and_symbol_selection()
+        self.frame_watchlist()
         self.frame_order_book()
         self.frame_klines()
         self.frame_twap_order()
@@ -97,9 +151,11 @@ class APIGUI:
         success = await self.client.login(creds)
         await self.client.ws_authenticate()
         if success:
-            messagebox.showinfo("Login", "Connexion réussie!")
+            # Ordres actifs puis chaque changement, poussés par le serveur
+            await self.client.subscribe_orders()
+            self.post(messagebox.showinfo, "Login", "Connexion réussie!")
         else:
-            messagebox.showerror("Login", "Échec de la connexion!")
+            self.post(messagebox.showerror, "Login", "Échec de la connexion!")
 
     def frame_exchange_and_symbol_selection(self):
         # Frame pour selection de l'exchange
@@ -122,70 +178,91 @@ class APIGUI:
     async def async_update_exchanges(self):
         exchanges = await self.client.get_supported_exchanges()
         if exchanges:
-            self.exchange_combo["values"] =  exchanges
+            self.post(self.exchange_combo.configure, {"values": exchanges})
 
     def update_symbols(self):
-        self.run_async(self.async_update_symbols())
-
-    async def async_update_symbols(self):
-        exchanges = self.exchange_combo.get()
-        if exchanges:
-            pairs = await self.client.get_trading_pairs(exchanges)
-            
-            self.symbol_combo.delete(0, tk.END)
-            self.symbol_combo.set("Sélectionner")
-            self.symbol_combo['values'] = pairs
-            self.twap_symbol_combo['values'] = pairs 
-            
-            # Si on a des pairs, mettre une valeur par défaut
-            if pairs:
-                self.symbol_var.set(pairs[0])
-                self.twap_symbol_var.set(pairs[0])
+        self.run_async(self.async_update_symbols(self.exchange_combo.get()))
+
+    async def async_update_symbols(self, exchange):
+        if exchange:
+            pairs = await self.client.get_trading_pairs(exchange)
+            self.post(self.show_symbols, pairs)
+
+    def show_symbols(self, pairs):
+        self.symbol_combo.delete(0, tk.END)
+        self.symbol_combo.set("Sélectionner")
+        self.symbol_combo['values'] = pairs
+        self.twap_symbol_combo['values'] = pairs 
+        
+        # Si on a des pairs, mettre une valeur par défaut
+        if pairs:
+            self.symbol_var.set(pairs[0])
+            self.twap_symbol_var.set(pairs[0])
 
     def update_symbol(self):
         symbol = self.symbol_var.get()
         exchange = self.exchange_var.get()
+        self.order_book_view.clear()
         self.fetch_and_display_klines(exchange, symbol)
-        self.unsubscribe()
-        self.subscribe_symbol(symbol)
+        self.subscribed_symbol = symbol.upper()
+        self.sync_subscriptions()
+
+    def frame_watchlist(self):
+        watchlist_frame = ttk.LabelFrame(self.scrollable_frame, text="Watchlist")
+        watchlist_frame.pack(fill="x", padx=5, pady=5)
+
+        controls = ttk.Frame(watchlist_frame)
+        controls.pack(fill="x")
+        self.watchlist_entry = ttk.Entry(controls)
+        self.watchlist_entry.pack(side="left", padx=5, pady=5)
+        self.watchlist_entry.bind("<Return>", lambda e: self.add_to_watchlist())
+        ttk.Button(controls, text="Ajouter", command=self.add_to_watchlist).pack(side="left", padx=5)
+        ttk.Button(controls, text="Retirer", command=self.remove_from_watchlist).pack(side="left", padx=5)
+
+        self.watchlist = WatchlistView(watchlist_frame)
+        self.watchlist.pack(fill="x", padx=5, pady=5)
+
+    def add_to_watchlist(self):
+        symbol = self.watchlist_entry.get().strip().upper() or self.symbol_var.get().upper()
+        if symbol and self.watchlist.add(symbol):
+            self.watchlist_entry.delete(0, tk.END)
+            ticker = self.client.get_ticker(symbol)
+            if ticker is not None:
+                self.watchlist.update_ticker(ticker)
+            self.sync_subscriptions()
+
+    def remove_from_watchlist(self):
+        for symbol in self.watchlist.selected():
+            self.watchlist.remove(symbol)
+        self.sync_subscriptions()
 
     def frame_klines(self):
         klines_frame = ttk.LabelFrame(self.scrollable_frame, text="Klines")
         klines_frame.pack(fill="both", padx=5, pady=5, expand=True)
         self.klines_frame = klines_frame
+        # Canvas créé une fois, ses données sont remplacées à chaque changement de symbole
+        self.chart = CandlestickChart(klines_frame)
 
     def fetch_and_display_klines(self, *args):
         self.run_async(self.async_fetch_and_display_klines(*args))
 
     async def async_fetch_and_display_klines(self, exchange, symbol):
-        klines = await self.client.get_klines(exchange, symbol, "15m", 100)
-        
-        if not klines:
-            messagebox.showerror("Erreur", "Aucune donnée de klines disponible pour ce symbole.")
-            return
-
-        df = pd.DataFrame(klines, columns=["timestamp", "open", "high", "low", "close"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit='ns')
-        fig = Figure(figsize=(6, 4), dpi=100)
-        ax = fig.add_subplot()
+        columns = await self.client.get_klines(exchange, symbol, KLINES_INTERVAL, 100, format="columnar")
 
-        # Plot candlesticks
-        for idx, row in df.iterrows():
-            color = 'green' if row['close'] >= row['open'] else 'red'
-            ax.plot([row['timestamp'], row['timestamp']], [row['low'], row['high']], color=color)
-            ax.plot([row['timestamp'], row['timestamp']], [row['open'], row['close']], color=color, linewidth=5)
-
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Price")
-        ax.set_title(f"Candlestick chart for {symbol}")
-        
-        for widget in self.klines_frame.winfo_children():
-            widget.destroy()
+        if not columns["timestamp"]:
+            self.post(messagebox.showerror, "Erreur", "Aucune donnée de klines disponible pour ce symbole.")
+            return
 
-        canvas = FigureCanvasTkAgg(fig, master=self.klines_frame) 
-        canvas.draw()
+        # Même écriture que les messages du serveur
+        stream = (exchange.lower(), symbol.upper(), normalize_interval(KLINES_INTERVAL))
+        self.post(self.chart.set_klines, stream, columns, interval_to_nanoseconds(KLINES_INTERVAL))
 
-        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        # Bougies en direct : la dernière bougie est mise à jour, les nouvelles sont ajoutées
+        if stream != self.kline_stream:
+            if self.kline_stream is not None:
+                await self.client.unsubscribe_klines(*self.kline_stream)
+            self.kline_stream = stream
+            await self.client.subscribe_klines(*stream)
 
 
     def frame_order_book(self):
@@ -194,59 +271,37 @@ class APIGUI:
         book_frame.pack(fill="both", padx=5, pady=5)
 
         book_frame.columnconfigure(0, weight=1)
-        book_frame.columnconfigure(1, weight=1)
-        book_frame.columnconfigure(2, weight=1)
-        book_frame.rowconfigure(1, weight=1)
+        book_frame.rowconfigure(0, weight=1)
 
-        ttk.Label(book_frame, text="Bids").grid(row=0, column=0, padx=5, pady=5)
-        ttk.Label(book_frame, text="Asks").grid(row=0, column=1, padx=5, pady=5)
-
-        self.bids_text = scrolledtext.ScrolledText(book_frame, height=10, width=40)
-        self.bids_text.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
-
-        self.asks_text = scrolledtext.ScrolledText(book_frame, height=10, width=40)
-        self.asks_text.grid(row=1, column=1, padx=5, pady=5, sticky="nsew")
+        self.order_book_view = OrderBookView(book_frame)
+        self.order_book_view.grid(row=0, column=0, sticky="nsew")
     
     def update_order_book(self, data):
-        
-        current_symbol = self.symbol_var.get()
-        
-        if data["symbol"] != current_symbol:
+        # Thread Tk, au plus une fois par image et par symbole
+        if data["symbol"] != self.symbol_var.get().upper():
             return
-        
-        bids = data["bids"]
-        asks = data["asks"]
-        
-        self.bids_text.delete("1.0", tk.END)
-        self.asks_text.delete("1.0", tk.END)
-        
-        for i, (price, quantity) in enumerate(bids):
-            self.bids_text.insert(tk.END, f"{i+1}. Price: {price}, Quantity: {quantity}\n")
-            
-        for i, (price, quantity) in enumerate(asks):
-            self.asks_text.insert(tk.END, f"{i+1}. Price: {price}, Quantity: {quantity}\n")
-   
+        self.order_book_view.update(data["bids"], data["asks"])
    
-    def subscribe_symbol(self, symbol): 
-        if symbol in self.ws_subscribed_symbols:
-            return
-        
-        self.run_async(self.async_subscribe_symbol(symbol))
-        
-    async def async_subscribe_symbol(self, symbol):
-        await self.client.subscribe_symbol(symbol)
-        self.ws_subscribed_symbols.add(symbol)
-        print(f"Abonné à {symbol}")
-        self.subscribed_symbol = symbol
-        
-    def unsubscribe(self): 
-        if self.subscribed_symbol is not None: self.run_async(self.async_unsubscribe_symbol(self.subscribed_symbol))
-        
-    async def async_unsubscribe_symbol(self, symbol):
-        await self.client.unsubscribe_symbol(symbol)
-        self.ws_subscribed_symbols.remove(symbol)
-        print(f"Désabonné de {symbol}")
-        self.subscribed_symbol = None
+    def sync_subscriptions(self):
+        """
+        Aligne les abonnements WebSocket sur la watchlist (tickers) et le symbole affiché
+        (carnet complet), une seule fois par symbole
+        """
+        tickers = set(self.watchlist.symbols)
+        for symbol in tickers - self.ws_ticker_symbols:
+            self.run_async(self.client.subscribe_ticker(symbol))
+        for symbol in self.ws_ticker_symbols - tickers:
+            self.run_async(self.client.unsubscribe_ticker(symbol))
+        self.ws_ticker_symbols = tickers
+
+        wanted = {self.subscribed_symbol} if self.subscribed_symbol is not None else set()
+        for symbol in wanted - self.ws_subscribed_symbols:
+            self.run_async(self.client.subscribe_symbol(symbol))
+            print(f"Abonné à {symbol}")
+        for symbol in self.ws_subscribed_symbols - wanted:
+            self.run_async(self.client.unsubscribe_symbol(symbol))
+            print(f"Désabonné de {symbol}")
+        self.ws_subscribed_symbols = wanted
    
     ####################################################################################################################################
     ####################################################################################################################################
@@ -294,24 +349,38 @@ class APIGUI:
         ttk.Button(twap_frame, text="Créer TWAP", command=self.create_twap_order).grid(row=3, column=0, columnspan=6, padx=5, pady=5)
 
     def frame_twap_sub_follow(self):
-        # Frame pour suivi TWAP et subscription (première ligne, 2 colonnes)
-        suivi_frame = ttk.LabelFrame(self.scrollable_frame, text="Suivi et Subscription")
+        # Frame pour suivi des ordres : blotter (statuts poussés) et détail de l'ordre sélectionné
+        suivi_frame = ttk.LabelFrame(self.scrollable_frame, text="Suivi des ordres")
         suivi_frame.pack(fill="both", padx=5, pady=5, expand=True)
 
         suivi_frame.columnconfigure(0, weight=1)
-        suivi_frame.columnconfigure(1, weight=1)
-        suivi_frame.rowconfigure(1, weight=1)
+        suivi_frame.rowconfigure(0, weight=1)
 
-        twap_header = ttk.Frame(suivi_frame)
-        twap_header.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
-        ttk.Label(twap_header, text="Suivi TWAP").grid(row=0, column=0, sticky="w", padx=5)
-        
-        sub_header = ttk.Frame(suivi_frame)
-        sub_header.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.order_blotter = OrderBlotter(suivi_frame)
+        self.order_blotter.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+        self.order_blotter.bind_select(self.show_order_details)
+        self.frame_listeners.append(self.order_blotter.flush)
 
         self.twap_status_text = scrolledtext.ScrolledText(suivi_frame, height=10)
         self.twap_status_text.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
 
+    def show_order_details(self, order_id):
+        # Exécutions détaillées chargées une fois, à la sélection
+        self.run_async(self.async_show_order_details(order_id))
+
+    async def async_show_order_details(self, order_id):
+        status = await self.client.get_order_status(order_id)
+        self.post(self.display_order_details, order_id, status, key=("order_details",))
+
+    def display_order_details(self, order_id, status):
+        self.twap_status_text.delete("1.0", tk.END)
+        self.twap_status_text.insert(tk.END, f"Ordre ID: {order_id}\n")
+        self.twap_status_text.insert(tk.END, f"Statut: {status.get('status', 'inconnu')}\n")
+        filtered_status = {k: v for k, v in status.items() if k != "executions"}
+        self.twap_status_text.insert(tk.END, f"Statut: {filtered_status}\n")
+        for exec in status.get("executions", []):
+            self.twap_status_text.insert(tk.END, f"Execution avancement: {exec}\n")
+
     def create_twap_order(self):
         if self.client.token is None:
             messagebox.showerror("Erreur", "Veuillez vous connecter d'abord.")
@@ -338,8 +407,6 @@ class APIGUI:
             messagebox.showerror("Erreur", "Veuillez entrer des valeurs numériques valides.")
             return
         
-        self.twap_status_text.insert(tk.END, "Création de l'ordre TWAP en cours...\n")
-        
         self.run_async(self.async_create_twap_order(exchange=exchange, symbol=symbol, 
                                                     quantity=quantity, side=side, slices=slices, 
                                                     duration_seconds=duration_seconds,token=self.client.token, limit_price=limit_price))
@@ -355,38 +422,12 @@ class APIGUI:
                 limit_price=limit_price
             )
         if order_id:
-            self.current_twap_order_id = order_id
-            messagebox.showinfo("TWAP", f"TWAP Order créé avec succès : {order_id}")
-            
-            # Mise à jour immédiate du statut et démarrage d'une mise à jour régulière
-            await self.async_update_twap_status()
-            
-            # Programmer une mise à jour régulière du statut toutes les 2 secondes
-            await asyncio.sleep(2) 
-            self.run_async(self.async_update_twap_status())
-            
+            # Le suivi arrive par le canal "orders" : l'ordre apparaît dans le blotter
+            self.post(messagebox.showinfo, "TWAP", f"TWAP Order créé avec succès : {order_id}")
             return True
         else:
-            messagebox.showerror("TWAP", "Échec de la création du TWAP Order.")
+            self.post(messagebox.showerror, "TWAP", "Échec de la création du TWAP Order.")
             return False
-        
-    async def async_update_twap_status(self):
-        status = await self.client.get_order_status(self.current_twap_order_id)
-
-        self.twap_status_text.delete("1.0", tk.END)
-
-        self.twap_status_text.insert(tk.END, f"\nOrdre ID: {self.current_twap_order_id}\n")
-        self.twap_status_text.insert(tk.END, f"Statut: {status.get('status', 'inconnu')}\n")
-        filtered_status = {k: v for k, v in status.items() if k != "executions"}
-        self.twap_status_text.insert(tk.END, f"Statut: {filtered_status}\n")
-        for exec in status.get("executions", []):
-            self.twap_status_text.insert(tk.END, f"Execution avancement: {exec}\n")
-
-        if status.get("status") in ["completed", "error"]:
-            self.current_twap_order_id = None
-        
-        await asyncio.sleep(2)
-        self.run_async(self.async_update_twap_status())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+import tkinter as tk
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.path import Path
+
+NANOSECONDS_PER_DAY = 86_400 * 1_000_000_000
+UP_COLOR = np.array([0.0, 0.6, 0.0, 1.0])
+DOWN_COLOR = np.array([0.8, 0.0, 0.0, 1.0])
+
+
+def candle_paths(x, ohlc, half_width):
+    """
+    Sommets et codes de deux chemins composés (mèches et corps) pour un lot de
+    bougies : un seul chemin par couleur au lieu d'un artiste par bougie
+    """
+    n = len(x)
+    open_, high, low, close = ohlc.T
+
+    # Mèches : MOVETO (x, low), LINETO (x, high)
+    wicks = np.empty((n, 2, 2))
+    wicks[:, :, 0] = x[:, None]
+    wicks[:, 0, 1] = low
+    wicks[:, 1, 1] = high
+    wick_codes = np.tile([Path.MOVETO, Path.LINETO], n)
+
+    # Corps : rectangle fermé entre open et close
+    bodies = np.empty((n, 5, 2))
+    bodies[:, [0, 1, 4], 0] = (x - half_width)[:, None]
+    bodies[:, [2, 3], 0] = (x + half_width)[:, None]
+    bodies[:, [0, 3, 4], 1] = open_[:, None]
+    bodies[:, [1, 2], 1] = close[:, None]
+    body_codes = np.tile([Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY], n)
+
+    return wicks.reshape(-1, 2), wick_codes, bodies.reshape(-1, 2), body_codes
+
+
+class CandlestickChart:
+    """
+    Graphique en chandeliers sur un canvas Tk créé une seule fois.
+
+    L'historique est dessiné par deux collections (mèches et corps), chacune
+    réduite à deux chemins composés (hausse, baisse) calculés en NumPy : le coût
+    du rendu ne dépend plus du nombre d'artistes. La bougie en cours est un
+    artiste animé à part : ses mises à jour ne redessinent qu'elle (blitting sur
+    le fond mis en cache), la figure entière n'est redessinée qu'à la clôture
+    d'une bougie ou quand l'échelle change.
+
+    A appeler uniquement depuis le thread Tk.
+    """
+
+    def __init__(self, master, max_bars: int = 5000):
+        self.max_bars = max_bars
+        self.key: Optional[Tuple[str, str, str]] = None  # (exchange, symbole, intervalle)
+        self.bar_width = 0.0
+
+        # Colonnes préallouées, n bougies valides
+        self.n = 0
+        self.timestamp = np.zeros(0, dtype=np.int64)
+        self.ohlc = np.zeros((0, 4))  # open, high, low, close
+
+        self.figure = Figure(figsize=(6, 4), dpi=100)
+        self.ax = self.figure.add_subplot()
+        self.wicks = PolyCollection([], facecolors="none", edgecolors=[UP_COLOR, DOWN_COLOR], linewidths=1)
+        self.bodies = PolyCollection([], facecolors=[UP_COLOR, DOWN_COLOR], linewidths=0)
+        self.live_wick = LineCollection([], linewidths=1, animated=True)
+        self.live_body = PolyCollection([], linewidths=0, animated=True)
+        for collection in (self.wicks, self.bodies, self.live_wick, self.live_body):
+            self.ax.add_collection(collection)
+        # x en jours depuis 1970 (dates matplotlib), sans convertisseur d'unités :
+        # la conversion serait refaite pour chaque chemin à chaque rendu
+        locator = mdates.AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.ax.set_xlabel("Time")
+        self.ax.set_ylabel("Price")
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.background = None
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def set_klines(self, key: Tuple[str, str, str], columns: Dict[str, Any], interval_ns: int):
+        """Remplace la série affichée (columns : format columnar de /klines)"""
+        self.key = key
+        timestamp = np.asarray(columns["timestamp"], dtype=np.int64)[-self.max_bars:]
+        self.n = len(timestamp)
+        self.timestamp = np.zeros(max(self.n * 2, 64), dtype=np.int64)
+        self.ohlc = np.zeros((len(self.timestamp), 4))
+        self.timestamp[:self.n] = timestamp
+        self.ohlc[:self.n] = np.column_stack([
+            np.asarray(columns[name], dtype=np.float64)[-self.max_bars:] for name in ("open", "high", "low", "close")
+        ])
+        # Les corps occupent 70% de l'intervalle
+        self.bar_width = 0.7 * interval_ns / NANOSECONDS_PER_DAY
+        self.ax.set_title(f"Candlestick chart for {key[1]}")
+        self.redraw()
+
+    def update_kline(self, kline: Dict[str, Any]):
+        """Bougie reçue en direct : mise à jour de la dernière, ou ajout"""
+        if self.key is None:
+            return
+        values = [kline["open"], kline["high"], kline["low"], kline["close"]]
+        last = self.timestamp[self.n - 1] if self.n else None
+        if last is not None and kline["timestamp"] == last:
+            self.ohlc[self.n - 1] = values
+            low, high = self.ax.get_ylim()
+            if self.background is not None and low <= kline["low"] and kline["high"] <= high:
+                self.update_live()
+                return
+        elif last is None or kline["timestamp"] > last:
+            if self.n >= self.max_bars or self.n == len(self.timestamp):
+                self._grow()
+            self.timestamp[self.n] = kline["timestamp"]
+            self.ohlc[self.n] = values
+            self.n += 1
+        else:
+            return
+        self.redraw()
+
+    def _grow(self):
+        if self.n >= self.max_bars:
+            # Fenêtre glissante : on garde les max_bars - 1 dernières bougies
+            keep = self.max_bars - 1
+            self.timestamp[:keep] = self.timestamp[self.n - keep:self.n]
+            self.ohlc[:keep] = self.ohlc[self.n - keep:self.n]
+            self.n = keep
+            return
+        self.timestamp = np.concatenate((self.timestamp, np.zeros_like(self.timestamp)))
+        self.ohlc = np.concatenate((self.ohlc, np.zeros_like(self.ohlc)))
+
+    def _x(self, start: int, stop: int) -> np.ndarray:
+        return self.timestamp[start:stop] / NANOSECONDS_PER_DAY
+
+    def redraw(self):
+        """Redessine l'historique (toutes les bougies sauf la dernière) et l'échelle"""
+        n = self.n
+        history = max(n - 1, 0)
+        x = self._x(0, history)
+        ohlc = self.ohlc[:history]
+        up = ohlc[:, 3] >= ohlc[:, 0]
+
+        wick_verts, wick_codes, body_verts, body_codes = [], [], [], []
+        for mask in (up, ~up):
+            wicks, w_codes, bodies, b_codes = candle_paths(x[mask], ohlc[mask], self.bar_width / 2)
+            wick_verts.append(wicks)
+            wick_codes.append(w_codes)
+            body_verts.append(bodies)
+            body_codes.append(b_codes)
+        self.wicks.set_verts_and_codes(wick_verts, wick_codes)
+        self.bodies.set_verts_and_codes(body_verts, body_codes)
+
+        if n:
+            low, high = self.ohlc[:n, 2].min(), self.ohlc[:n, 1].max()
+            margin = (high - low) * 0.05 or abs(high) * 0.01 or 1.0
+            self.ax.set_xlim(self._x(0, 1)[0] - self.bar_width, self._x(n - 1, n)[0] + self.bar_width)
+            self.ax.set_ylim(low - margin, high + margin)
+        # on_draw mettra le fond en cache puis dessinera la bougie en cours
+        self.background = None
+        self.canvas.draw_idle()
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.update_live()
+
+    def update_live(self):
+        """Redessine la seule bougie en cours sur le fond mis en cache"""
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        if self.n:
+            open_, high, low, close = self.ohlc[self.n - 1]
+            x = self._x(self.n - 1, self.n)[0]
+            half = self.bar_width / 2
+            color = UP_COLOR if close >= open_ else DOWN_COLOR
+            self.live_wick.set_segments([[(x, low), (x, high)]])
+            self.live_wick.set_color([color])
+            self.live_body.set_verts([[(x - half, open_), (x - half, close), (x + half, close), (x + half, open_)]])
+            self.live_body.set_facecolor([color])
+            self.ax.draw_artist(self.live_wick)
+            self.ax.draw_artist(self.live_body)
+        self.canvas.blit(self.ax.bbox)
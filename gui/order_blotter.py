@@ -0,0 +1,88 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Dict, Tuple
+
+COLUMNS = (
+    ("order_id", "Order", 110),
+    ("algorithm", "Algo", 50),
+    ("symbol", "Symbol", 80),
+    ("side", "Side", 40),
+    ("filled", "Filled", 120),
+    ("average_price", "Avg price", 90),
+    ("status", "Status", 80),
+)
+
+
+class OrderBlotter:
+    """
+    Ordres de l'utilisateur, alimentés par les statuts poussés sur le canal
+    WebSocket "orders" (aucune interrogation périodique du serveur).
+
+    Les statuts reçus sont fusionnés par ordre dans pending ; flush, appelé à
+    chaque image, n'applique qu'au plus max_updates_per_frame lignes : le coût
+    d'une image reste borné quel que soit le nombre d'ordres, le reste est
+    appliqué aux images suivantes.
+
+    A appeler uniquement depuis le thread Tk.
+    """
+
+    def __init__(self, master, max_updates_per_frame: int = 50):
+        self.max_updates_per_frame = max_updates_per_frame
+        self.frame = ttk.Frame(master)
+        self.tree = ttk.Treeview(self.frame, columns=[name for name, _, _ in COLUMNS], show="headings", height=8)
+        for name, title, width in COLUMNS:
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, anchor="e" if name in ("filled", "average_price") else "w")
+        self.tree.tag_configure("completed", foreground="gray")
+        self.tree.tag_configure("cancelled", foreground="gray")
+        self.tree.tag_configure("error", foreground="red")
+        scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.rows: Dict[str, Tuple[str, ...]] = {}
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def bind_select(self, callback):
+        """callback(order_id) à la sélection d'un ordre"""
+        self.tree.bind("<<TreeviewSelect>>", lambda e: [callback(order_id) for order_id in self.tree.selection()[:1]])
+
+    def push(self, order: Dict[str, Any]):
+        """Statut reçu : remplace le statut en attente du même ordre"""
+        self.pending.pop(order["order_id"], None)
+        self.pending[order["order_id"]] = order
+
+    @staticmethod
+    def _row(order: Dict[str, Any]) -> Tuple[str, ...]:
+        average_price = order.get("average_price")
+        return (
+            order["order_id"],
+            order.get("algorithm") or "",
+            order.get("symbol", ""),
+            order.get("side", ""),
+            f"{order.get('executed_quantity', 0):.6g} / {order.get('total_quantity', 0):.6g}",
+            f"{average_price:.8g}" if average_price is not None else "",
+            order.get("status", ""),
+        )
+
+    def flush(self) -> int:
+        """Applique au plus max_updates_per_frame statuts en attente, renvoie le nombre appliqué"""
+        applied = 0
+        while self.pending and applied < self.max_updates_per_frame:
+            order_id = next(iter(self.pending))
+            row = self._row(self.pending.pop(order_id))
+            applied += 1
+            if self.rows.get(order_id) == row:
+                continue
+            tags = (row[-1],)
+            if order_id in self.rows:
+                self.tree.item(order_id, values=row, tags=tags)
+            else:
+                # Ordre le plus récent en haut
+                self.tree.insert("", 0, iid=order_id, values=row, tags=tags)
+            self.rows[order_id] = row
+        return applied
@@ -0,0 +1,84 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import List, Sequence, Tuple
+
+# Huitièmes de bloc : une barre de profondeur a une résolution de 1/8 de caractère
+BAR_BLOCKS = " ▏▎▍▌▋▊▉█"
+
+
+def depth_bar(ratio: float, width: int) -> str:
+    eighths = int(round(max(0.0, min(1.0, ratio)) * width * 8))
+    full, rest = divmod(eighths, 8)
+    return "█" * full + (BAR_BLOCKS[rest] if rest else "")
+
+
+class OrderBookView:
+    """
+    Carnet d'ordres affiché dans deux Treeview (bids, asks) aux lignes créées
+    une seule fois. Chaque mise à jour calcule les nouvelles valeurs de chaque
+    ligne et ne réécrit que celles qui ont changé ; la barre de profondeur est
+    proportionnelle à la quantité cumulée depuis le meilleur prix.
+
+    A appeler uniquement depuis le thread Tk.
+    """
+
+    def __init__(self, master, depth: int = 20, bar_width: int = 20):
+        self.depth = depth
+        self.bar_width = bar_width
+        self.frame = ttk.Frame(master)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.columnconfigure(1, weight=1)
+        self.frame.rowconfigure(1, weight=1)
+
+        ttk.Label(self.frame, text="Bids").grid(row=0, column=0, padx=5, pady=5)
+        ttk.Label(self.frame, text="Asks").grid(row=0, column=1, padx=5, pady=5)
+        self.bids = self._create_tree(0, "bid", "green")
+        self.asks = self._create_tree(1, "ask", "red")
+        # Valeurs affichées par ligne, pour ne réécrire que les lignes modifiées
+        self.rows = {self.bids: [None] * depth, self.asks: [None] * depth}
+
+    def _create_tree(self, column: int, tag: str, color: str) -> ttk.Treeview:
+        tree = ttk.Treeview(self.frame, columns=("price", "quantity", "depth"), show="headings", height=10)
+        tree.heading("price", text="Price")
+        tree.heading("quantity", text="Quantity")
+        tree.heading("depth", text="Depth")
+        tree.column("price", width=90, anchor="e")
+        tree.column("quantity", width=90, anchor="e")
+        tree.column("depth", width=8 * self.bar_width, anchor="w")
+        tree.tag_configure(tag, foreground=color)
+        for level in range(self.depth):
+            tree.insert("", tk.END, iid=str(level), values=("", "", ""), tags=(tag,))
+        tree.grid(row=1, column=column, padx=5, pady=5, sticky="nsew")
+        return tree
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def _rows(self, levels: Sequence[Sequence[float]], total: float) -> List[Tuple[str, str, str]]:
+        rows = []
+        cumulated = 0.0
+        for price, quantity in levels[:self.depth]:
+            cumulated += quantity
+            rows.append((f"{price:.8g}", f"{quantity:.8g}", depth_bar(cumulated / total, self.bar_width)))
+        rows.extend([("", "", "")] * (self.depth - len(rows)))
+        return rows
+
+    def update(self, bids: Sequence[Sequence[float]], asks: Sequence[Sequence[float]]) -> int:
+        """Affiche un carnet, renvoie le nombre de lignes réécrites"""
+        # Même échelle pour les deux côtés : la plus grande quantité cumulée affichée
+        total = max(
+            sum(quantity for _, quantity in bids[:self.depth]),
+            sum(quantity for _, quantity in asks[:self.depth]),
+        ) or 1.0
+        written = 0
+        for tree, levels in ((self.bids, bids), (self.asks, asks)):
+            shown = self.rows[tree]
+            for level, row in enumerate(self._rows(levels, total)):
+                if shown[level] != row:
+                    tree.item(str(level), values=row)
+                    shown[level] = row
+                    written += 1
+        return written
+
+    def clear(self):
+        self.update([], [])
@@ -0,0 +1,62 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Dict, List, Tuple
+
+
+class WatchlistView:
+    """
+    Meilleur bid / ask, spread et déséquilibre du carnet de plusieurs symboles,
+    une ligne par symbole. Les valeurs arrivent par le canal WebSocket "ticker",
+    sans les carnets complets ; une ligne n'est réécrite que si elles ont changé.
+
+    A appeler uniquement depuis le thread Tk.
+    """
+
+    def __init__(self, master):
+        self.frame = ttk.Frame(master)
+        columns = (("symbol", "Symbol", 90), ("bid", "Bid", 100), ("ask", "Ask", 100), ("spread", "Spread", 90), ("imbalance", "Imbalance", 80))
+        self.tree = ttk.Treeview(self.frame, columns=[column for column, _, _ in columns], show="headings", height=6)
+        for column, title, width in columns:
+            self.tree.heading(column, text=title)
+            self.tree.column(column, width=width, anchor="w" if column == "symbol" else "e")
+        self.tree.pack(fill="both", expand=True)
+        # Valeurs affichées par symbole
+        self.rows: Dict[str, Tuple[str, ...]] = {}
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.rows)
+
+    def selected(self) -> List[str]:
+        return list(self.tree.selection())
+
+    def add(self, symbol: str) -> bool:
+        """Ajoute une ligne, False si le symbole est déjà suivi"""
+        if symbol in self.rows:
+            return False
+        self.rows[symbol] = (symbol, "", "", "", "")
+        self.tree.insert("", tk.END, iid=symbol, values=self.rows[symbol])
+        return True
+
+    def remove(self, symbol: str):
+        if self.rows.pop(symbol, None) is not None:
+            self.tree.delete(symbol)
+
+    def update_ticker(self, ticker: Dict[str, Any]):
+        symbol = ticker["symbol"]
+        if symbol not in self.rows:
+            return
+        bid, ask, spread, imbalance = ticker.get("bid"), ticker.get("ask"), ticker.get("spread"), ticker.get("imbalance")
+        row = (
+            symbol,
+            f"{bid:.8g}" if bid is not None else "",
+            f"{ask:.8g}" if ask is not None else "",
+            f"{spread:.6g}" if spread is not None else "",
+            f"{imbalance:+.2f}" if imbalance is not None else "",
+        )
+        if row != self.rows[symbol]:
+            self.rows[symbol] = row
+            self.tree.item(symbol, values=row)
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class KlinesRequest(BaseModel):
+    exchange: str
+    symbol: str
+    interval: str = "1m"
+    limit: int = 10
+
+
+class KlinesBatchRequest(BaseModel):
+    requests: List[KlinesRequest] = Field(..., max_length=1000)
+
+
+class OrderRequest(BaseModel):
+    exchange: str
+    symbol: str
+    side: str
+    quantity: float
+    algorithm: Literal["twap", "vwap", "pov", "iceberg"] = "twap"
+    # TWAP / VWAP
+    slices: Optional[int] = None
+    duration_seconds: Optional[int] = None
+    # POV : part du volume de marché (0-1]
+    participation_rate: Optional[float] = None
+    # Iceberg : quantité visible
+    display_quantity: Optional[float] = None
+    limit_price: Optional[float] = None
+    token_id: Optional[str] = None
+
+
+class OrderBatchRequest(BaseModel):
+    orders: List[OrderRequest] = Field(..., max_length=1000)
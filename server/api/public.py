@@ -1,29 +1,92 @@
-from fastapi import FastAPI, HTTPException, WebSocket
-from typing import List, Dict, Any
+from fastapi import FastAPI, HTTPException, WebSocket, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse, Response
+from typing import List, Dict, Any, Literal, Mapping
 import asyncio
-from server.connectors import BaseConnector, BinanceConnector, KrakenConnector
+import hashlib
+import json
+import os
+from server.connectors import BaseConnector, connector_registry
 from server.auth.auth_manager import AuthenticationManager
+from server.api.models import KlinesRequest, KlinesBatchRequest, OrderRequest, OrderBatchRequest
 from server.services.websocket_manager import ClientWebSocketManager
 from server.services.subscription_manager import SubscriptionManager
-from server.services.twap_order import TWAPOrder
-from server.services.execute_twap_order import execute_twap_order
+from server.services.execution_scheduler import ExecutionScheduler
+from server.services.order_router import BEST_EXECUTION
+from server.services.loop_monitor import loop_monitor
+from server.services.intervals import interval_to_seconds, is_calendar_interval
+from server.services.market_data_bus import MarketDataBusClient, get_bus_path
+from server.services.shared_store import SharedStateStore
+from server.services.ticker import TickerService
+from server.services.instruments import instrument_table
+from server.services.order_registry import OrderRegistry, SharedOrderFeed, new_order_id, encode_cursor, decode_cursor
+from server.services.rate_limiter import use_priority, PRIORITY_BULK
 from contextlib import asynccontextmanager
 
 
 @asynccontextmanager
 async def startup(app):
-    app.state.subscription_manager = SubscriptionManager()
-    app.state.active_orders = {}  # Pour stocker les ordres TWAP
+    # Imports différés : numpy (portefeuille, klines en colonnes) n'est pas chargé par l'import de server.main
+    from server.services.portfolio import PortfolioLedger
+    from server.services.kline_store import kline_store
+    # Avec plusieurs workers, les carnets viennent du processus market data (server/market_data.py)
+    app.state.subscription_manager = MarketDataBusClient() if get_bus_path() else SubscriptionManager()
+    app.state.active_orders = OrderRegistry()  # Pour stocker les ordres, indexés par utilisateur
+    app.state.shared_store = shared_store
+    # Statuts des ordres des autres workers, pour le canal WebSocket "orders"
+    app.state.order_feed = SharedOrderFeed(shared_store, app.state.active_orders) if shared_store is not None else None
+    app.state.portfolio = PortfolioLedger(store=shared_store)
+    app.state.tickers = TickerService()
+    # Une seule tâche exécute les ordres de tous les algorithmes
+    app.state.scheduler = ExecutionScheduler(shared_store)
     await app.state.subscription_manager.connect()
     asyncio.create_task(app.state.subscription_manager.run())
+    # Les bougies clôturées des flux WS alimentent le cache des klines
+    kline_store.attach(app.state.subscription_manager)
+    # Valorisation des positions au mid consolidé
+    app.state.portfolio.attach(app.state.subscription_manager)
+    app.state.tickers.attach(app.state.subscription_manager)
+    app.state.scheduler.attach(app.state.subscription_manager)
+    scheduler_task = asyncio.create_task(app.state.scheduler.run())
+    order_feed_task = asyncio.create_task(app.state.order_feed.run()) if app.state.order_feed is not None else None
+    portfolio_task = None
+    if shared_store is not None:
+        # Exécutions des workers précédents et des autres workers
+        app.state.portfolio.sync()
+        portfolio_task = asyncio.create_task(app.state.portfolio.run())
+    # Tables des instruments (noms natifs, tick et lot) chargées en tâche de fond
+    for exchange in EXCHANGES:
+        asyncio.create_task(instrument_table.ensure(exchange, EXCHANGES[exchange]))
+
+    # Publication des carnets en mémoire partagée (par le processus market data en multi-worker)
+    shm_publisher = None
+    if os.environ.get("SHM_BOOKS_NAME") and not get_bus_path():
+        # Import différé : le publisher n'est chargé que si la publication est activée
+        from server.services.shm_books import SharedMemoryBookPublisher
+        shm_publisher = SharedMemoryBookPublisher()
+        shm_publisher.attach(app.state.subscription_manager)
+
+    loop_monitor.start()
     yield
+    loop_monitor.stop()
+    scheduler_task.cancel()
+    if order_feed_task is not None:
+        order_feed_task.cancel()
+    if portfolio_task is not None:
+        portfolio_task.cancel()
+        # Exécutions pas encore publiées
+        app.state.portfolio.sync()
+    if shm_publisher is not None:
+        shm_publisher.close()
+    await asyncio.gather(*[connector.close() for connector in connector_registry.loaded("rest").values()])
 
 
 app = FastAPI(lifespan=startup)
-auth_manager = AuthenticationManager()
+# Etat partagé entre workers (tokens, ordres), activé par SHARED_STATE_DB
+shared_store = SharedStateStore.from_env()
+auth_manager = AuthenticationManager(store=shared_store)
 
-# Initialisation des connecteurs d'exchanges
-EXCHANGES: Dict[str, BaseConnector] = {"binance": BinanceConnector(), "kraken": KrakenConnector()}
+# Connecteurs REST des exchanges activés (EXCHANGES, EXCHANGES_CONFIG), créés au premier appel
+EXCHANGES: Mapping[str, BaseConnector] = connector_registry.connectors("rest")
 
 
 @app.post("/auth/login", tags=["Authentication"])
@@ -42,43 +105,258 @@ async def get_supported_exchanges():
     return list(EXCHANGES.keys())
 
 
+def etag_response(request: Request, body: bytes, media_type: str = "application/json") -> Response:
+    """
+    Réponse avec un ETag (empreinte du corps). Si le client possède déjà cette
+    version (If-None-Match), 304 sans corps.
+    """
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type=media_type, headers={"ETag": etag})
+
+
+def json_body(content: Any) -> bytes:
+    return json.dumps(content, separators=(",", ":")).encode()
+
+
 # Routes protégées (authentification requise)
 @app.get("/pairs/{exchange}", response_model=List[str], tags=["Symbols"])
-async def get_trading_pairs(exchange: str):
-    """Obtient les paires de trading disponibles"""
+async def get_trading_pairs(exchange: str, request: Request):
+    """Obtient les paires de trading disponibles (ETag : If-None-Match renvoie 304 si la liste n'a pas changé)"""
     exchange = exchange.lower()
     if exchange not in EXCHANGES:
         raise HTTPException(status_code=400, detail="Exchange non supporté")
     try:
-        return await EXCHANGES[exchange].get_trading_pairs()
+        return etag_response(request, json_body(await EXCHANGES[exchange].get_trading_pairs()))
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/instruments/{exchange}/{symbol}", tags=["Symbols"])
+async def get_instrument(exchange: str, symbol: str):
+    """Instrument canonique : noms natifs REST et WebSocket, tick_size, lot_size, min_quantity"""
+    exchange = exchange.lower()
+    if exchange not in EXCHANGES:
+        raise HTTPException(status_code=400, detail="Exchange non supporté")
+    await instrument_table.ensure(exchange, EXCHANGES[exchange])
+    instrument = instrument_table.get(exchange, symbol.upper())
+    if instrument is None:
+        raise HTTPException(status_code=404, detail=f"Instrument inconnu : {symbol}")
+    return instrument.to_dict()
+
+
 @app.get("/klines/{exchange}/{symbol}", response_model=List[Dict[str, Any]], tags=["Symbols"])
 async def get_klines(
-        exchange: str, symbol: str, interval: str = "1m", limit: int = 10
+        request: Request, exchange: str, symbol: str, interval: str = "1m", limit: int = 10,
+        format: Literal["json", "columnar", "arrow"] = "json",
+        indicators: str = None
 ):
-    """Obtient les données klines"""
+    """
+    Obtient les données klines.
+    format=json : liste de bougies, columnar : une liste par colonne, arrow : Arrow IPC (stream)
+    Les intervalles non fournis par l'exchange (ex: 4h chez Kraken) sont agrégés par le serveur.
+    indicators : indicateurs calculés par le serveur, ex: "sma:20,ema:50,vwap,vol:20"
+    La réponse porte un ETag : If-None-Match renvoie 304 si les bougies n'ont pas changé.
+    """
+    from server.services.kline_columns import columns_to_json, columns_to_records, columns_to_arrow, ARROW_MEDIA_TYPE
+    from server.services.kline_store import kline_store
+    from server.services.indicators import parse_indicators, warmup as indicator_warmup
+
     exchange = exchange.lower()
     if exchange not in EXCHANGES:
         raise HTTPException(status_code=400, detail="Exchange non supporté")
+    connector = EXCHANGES[exchange]
+    try:
+        requested = parse_indicators(indicators) if indicators else []
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
-        return await EXCHANGES[exchange].get_klines(symbol, interval, limit)
+        native = connector.is_native_interval(interval)
+        if format == "json" and native and not requested:
+            return etag_response(request, json_body(await connector.get_klines(symbol, interval, limit)))
+
+        if native and not requested:
+            columns = await connector.get_klines_columns(symbol, interval, limit)
+        else:
+            # Bougies supplémentaires pour amorcer les indicateurs
+            try:
+                interval_seconds = None if is_calendar_interval(interval) else interval_to_seconds(interval)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid interval")
+            warmup = max((indicator_warmup(name, window, interval_seconds) for name, window in requested), default=0)
+            if native and is_calendar_interval(interval):
+                # Mois calendaire : bougies natives, jamais agrégées
+                columns = await connector.get_klines_columns(symbol, interval, limit + warmup)
+            else:
+                columns = await kline_store.get_klines_columns(connector, exchange, symbol, interval, limit + warmup)
+            columns = kline_store.compute_indicators((exchange, symbol.upper(), interval), columns, requested)
+            columns = {name: values[-limit:] for name, values in columns.items()}
+
+        if format == "json":
+            return etag_response(request, json_body(columns_to_records(columns)))
+        if format == "columnar":
+            return etag_response(request, json_body(columns_to_json(columns)))
+        return etag_response(request, columns_to_arrow(columns), ARROW_MEDIA_TYPE)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def fetch_klines_result(index: int, request: KlinesRequest) -> Dict[str, Any]:
+    """Exécute une requête du batch, l'erreur éventuelle est renvoyée dans le résultat"""
+    exchange = request.exchange.lower()
+    result = {"index": index, "exchange": exchange, "symbol": request.symbol, "interval": request.interval}
+    try:
+        if exchange not in EXCHANGES:
+            raise HTTPException(status_code=400, detail="Exchange non supporté")
+        result["klines"] = await EXCHANGES[exchange].get_klines(request.symbol, request.interval, request.limit)
+    except HTTPException as e:
+        result.update(status_code=e.status_code, error=str(e.detail))
+    except Exception as e:
+        result.update(status_code=500, error=str(e))
+    return result
+
+
+@app.post("/klines/batch", tags=["Symbols"])
+async def get_klines_batch(batch: KlinesBatchRequest):
+    """
+    Obtient les klines de plusieurs (exchange, symbole, intervalle, limite) en une requête.
+    Les requêtes sont exécutées en parallèle (dans la limite de chaque exchange) et les
+    résultats sont renvoyés en NDJSON, une ligne par requête, dans l'ordre où ils arrivent.
+    """
+    async def stream():
+        # Téléchargement en masse : servi après les requêtes unitaires et les ordres
+        with use_priority(PRIORITY_BULK):
+            tasks = [asyncio.create_task(fetch_klines_result(i, request)) for i, request in enumerate(batch.requests)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield json.dumps(await next_result) + "\n"
+        finally:
+            # Client déconnecté avant la fin : on abandonne les requêtes restantes
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    manager = ClientWebSocketManager(websocket, auth_manager)
+    manager = ClientWebSocketManager(
+        websocket, auth_manager, portfolio=websocket.app.state.portfolio, orders=websocket.app.state.active_orders,
+        tickers=websocket.app.state.tickers, order_feed=websocket.app.state.order_feed
+    )
     await manager.handle(subscription_manager=websocket.app.state.subscription_manager)
 
 
+def register_order(request: OrderRequest, owner: str):
+    """Valide la requête, crée l'ordre et l'enregistre (sans le démarrer) : (order_id, ordre)"""
+    exchange = request.exchange.lower()
+    if exchange not in EXCHANGES and exchange != BEST_EXECUTION:
+        raise HTTPException(status_code=400, detail="Exchange non supporté")
+
+    if request.side.lower() not in ["buy", "sell"]:
+        raise HTTPException(status_code=400, detail="Side doit être 'buy' ou 'sell'")
+
+    if request.quantity <= 0 or (request.limit_price is not None and request.limit_price <= 0):
+        raise HTTPException(status_code=400, detail="quantity et limit_price doivent être positifs")
+
+    # Paramètres propres à l'algorithme
+    if request.algorithm in ("twap", "vwap"):
+        if not request.slices or request.slices < 1 or not request.duration_seconds or request.duration_seconds <= 0:
+            raise HTTPException(status_code=400, detail="slices et duration_seconds doivent être positifs")
+        parameters = {"slices": request.slices, "duration_seconds": request.duration_seconds}
+    elif request.algorithm == "pov":
+        if request.participation_rate is None or not 0 < request.participation_rate <= 1:
+            raise HTTPException(status_code=400, detail="participation_rate doit être dans ]0, 1]")
+        parameters = {"participation_rate": request.participation_rate}
+    else:
+        if request.display_quantity is None or request.display_quantity <= 0:
+            raise HTTPException(status_code=400, detail="display_quantity doit être positif")
+        if request.limit_price is None:
+            raise HTTPException(status_code=400, detail="limit_price requis pour un ordre iceberg")
+        parameters = {"display_quantity": request.display_quantity}
+
+    # Générer un ID d'ordre
+    if request.token_id:
+        order_id = request.token_id
+        if order_id in app.state.active_orders or (shared_store is not None and shared_store.load_order(order_id)):
+            raise HTTPException(status_code=409, detail=f"L'ordre {order_id} existe déjà")
+    else:
+        order_id = new_order_id()
+
+    # Créer l'ordre
+    from server.services.execution_algorithms import ALGORITHMS
+    order = ALGORITHMS[request.algorithm](
+        subscription_manager=app.state.subscription_manager,
+        exchange=exchange,
+        symbol=request.symbol,
+        side=request.side,
+        quantity=request.quantity,
+        limit_price=request.limit_price,
+        owner=owner,
+        **parameters
+    )
+
+    # Les exécutions alimentent le portefeuille du propriétaire
+    order.fill_listeners.append(app.state.portfolio.on_fill)
+
+    # Stocker l'ordre
+    app.state.active_orders.add(order_id, order)
+    return order_id, order
+
+
+async def start_order(order_id: str, order: "ExecutionAlgorithm"):
+    await order.start()
+    # Le profil de volume (VWAP) est chargé en arrière-plan, l'ordre démarre avec un profil uniforme
+    app.state.scheduler.add(order_id, order, EXCHANGES)
+
+
+async def create_orders(orders: List[OrderRequest], username: str):
+    """
+    Crée plusieurs ordres. Chaque ordre est validé séparément :
+    le résultat contient order_id et status, ou l'erreur de l'ordre refusé.
+    """
+    results = []
+    accepted = []
+    for index, request in enumerate(orders):
+        try:
+            order_id, order = register_order(request, owner=username)
+        except HTTPException as e:
+            results.append({"index": index, "status": "rejected", "status_code": e.status_code, "error": e.detail})
+            continue
+        accepted.append((order_id, order))
+        results.append({"index": index, "order_id": order_id, "status": "accepted"})
+
+    # Une seule transaction pour tout le batch
+    if shared_store is not None and accepted:
+        shared_store.save_orders([(order_id, order.get_status()) for order_id, order in accepted])
+    for order_id, order in accepted:
+        await start_order(order_id, order)
+
+    return results
+
+
+@app.post("/orders", tags=["Orders"])
+async def create_order(request: OrderRequest, token: str):
+    """
+    Crée un ordre exécuté par l'algorithme choisi (twap, vwap, pov, iceberg).
+    Avec exchange="best", chaque tranche est répartie entre les exchanges au meilleur prix net de frais.
+    """
+    username = auth_manager.verify_token(token)
+
+    order_id, order = register_order(request, owner=username)
+    if shared_store is not None:
+        shared_store.save_order(order_id, order.get_status())
+    await start_order(order_id, order)
+
+    return {"order_id": order_id, "algorithm": order.algorithm, "status": "accepted"}
+
+
 @app.post("/orders/twap", tags=["Orders"])
 async def create_twap_order(
         exchange: str,
@@ -95,63 +373,186 @@ async def create_twap_order(
     # Vérifier l'authentification
     username = auth_manager.verify_token(token)
 
-    exchange = exchange.lower()
-    if exchange not in EXCHANGES:
-        raise HTTPException(status_code=400, detail="Exchange non supporté")
+    order_id, order = register_order(OrderRequest(
+        exchange=exchange, symbol=symbol, side=side, quantity=quantity, slices=slices,
+        duration_seconds=duration_seconds, limit_price=limit_price, token_id=token_id
+    ), owner=username)
+    if shared_store is not None:
+        shared_store.save_order(order_id, order.get_status())
+    await start_order(order_id, order)
 
-    if side.lower() not in ["buy", "sell"]:
-        raise HTTPException(status_code=400, detail="Side doit être 'buy' ou 'sell'")
+    return {"order_id": order_id, "status": "accepted"}
 
-    # Générer un ID d'ordre
-    order_id = token_id or f"order_{len(app.state.active_orders) + 1}"
 
-    # Créer l'ordre
-    order = TWAPOrder(
-        subscription_manager=app.state.subscription_manager,
-        exchange=exchange,
-        symbol=symbol,
-        side=side,
-        quantity=quantity,
-        slices=slices,
-        duration_seconds=duration_seconds,
-        limit_price=limit_price
-    )
+@app.post("/orders/batch", tags=["Orders"])
+async def create_orders_batch(batch: OrderBatchRequest, token: str):
+    """Crée plusieurs ordres (tous algorithmes) en une requête, résultat par ordre"""
+    username = auth_manager.verify_token(token)
+    return await create_orders(batch.orders, username)
 
-    # Stocker l'ordre
-    app.state.active_orders[order_id] = order
 
-    # Démarrer l'ordre
-    await order.start()
-    asyncio.create_task(execute_twap_order(app, order_id))
+@app.post("/orders/twap/batch", tags=["Orders"])
+async def create_twap_orders_batch(batch: OrderBatchRequest, token: str):
+    """Crée plusieurs ordres en une requête (algorithme twap par défaut), résultat par ordre"""
+    username = auth_manager.verify_token(token)
+    return await create_orders(batch.orders, username)
 
-    return {"order_id": order_id, "status": "accepted"}
+
+@app.get("/orders", tags=["Orders"])
+async def list_orders(token: str, status: str = None, symbol: str = None, cursor: str = None, limit: int = Query(50, ge=1, le=500)):
+    """
+    Liste les ordres de l'utilisateur, du plus récent au plus ancien, filtrés par statut et/ou symbole.
+    La page suivante s'obtient en repassant next_cursor.
+    """
+    username = auth_manager.verify_token(token)
+    symbol = symbol.upper() if symbol else None
+    try:
+        before = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+    if shared_store is not None:
+        # Le store contient aussi les ordres des autres workers
+        page = shared_store.list_orders(username, status, symbol, before, limit + 1)
+        next_cursor = encode_cursor(page[limit - 1][1]["created_at"], page[limit - 1][0]) if len(page) > limit else None
+        orders = page[:limit]
+    else:
+        page, next_cursor = app.state.active_orders.query(username, status, symbol, cursor, limit)
+        orders = [(order_id, order.get_status()) for order_id, order in page]
+
+    return {
+        "orders": [
+            {"order_id": order_id, **{key: value for key, value in order.items() if key != "executions"}}
+            for order_id, order in orders
+        ],
+        "next_cursor": next_cursor
+    }
+
+
+def find_order(token_id: str, username: str):
+    """(ordre local ou None, dernier statut connu), 404 si l'ordre n'existe pas ou appartient à un autre utilisateur"""
+    order = app.state.active_orders.get(token_id)
+    if order is not None:
+        status = order.get_status()
+    else:
+        # Ordre exécuté par un autre worker
+        status = shared_store.load_order(token_id) if shared_store is not None else None
+    if status is None or status.get("owner") != username:
+        raise HTTPException(status_code=404, detail="Ordre non trouvé")
+    return order, status
 
 
 @app.get("/orders/{token_id}", tags=["Orders"])
 async def get_order_status(token_id: str, token: str):
-    """Récupère le statut d'un ordre TWAP"""
+    """Récupère le statut d'un ordre"""
     # Vérifier l'authentification
     username = auth_manager.verify_token(token)
 
-    if token_id not in app.state.active_orders:
-        raise HTTPException(status_code=404, detail="Ordre non trouvé")
+    _, status = find_order(token_id, username)
+    return status
 
-    return app.state.active_orders[token_id].get_status()
 
+def forward_order_command(token_id: str, status: Dict[str, Any], command: Dict[str, Any]):
+    """Transmet la commande au worker qui exécute l'ordre (mode multi-worker)"""
+    if status["status"] != "active":
+        raise HTTPException(status_code=409, detail=f"Ordre déjà terminé ({status['status']})")
+    shared_store.push_order_command(token_id, command)
+    return {"order_id": token_id, "status": f"{command['action']}_requested"}
 
-async def execute_twap_order(app, order_id: str):
-    """Exécute un ordre TWAP"""
-    order = app.state.active_orders[order_id]
 
-    try:
-        while order.status == "active":
-            await order.execute_slice()
-            await asyncio.sleep(order.interval_seconds)
-    except Exception as e:
-        order.status = "error"
+@app.delete("/orders/{token_id}", tags=["Orders"])
+async def cancel_order(token_id: str, token: str):
+    """Annule un ordre en cours, son abonnement au carnet est libéré immédiatement"""
+    username = auth_manager.verify_token(token)
+
+    order, status = find_order(token_id, username)
+    if order is None:
+        return forward_order_command(token_id, status, {"action": "cancel"})
+    if not await order.cancel():
+        raise HTTPException(status_code=409, detail=f"Ordre déjà terminé ({order.status})")
+    if shared_store is not None:
+        shared_store.save_order(token_id, order.get_status())
+    return order.get_status()
+
+
+@app.patch("/orders/{token_id}", tags=["Orders"])
+async def amend_order(token_id: str, token: str, limit_price: float = None, remaining_duration_seconds: float = None):
+    """Modifie le prix limite et/ou la durée restante (TWAP, VWAP) d'un ordre en cours"""
+    username = auth_manager.verify_token(token)
+
+    if limit_price is None and remaining_duration_seconds is None:
+        raise HTTPException(status_code=400, detail="limit_price ou remaining_duration_seconds requis")
+    if (limit_price is not None and limit_price <= 0) or (remaining_duration_seconds is not None and remaining_duration_seconds <= 0):
+        raise HTTPException(status_code=400, detail="limit_price et remaining_duration_seconds doivent être positifs")
+
+    order, status = find_order(token_id, username)
+    if order is None:
+        return forward_order_command(token_id, status, {
+            "action": "amend", "limit_price": limit_price, "remaining_duration_seconds": remaining_duration_seconds
+        })
+    if not order.amend(limit_price, remaining_duration_seconds):
+        raise HTTPException(status_code=409, detail=f"Ordre déjà terminé ({order.status})")
+    if shared_store is not None:
+        shared_store.save_order(token_id, order.get_status())
+    return order.get_status()
+
+
+@app.get("/portfolio", tags=["Portfolio"])
+async def get_portfolio(token: str):
+    """Positions, cash et PnL (réalisé, et latent au mid consolidé) de l'utilisateur"""
+    username = auth_manager.verify_token(token)
+    return app.state.portfolio.get_portfolio(username)
+
+
+@app.get("/admin/loop/stats", tags=["Admin"])
+async def get_loop_stats(token: str):
+    """Statistiques du profileur de boucle : lag, sections lentes et leurs piles"""
+    auth_manager.verify_admin(token)
+    return loop_monitor.get_stats()
+
+
+@app.get("/admin/loop/profile", response_class=PlainTextResponse, tags=["Admin"])
+async def dump_loop_profile(token: str, reset: bool = False):
+    """Exporte le profil échantillonné au format folded (flamegraph.pl, speedscope)"""
+    auth_manager.verify_admin(token)
+    if not loop_monitor.enabled:
+        raise HTTPException(status_code=409, detail="Profiling désactivé (LOOP_PROFILING=1 pour l'activer)")
+    profile = loop_monitor.dump_folded()
+    if reset:
+        loop_monitor.reset()
+    return profile
+
+
+
+@app.get("/admin/ws/clients", tags=["Admin"])
+async def get_ws_clients_stats(token: str):
+    """Etat des files sortantes des clients WebSocket (attente, conflation, pertes)"""
+    auth_manager.verify_admin(token)
+    return [client.get_stats() for client in ClientWebSocketManager.clients]
+
+
+@app.get("/admin/portfolio", tags=["Admin"])
+async def get_portfolio_totals(token: str):
+    """PnL de tous les utilisateurs"""
+    auth_manager.verify_admin(token)
+    return app.state.portfolio.get_totals()
+
+
+@app.get("/admin/execution", tags=["Admin"])
+async def get_execution_stats(token: str):
+    """Etat de l'ordonnanceur d'exécution : ordres suivis, échéances, passages"""
+    auth_manager.verify_admin(token)
+    return app.state.scheduler.get_stats()
+
+
+@app.get("/admin/exchanges/limits", tags=["Admin"])
+async def get_exchange_limits(token: str):
+    """Budget de requêtes REST de chaque exchange déjà utilisé : poids disponible, file d'attente, requêtes fusionnées"""
+    auth_manager.verify_admin(token)
+    return {exchange: connector.get_limiter_stats() for exchange, connector in connector_registry.loaded("rest").items()}
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("public:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("public:app", host="0.0.0.0", port=8000, reload=True)
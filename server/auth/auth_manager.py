@@ -1,28 +1,47 @@
 from fastapi import HTTPException
 from werkzeug.security import check_password_hash
 import secrets
-from typing import Optional
-from .credentials import users
+from typing import Dict, Optional
+from .credentials import load_users, admin_users
+from server.services.shared_store import SharedStateStore, SharedTokens
 
 
 class AuthenticationManager:
-    def __init__(self):
-        # Charge la config des users depuis le fichier credentials.py
-        self.users = users
-        # Dict pour stocker les tokens de chaque user
-        self.tokens = {}
+    def __init__(self, store: SharedStateStore = None):
+        # La config des users est chargée depuis credentials.py au premier accès
+        self._users = None
+        self.admin_users = set(admin_users)
+        # Dict pour stocker les tokens de chaque user (partagé entre workers si un store est fourni)
+        self.store = store
+        self.tokens = SharedTokens(store) if store is not None else {}
+        # Token -> user, pour vérifier un token sans parcourir les tokens (mode mono-process)
+        self.token_users: Dict[str, str] = {}
         # Set pour garder la trace des tokens qui ne sont plus valides
         self.revoked_tokens = set()
 
+    @property
+    def users(self):
+        if self._users is None:
+            self._users = load_users()
+        return self._users
+
     def authenticate_user(self, username: str, password: str) -> Optional[str]:
         # Check si l'user existe et si son mot de passe est bon
         if username in self.users and check_password_hash(self.users[username], password):
             # On regarde si l'user a déjà un token, sinon on en fait un nouveau
-            if username not in self.tokens:
-                self.tokens[username] = secrets.token_urlsafe(32)
-            return self.tokens[username]
+            if self.store is not None:
+                # Atomique entre les workers : le premier token enregistré est gardé
+                return self.store.get_or_create_token(username, secrets.token_urlsafe(32))
+            token = self.tokens.setdefault(username, secrets.token_urlsafe(32))
+            self.token_users[token] = username
+            return token
         return None
 
+    def username_for_token(self, token: str) -> Optional[str]:
+        if self.store is not None:
+            return self.store.get_username(token)
+        return self.token_users.get(token)
+
     def verify_token(self, token: str, raise_http=True) -> str:
         # Première vérif basique
         if not token:
@@ -32,9 +51,16 @@ class AuthenticationManager:
         if token in self.revoked_tokens:
             raise HTTPException(status_code=401, detail="Ce token a été révoqué") if raise_http else Exception("Ce token a été révoqué")
 
-        # On parcourt les tokens actifs pour trouver l'user correspondant
-        for username, stored_token in self.tokens.items():
-            if stored_token == token:
-                return username
+        # Recherche de l'user par son token (index, pas de parcours des tokens actifs)
+        username = self.username_for_token(token)
+        if username is not None:
+            return username
+
+        raise (HTTPException(status_code=401, detail="Token invalide") if raise_http else Exception("Token invalide"))
 
-        raise (HTTPException(status_code=401, detail="Token invalide") if raise_http else Exception("Token invalide"))
\ No newline at end of file
+    def verify_admin(self, token: str) -> str:
+        # Même vérif que verify_token, puis on check que l'user est admin
+        username = self.verify_token(token)
+        if username not in self.admin_users:
+            raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs")
+        return username
\ No newline at end of file
@@ -6,9 +6,14 @@ config = configparser.ConfigParser()
 config.read('server/auth/config.ini')
 
 file_path = config['DEFAULT']['file_path']
+# Utilisateurs autorisés à accéder aux endpoints d'administration
+admin_users = [name.strip() for name in config['DEFAULT'].get('admin_users', '').split(',') if name.strip()]
 
-if not os.path.exists(file_path):
-    raise FileNotFoundError('The file does not exist, please create it first using the create_users.py script.')
 
-with open(file_path, 'r') as file:
-    users = json.load(file)
\ No newline at end of file
+def load_users():
+    # Lecture différée du fichier d'users, au premier login plutôt qu'à l'import
+    if not os.path.exists(file_path):
+        raise FileNotFoundError('The file does not exist, please create it first using the create_users.py script.')
+
+    with open(file_path, 'r') as file:
+        return json.load(file)
\ No newline at end of file
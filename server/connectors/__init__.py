@@ -1,3 +1,15 @@
 from .base_connector import BaseConnector
-from .binance import BinanceConnector
-from .kraken import KrakenConnector
\ No newline at end of file
+from .registry import ConnectorRegistry, ExchangeSpec, connector_registry
+
+# Import différé : le module d'un exchange n'est chargé que s'il est utilisé
+_LAZY_EXPORTS = {
+    "BinanceConnector": "server.connectors.binance:BinanceConnector",
+    "KrakenConnector": "server.connectors.kraken:KrakenConnector",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from .registry import load_object
+        return load_object(_LAZY_EXPORTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,18 +1,111 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Set, Callable, Tuple
 import websockets
+import aiohttp
+import asyncio
+from server.services.loop_monitor import loop_monitor
+from server.services.intervals import interval_to_seconds, is_calendar_interval
+from server.services.rate_limiter import TokenBucket, RequestCoalescer
 
 
 class BaseConnector(ABC):
+
+    # Nombre maximum de requêtes REST simultanées vers l'exchange
+    max_concurrent_requests = 5
+    # Facteur de conversion des timestamps de l'exchange en nanosecondes
+    timestamp_unit_ns = 1
+    # Position de open, high, low, close, volume dans une kline brute
+    kline_value_indices = (1, 2, 3, 4, 5)
+    # Intervalles de klines natifs de l'exchange, en secondes
+    supported_intervals: List[int] = []
+    # Intervalles calendaires natifs (ex: "1M"), transmis tels quels et jamais agrégés
+    calendar_intervals: List[str] = []
+    # Budget de poids des requêtes REST : capacité du seau et remplissage par seconde
+    rate_limit_capacity = 10
+    rate_limit_per_second = 1.0
+    # Frais taker du premier palier, en fraction du montant exécuté
+    taker_fee_rate = 0.0
     
     def __init__(self, exchange_name: str, rest_url: str):
         self.exchange_name = exchange_name
         self.rest_url = rest_url
+        self.request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        self.rate_limiter = TokenBucket(self.rate_limit_capacity, self.rate_limit_per_second)
+        self.coalescer = RequestCoalescer()
+        self._session = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Session HTTP partagée par toutes les requêtes vers l'exchange"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def request_weight(self, path: str, params: Dict[str, Any]) -> float:
+        """Poids d'une requête dans le budget de l'exchange"""
+        return 1
+
+    def on_response(self, response: aiohttp.ClientResponse):
+        """Appelé à chaque réponse, pour lire les en-têtes de limite propres à l'exchange"""
+        pass
+
+    async def request_json(self, path: str, params: Dict[str, Any] = None) -> Any:
+        """
+        GET {rest_url}/{path} en respectant le budget de l'exchange.
+        Les requêtes identiques en cours sont fusionnées.
+        """
+        params = params or {}
+        key = (path, tuple(sorted(params.items())))
+        return await self.coalescer.run(key, lambda: self._request_json(path, dict(params)))
+
+    async def _request_json(self, path: str, params: Dict[str, Any]) -> Any:
+        await self.rate_limiter.acquire(self.request_weight(path, params))
+        session = await self.get_session()
+        async with self.request_semaphore:
+            async with session.get(f"{self.rest_url}/{path}", params=params) as response:
+                self.on_response(response)
+                if response.status in (418, 429):
+                    # Limite dépassée : on suspend toutes les requêtes vers l'exchange
+                    self.rate_limiter.penalize(float(response.headers.get("Retry-After", 60)))
+                response.raise_for_status()
+                return await response.json()
+
+    def get_limiter_stats(self) -> Dict[str, Any]:
+        return {**self.rate_limiter.get_stats(), **self.coalescer.get_stats()}
 
     @abstractmethod
-    async def get_klines(self, symbol: str, interval: str, limit: int) -> List[Dict[str, Any]]:
+    async def fetch_klines(self, symbol: str, interval: str, limit: int) -> List[List[Any]]:
+        """Klines brutes, telles que renvoyées par l'exchange"""
         pass
 
+    async def get_klines(self, symbol: str, interval: str, limit: int) -> List[Dict[str, Any]]:
+        return self.standardize_klines(await self.fetch_klines(symbol, interval, limit))
+
+    async def get_klines_columns(self, symbol: str, interval: str, limit: int) -> Dict[str, Any]:
+        """Klines en colonnes NumPy (timestamp en ns, open, high, low, close, volume)"""
+        # Import différé : numpy n'est chargé qu'au premier appel
+        from server.services.kline_columns import klines_to_columns
+        raw_data = await self.fetch_klines(symbol, interval, limit)
+        return klines_to_columns(raw_data, self.timestamp_unit_ns, self.kline_value_indices)
+
+    def is_native_interval(self, interval: str) -> bool:
+        """True si l'exchange fournit directement cet intervalle (sinon il est dérivé par agrégation)"""
+        if is_calendar_interval(interval):
+            return interval.strip() in self.calendar_intervals
+        try:
+            return interval_to_seconds(interval) in self.supported_intervals
+        except ValueError:
+            # Notation propre à l'exchange, transmise telle quelle
+            return True
+
+    async def load_instruments(self) -> List[Any]:
+        """Instruments de l'exchange (symbole canonique, noms natifs, tick et lot) pour la table des instruments"""
+        return []
+
     @abstractmethod
     async def get_trading_pairs(self) -> List[str]:
         pass
@@ -22,12 +115,23 @@ class BaseConnector(ABC):
     
     
 class BaseExchangeWSConnection(ABC):
+
+    # Intervalles des flux de klines, en secondes
+    kline_intervals: List[int] = []
+
     def __init__(self, exchange: str, websocket_url: str):
         self.exchange = exchange
         self.websocket_url = websocket_url
         self.ws = None
         self.subscribed_symbols: Set[str] = set()
         self.order_book = {}
+        # Callbacks appelés à chaque mise à jour de carnet : callback(symbol, order_book)
+        self.book_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        # Dernière bougie reçue par (symbole, intervalle)
+        self.klines: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.subscribed_klines: Set[Tuple[str, str]] = set()
+        # Callbacks appelés à chaque bougie : callback(symbol, interval, kline, closed)
+        self.kline_listeners: List[Callable[[str, str, Dict[str, Any], bool], None]] = []
         print("Instanciating Exchange Connection")
 
     async def connect(self): 
@@ -40,9 +144,31 @@ class BaseExchangeWSConnection(ABC):
     async def unsubscribe_symbol(self, symbol: str):
         pass
 
+    async def subscribe_klines(self, symbol: str, interval: str):
+        pass
+
+    async def unsubscribe_klines(self, symbol: str, interval: str):
+        pass
+
     async def listen(self):
+        message = await self.ws.recv()
+        with loop_monitor.section(f"{self.exchange}.listen"):
+            self.handle_message(message)
+
+    def handle_message(self, message: str):
         pass
 
+    def update_order_book(self, symbol: str, standardized: Dict[str, Any]):
+        self.order_book[symbol] = standardized
+        for listener in self.book_listeners:
+            listener(symbol, standardized)
+
+    def update_kline(self, symbol: str, interval: str, kline: Dict[str, Any], closed: bool):
+        """kline : bougie standardisée (timestamp en ns, open, high, low, close, volume)"""
+        self.klines[(symbol, interval)] = kline
+        for listener in self.kline_listeners:
+            listener(symbol, interval, kline, closed)
+
     async def run(self):
         while True:
             await self.listen()
\ No newline at end of file
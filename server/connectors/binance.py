@@ -1,21 +1,31 @@
 import aiohttp
 from typing import List, Dict, Any
 from server.connectors.base_connector import BaseConnector, BaseExchangeWSConnection
-import datetime as dt
-import pandas as pd
+from server.services.instruments import instrument_table, parse_binance_exchange_info
 import json
 import asyncio
 
 class BinanceConnector(BaseConnector):
 
-    def __init__(self):
+    timestamp_unit_ns = 1_000_000
+    max_concurrent_requests = 10
+    # Intervalles de klines natifs, en secondes
+    supported_intervals = [1, 60, 180, 300, 900, 1800, 3600, 7200, 14400, 21600, 28800, 43200, 86400, 259200, 604800]
+    # Mois calendaire, transmis tel quel
+    calendar_intervals = ["1M"]
+    # 6000 de poids par minute et par IP
+    rate_limit_capacity = 6000
+    rate_limit_per_second = 100.0
+    request_weights = {"klines": 2, "exchangeInfo": 20}
+    taker_fee_rate = 0.001
+
+    def __init__(self, rest_url: str = "https://api.binance.com/api/v3"):
         super().__init__(
             exchange_name="Binance",
-            rest_url="https://api.binance.com/api/v3"
+            rest_url=rest_url
         )
 
-    async def get_klines(self, symbol: str, interval: str, limit: int) -> List[Dict[str, Any]]:
-        url = f"{self.rest_url}/klines"
+    async def fetch_klines(self, symbol: str, interval: str, limit: int) -> List[List[Any]]:
         params = {
             "symbol": symbol,
             "interval": interval,
@@ -24,26 +34,34 @@ class BinanceConnector(BaseConnector):
         
         klines = []
 
-        async with aiohttp.ClientSession() as session:
-            while len(klines) < limit:
-                async with session.get(url, params=params) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    if not data:
-                        break
-                    klines = data + klines
-                    if len(data) < 1000:
-                        break
-                    params["endTime"] = data[0][0]-1
+        while len(klines) < limit:
+            data = await self.request_json("klines", params)
+            if not data:
+                break
+            klines = data + klines
+            if len(data) < 1000:
+                break
+            params["endTime"] = data[0][0]-1
                     
-        return self.standardize_klines(klines[:limit])
+        return klines[:limit]
+
+    async def load_instruments(self):
+        return parse_binance_exchange_info(await self.request_json("exchangeInfo"))
 
     async def get_trading_pairs(self) -> List[str]:
-        url = f"{self.rest_url}/exchangeInfo"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                data = await response.json()
-                return [symbol_info["symbol"] for symbol_info in data["symbols"]]
+        await instrument_table.ensure("binance", self)
+        if not instrument_table.loaded("binance"):
+            return [instrument.symbol for instrument in await self.load_instruments()]
+        return instrument_table.symbols("binance")
+
+    def request_weight(self, path: str, params: Dict[str, Any]) -> float:
+        return self.request_weights.get(path, 1)
+
+    def on_response(self, response: aiohttp.ClientResponse):
+        # Poids consommé par l'IP sur la minute en cours, tous process confondus
+        used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M")
+        if used_weight is not None:
+            self.rate_limiter.sync_used_weight(float(used_weight))
     
     def standardize_klines(self, raw_data):
         return [
@@ -60,8 +78,11 @@ class BinanceConnector(BaseConnector):
     
 
 class BinanceWSConnection(BaseExchangeWSConnection):
-    def __init__(self):
-        super().__init__("Binance", "wss://stream.binance.com/stream")
+
+    kline_intervals = BinanceConnector.supported_intervals
+
+    def __init__(self, websocket_url: str = "wss://stream.binance.com/stream"):
+        super().__init__("Binance", websocket_url)
 
     async def subscribe_symbol(self, symbol: str):
         symbol = symbol.replace("/", "").lower()
@@ -90,9 +111,28 @@ class BinanceWSConnection(BaseExchangeWSConnection):
         self.subscribed_symbols.remove(symbol)
         print(f"[Binance] Unsubscribed from {symbol}")
 
-    async def listen(self):
-        message = await self.ws.recv()
+    async def subscribe_klines(self, symbol: str, interval: str):
+        if (symbol, interval) in self.subscribed_klines:
+            return
+        stream = f"{symbol.replace('/', '').lower()}@kline_{interval}"
+        await self.ws.send(json.dumps({"method": "SUBSCRIBE", "params": [stream], "id": symbol.lower()}))
+        self.subscribed_klines.add((symbol, interval))
+        print(f"[Binance] Subscribed to {stream}")
+
+    async def unsubscribe_klines(self, symbol: str, interval: str):
+        if (symbol, interval) not in self.subscribed_klines:
+            return
+        stream = f"{symbol.replace('/', '').lower()}@kline_{interval}"
+        await self.ws.send(json.dumps({"method": "UNSUBSCRIBE", "params": [stream], "id": symbol.lower()}))
+        self.subscribed_klines.remove((symbol, interval))
+        self.klines.pop((symbol, interval), None)
+        print(f"[Binance] Unsubscribed from {stream}")
+
+    def handle_message(self, message: str):
         parsed_message = json.loads(message)
+        if "@kline_" in parsed_message.get("stream", ""):
+            self.handle_kline(parsed_message["data"]["k"])
+            return
         if not "depth10" in parsed_message.get("stream", ""): return
         symbol = parsed_message["stream"].split("@")[0].upper()
         data = parsed_message.get("data")
@@ -102,4 +142,16 @@ class BinanceWSConnection(BaseExchangeWSConnection):
             "bids": [[float(price), float(quantity)] for price, quantity in data.get("bids", [])][:10],
             "asks": [[float(price), float(quantity)] for price, quantity in data.get("asks", [])][:10],
         }
-        self.order_book[symbol] = standardized
+        self.update_order_book(symbol, standardized)
+
+    def handle_kline(self, kline: Dict[str, Any]):
+        """Bougie en cours (x = false) ou clôturée (x = true) du flux <symbol>@kline_<interval>"""
+        standardized = {
+            "timestamp": kline["t"] * 1000000,
+            "open": float(kline["o"]),
+            "high": float(kline["h"]),
+            "low": float(kline["l"]),
+            "close": float(kline["c"]),
+            "volume": float(kline["v"]),
+        }
+        self.update_kline(kline["s"].upper(), kline["i"], standardized, kline["x"])
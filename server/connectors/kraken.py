@@ -1,58 +1,71 @@
 import aiohttp
 from typing import List, Dict, Any
 from server.connectors.base_connector import BaseConnector, BaseExchangeWSConnection
-from server.services.formatters import format_kraken, format_base
-import pandas as pd
+from server.services.instruments import instrument_table, parse_kraken_asset_pairs
+from server.services.intervals import interval_to_minutes, format_interval
 from fastapi import HTTPException
 import json
 
 
 class KrakenConnector(BaseConnector):
 
-    def __init__(self):
+    timestamp_unit_ns = 1_000_000_000
+    # OHLC Kraken : [time, open, high, low, close, vwap, volume, count]
+    kline_value_indices = (1, 2, 3, 4, 6)
+    # Limites publiques de Kraken plus strictes que celles de Binance
+    max_concurrent_requests = 3
+    # Compteur public : environ une requête par seconde, rafales de 15
+    rate_limit_capacity = 15
+    rate_limit_per_second = 1.0
+    taker_fee_rate = 0.0026
+    # Intervalles acceptés par OHLC, en secondes
+    supported_intervals = [minutes * 60 for minutes in [1, 5, 15, 30, 60, 240, 1440, 10080, 21600]]
+
+    def __init__(self, rest_url: str = "https://api.kraken.com/0/public"):
         super().__init__(
-            exchange_name="Kraken", rest_url="https://api.kraken.com/0/public"
+            exchange_name="Kraken", rest_url=rest_url
         )
 
-    async def get_klines(
+    async def fetch_klines(
         self, symbol: str, interval: str, limit: int
-    ) -> List[Dict[str, Any]]:
+    ) -> List[List[Any]]:
         
-        url = f"{self.rest_url}/OHLC"
-
-        interval_in_minutes = pd.to_timedelta(interval).seconds // 60
+        try:
+            interval_in_minutes = interval_to_minutes(interval)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid interval")
 
-        if not interval_in_minutes in [1, 5, 15, 30, 60, 240, 1440, 10080, 21600]:
+        if not interval_in_minutes * 60 in self.supported_intervals:
             raise HTTPException(status_code=400, detail="Invalid interval")
 
         params = {
-            "pair": symbol,
+            "pair": instrument_table.to_native("kraken", symbol),
             "interval": interval_in_minutes,
             "count": min(limit, 720),
         }
         klines = []
 
-        async with aiohttp.ClientSession() as session:
-            while len(klines) < limit:
-                async with session.get(url, params=params) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    if not data or "error" in data and data["error"]:
-                        raise HTTPException(status_code=400, detail=data["error"])
-                    pair_data = data["result"][list(data["result"].keys())[0]]
-                    klines = pair_data + klines
-                    if len(pair_data) < 720:
-                        break
-                    params["since"] = pair_data[0][0]
-
-        return self.standardize_klines(klines[:limit])
+        while len(klines) < limit:
+            data = await self.request_json("OHLC", params)
+            if not data or "error" in data and data["error"]:
+                raise HTTPException(status_code=400, detail=data["error"])
+            pair_data = data["result"][list(data["result"].keys())[0]]
+            klines = pair_data + klines
+            if len(pair_data) < 720:
+                break
+            params["since"] = pair_data[0][0]
+
+        return klines[:limit]
+
+    async def load_instruments(self):
+        return parse_kraken_asset_pairs(await self.request_json("AssetPairs"))
 
     async def get_trading_pairs(self) -> List[str]:
-        url = f"{self.rest_url}/AssetPairs"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                data = await response.json()
-                return data["result"].keys()
+        """Symboles canoniques (BTCUSD, DOTUSD, USDCUSDT...), comparables à ceux de Binance"""
+        await instrument_table.ensure("kraken", self)
+        if not instrument_table.loaded("kraken"):
+            return [instrument.symbol for instrument in await self.load_instruments()]
+        return instrument_table.symbols("kraken")
 
     def standardize_klines(self, raw_data):
         return [
@@ -62,22 +75,27 @@ class KrakenConnector(BaseConnector):
                 "high": float(entry[2]),
                 "low": float(entry[3]),
                 "close": float(entry[4]),
-                "volume": float(entry[5]),
+                "volume": float(entry[6]),
             }
             for entry in raw_data
         ]
 
 
 class KrakenWSConnection(BaseExchangeWSConnection):
-    def __init__(self):
-        super().__init__("Kraken", "wss://ws.kraken.com")
+
+    kline_intervals = KrakenConnector.supported_intervals
+
+    def __init__(self, websocket_url: str = "wss://ws.kraken.com"):
+        super().__init__("Kraken", websocket_url)
 
     async def subscribe_symbol(self, symbol: str):
         if symbol in self.subscribed_symbols:
             return
+        # Noms natifs exacts (DOT/USD, USDC/USDT...) dès la première souscription
+        await instrument_table.ensure("kraken")
         subscribe_msg = {
             "event": "subscribe",
-            "pair": [format_kraken(symbol)],
+            "pair": [instrument_table.to_native("kraken", symbol, ws=True)],
             "subscription": {"name": "book", "depth": 10},
         }
         await self.ws.send(json.dumps(subscribe_msg))
@@ -89,19 +107,70 @@ class KrakenWSConnection(BaseExchangeWSConnection):
             return
         unsubscribe_msg = {
             "event": "unsubscribe",
-            "pair": [format_kraken(symbol)],
+            "pair": [instrument_table.to_native("kraken", symbol, ws=True)],
             "subscription": {"name": "book"},
         }
         await self.ws.send(json.dumps(unsubscribe_msg))
         self.subscribed_symbols.remove(symbol)
         print(f"[Kraken] Unsubscribed from {symbol}")
 
-    async def listen(self):
-        message = await self.ws.recv()
+    async def subscribe_klines(self, symbol: str, interval: str):
+        if (symbol, interval) in self.subscribed_klines:
+            return
+        # Noms natifs exacts (DOT/USD, USDC/USDT...) dès la première souscription
+        await instrument_table.ensure("kraken")
+        subscribe_msg = {
+            "event": "subscribe",
+            "pair": [instrument_table.to_native("kraken", symbol, ws=True)],
+            "subscription": {"name": "ohlc", "interval": interval_to_minutes(interval)},
+        }
+        await self.ws.send(json.dumps(subscribe_msg))
+        self.subscribed_klines.add((symbol, interval))
+        print(f"[Kraken] Subscribed to {symbol} ohlc {interval}")
+
+    async def unsubscribe_klines(self, symbol: str, interval: str):
+        if (symbol, interval) not in self.subscribed_klines:
+            return
+        unsubscribe_msg = {
+            "event": "unsubscribe",
+            "pair": [instrument_table.to_native("kraken", symbol, ws=True)],
+            "subscription": {"name": "ohlc", "interval": interval_to_minutes(interval)},
+        }
+        await self.ws.send(json.dumps(unsubscribe_msg))
+        self.subscribed_klines.remove((symbol, interval))
+        self.klines.pop((symbol, interval), None)
+        print(f"[Kraken] Unsubscribed from {symbol} ohlc {interval}")
+
+    def handle_ohlc(self, data: List[Any]):
+        """
+        [channelID, [time, etime, open, high, low, close, vwap, volume, count], "ohlc-<minutes>", pair]
+        Kraken n'indique pas la clôture : une bougie est clôturée quand la suivante commence.
+        """
+        minutes = int(data[2].split("-")[1])
+        interval = format_interval(minutes * 60)
+        symbol = instrument_table.to_symbol("kraken", data[3])
+        _, end_time, open_, high, low, close, _, volume, _ = data[1]
+        kline = {
+            "timestamp": (int(float(end_time)) - minutes * 60) * 1000000000,
+            "open": float(open_),
+            "high": float(high),
+            "low": float(low),
+            "close": float(close),
+            "volume": float(volume),
+        }
+        previous = self.klines.get((symbol, interval))
+        if previous is not None and previous["timestamp"] < kline["timestamp"]:
+            self.update_kline(symbol, interval, previous, True)
+        self.update_kline(symbol, interval, kline, False)
+
+    def handle_message(self, message: str):
         data = json.loads(message)
+        if isinstance(data, list) and len(data) == 4 and str(data[2]).startswith("ohlc-"):
+            self.handle_ohlc(data)
+            return
         if isinstance(data, list) and len(data) > 1:
             update = data[1]
-            symbol = format_base(data[3])
+            symbol = instrument_table.to_symbol("kraken", data[3])
             if "as" in update or "bs" in update:
                 standardized = {
                     "exchange": "Kraken",
@@ -115,4 +184,4 @@ class KrakenWSConnection(BaseExchangeWSConnection):
                         for price, quantity, _ in update.get("as", [])
                     ][:10],
                 }
-                self.order_book[symbol] = standardized
\ No newline at end of file
+                self.update_order_book(symbol, standardized)
\ No newline at end of file
@@ -0,0 +1,189 @@
+import configparser
+import importlib
+import os
+from importlib.metadata import entry_points
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+# Groupe d'entry points des paquets qui ajoutent un exchange :
+#   [project.entry-points."cryptoapi.exchanges"]
+#   coinbase = "cryptoapi_coinbase:SPEC"
+ENTRY_POINT_GROUP = "cryptoapi.exchanges"
+
+
+def load_object(path: str) -> Any:
+    """'package.module:Classe' -> objet (le module n'est importé qu'ici)"""
+    module, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+class ExchangeSpec:
+    """
+    Déclaration d'un exchange : classes des connecteurs REST et WebSocket, en
+    chemins "module:Classe" importés au premier usage, et options passées à
+    leur constructeur (ex: rest_url, websocket_url pour un testnet ou un simulateur).
+    taker_fee remplace les frais taker de la classe REST (ex: compte à frais réduits).
+    """
+
+    def __init__(self, name: str, rest: str, ws: str, rest_options: Dict[str, Any] = None, ws_options: Dict[str, Any] = None,
+                 taker_fee: Optional[float] = None):
+        self.name = name.lower()
+        self.rest = rest
+        self.ws = ws
+        self.rest_options = rest_options or {}
+        self.ws_options = ws_options or {}
+        self.taker_fee = taker_fee
+
+
+BUILTIN_EXCHANGES = [
+    ExchangeSpec("binance", "server.connectors.binance:BinanceConnector", "server.connectors.binance:BinanceWSConnection"),
+    ExchangeSpec("kraken", "server.connectors.kraken:KrakenConnector", "server.connectors.kraken:KrakenWSConnection"),
+]
+
+
+class ConnectorRegistry:
+    """
+    Registre unique des exchanges : connecteurs REST (klines, paires) et
+    WebSocket (carnets, bougies).
+
+    Seuls les exchanges activés sont exposés, et un connecteur n'est importé et
+    instancié qu'au premier accès : un exchange non utilisé par un déploiement
+    ne coûte ni import, ni session HTTP, ni connexion WebSocket.
+    """
+
+    def __init__(self, specs: Iterable[ExchangeSpec] = (), enabled: Optional[List[str]] = None):
+        self.specs: Dict[str, ExchangeSpec] = {}
+        self.taker_fees: Dict[str, float] = {}
+        for spec in specs:
+            self.register(spec)
+        self.enabled = [name.lower() for name in enabled] if enabled is not None else None
+        self.instances: Dict[str, Dict[str, Any]] = {"rest": {}, "ws": {}}
+
+    def register(self, spec: ExchangeSpec):
+        """Ajoute ou remplace un exchange"""
+        self.specs[spec.name] = spec
+        self.taker_fees.pop(spec.name, None)
+
+    def taker_fee(self, name: str) -> float:
+        """Frais taker de name : ceux de sa déclaration, sinon ceux de sa classe REST (importée, pas instanciée), 0 si inconnu"""
+        fee = self.taker_fees.get(name)
+        if fee is None:
+            spec = self.specs.get(name)
+            if spec is None:
+                return 0.0
+            fee = spec.taker_fee if spec.taker_fee is not None else getattr(load_object(spec.rest), "taker_fee_rate", 0.0)
+            self.taker_fees[name] = fee
+        return fee
+
+    @property
+    def names(self) -> List[str]:
+        """Exchanges activés, dans l'ordre de la configuration"""
+        if self.enabled is None:
+            return list(self.specs)
+        return [name for name in self.enabled if name in self.specs]
+
+    def get(self, kind: str, name: str) -> Any:
+        """Connecteur "rest" ou "ws" de name, créé au premier appel"""
+        instances = self.instances[kind]
+        connector = instances.get(name)
+        if connector is None:
+            if name not in self.names:
+                raise KeyError(name)
+            spec = self.specs[name]
+            options = spec.rest_options if kind == "rest" else spec.ws_options
+            connector = instances[name] = load_object(spec.rest if kind == "rest" else spec.ws)(**options)
+        return connector
+
+    def rest(self, name: str):
+        return self.get("rest", name)
+
+    def ws(self, name: str):
+        return self.get("ws", name)
+
+    def loaded(self, kind: str) -> Dict[str, Any]:
+        """Connecteurs déjà instanciés (sans en créer)"""
+        return dict(self.instances[kind])
+
+    def connectors(self, kind: str) -> "LazyConnectors":
+        return LazyConnectors(self, kind)
+
+    @classmethod
+    def from_env(cls) -> "ConnectorRegistry":
+        """
+        Exchanges intégrés, puis ceux des entry points "cryptoapi.exchanges", puis ceux du
+        fichier EXCHANGES_CONFIG ; EXCHANGES (ex: "binance,kraken") restreint ceux qui sont activés.
+        """
+        enabled = os.environ.get("EXCHANGES")
+        enabled = [name.strip() for name in enabled.split(",") if name.strip()] if enabled else None
+        registry = cls(BUILTIN_EXCHANGES, enabled)
+
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            # Le paquet d'un exchange désactivé n'est pas importé
+            if enabled is not None and entry_point.name.lower() not in registry.enabled:
+                continue
+            try:
+                spec = entry_point.load()
+                registry.register(spec if isinstance(spec, ExchangeSpec) else ExchangeSpec(entry_point.name, **spec))
+            except Exception as e:
+                print(f"[Connectors] Entry point {entry_point.name} ignoré : {e}")
+
+        path = os.environ.get("EXCHANGES_CONFIG")
+        if path:
+            registry.load_config(path)
+        return registry
+
+    def load_config(self, path: str):
+        """
+        Fichier ini, une section par exchange :
+            [coinbase]
+            rest = mypackage.coinbase:CoinbaseConnector
+            ws = mypackage.coinbase:CoinbaseWSConnection
+            rest_url = https://api.exchange.coinbase.com
+            websocket_url = wss://ws-feed.exchange.coinbase.com
+            taker_fee = 0.006
+        rest et ws sont optionnels pour un exchange déjà connu (seules les URLs changent).
+        """
+        config = configparser.ConfigParser()
+        if not config.read(path):
+            raise FileNotFoundError(path)
+        for name in config.sections():
+            section = config[name]
+            known = self.specs.get(name.lower())
+            rest = section.get("rest", known.rest if known else None)
+            ws = section.get("ws", known.ws if known else None)
+            if rest is None or ws is None:
+                raise ValueError(f"[{name}] rest et ws requis pour un nouvel exchange")
+            rest_options = dict(known.rest_options) if known else {}
+            ws_options = dict(known.ws_options) if known else {}
+            if "rest_url" in section:
+                rest_options["rest_url"] = section["rest_url"]
+            if "websocket_url" in section:
+                ws_options["websocket_url"] = section["websocket_url"]
+            taker_fee = section.getfloat("taker_fee", known.taker_fee if known else None)
+            self.register(ExchangeSpec(name, rest, ws, rest_options, ws_options, taker_fee))
+
+
+class LazyConnectors(Mapping):
+    """
+    Vue dict des connecteurs d'un type : `name in connectors` et l'itération
+    n'instancient rien, connectors[name] crée le connecteur au premier accès.
+    """
+
+    def __init__(self, registry: ConnectorRegistry, kind: str):
+        self.registry = registry
+        self.kind = kind
+
+    def __getitem__(self, name: str):
+        return self.registry.get(self.kind, name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.registry.names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.registry.names)
+
+    def __len__(self) -> int:
+        return len(self.registry.names)
+
+
+# Registre du process, configuré par l'environnement
+connector_registry = ConnectorRegistry.from_env()
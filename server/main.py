@@ -1,17 +1,18 @@
+import argparse
 import threading
 import time
 import socket
 import uvicorn
 from server.api.public import app
 
-import tkinter as tk
-from gui.API_interface import APIGUI
+HOST = "0.0.0.0"
+PORT = 8000
 
 def run_server():
     """Lance Uvicorn dans un thread séparé avec 0.0.0.0"""
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    uvicorn.run(app, host=HOST, port=PORT, log_level="info")
 
-def wait_for_server(host="127.0.0.1", port=8000):
+def wait_for_server(host="127.0.0.1", port=PORT):
     """Attend que le serveur FastAPI soit prêt"""
     while True:
         try:
@@ -22,7 +23,11 @@ def wait_for_server(host="127.0.0.1", port=8000):
         except (OSError, ConnectionRefusedError):
             time.sleep(0.5)  # Réessayer après 500ms
 
-if __name__ == "__main__":
+def run_with_gui():
+    # Imports différés : un serveur headless ne charge ni Tkinter, ni matplotlib, ni pandas
+    import tkinter as tk
+    from gui.API_interface import APIGUI
+
     # Démarrer le serveur FastAPI dans un thread
     server_thread = threading.Thread(target=run_server, daemon=True)
     server_thread.start()
@@ -32,5 +37,15 @@ if __name__ == "__main__":
 
     # Lancer l'interface Tkinter après que le serveur soit bien lancé
     root = tk.Tk()
-    app = APIGUI(root)
+    gui = APIGUI(root)
     root.mainloop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur de l'API crypto")
+    parser.add_argument("--headless", action="store_true", help="Lance uniquement le serveur, sans interface graphique")
+    args = parser.parse_args()
+
+    if args.headless:
+        run_server()
+    else:
+        run_with_gui()
@@ -0,0 +1,22 @@
+import asyncio
+from server.services.market_data_bus import MarketDataBusServer
+from server.services.shm_books import SharedMemoryBookPublisher, get_shm_name
+
+
+async def main():
+    """Lance le processus market data qui publie les carnets sur le bus local"""
+    bus = MarketDataBusServer()
+    await bus.start()
+    shm_publisher = None
+    if get_shm_name():
+        shm_publisher = SharedMemoryBookPublisher()
+        shm_publisher.attach(bus.subscription_manager)
+    try:
+        await bus.serve_forever()
+    finally:
+        if shm_publisher is not None:
+            shm_publisher.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
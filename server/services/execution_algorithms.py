@@ -0,0 +1,399 @@
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from server.services.kline_store import kline_store
+from server.services.instruments import instrument_table
+from server.services.order_router import route, fee_model, BEST_EXECUTION
+
+
+# Quantité résiduelle en dessous de laquelle un ordre est considéré exécuté (erreurs d'arrondi)
+QUANTITY_EPSILON = 1e-12
+
+
+class ExecutionAlgorithm(ABC):
+    """
+    Base des algorithmes d'exécution : abonnement au carnet, exécution
+    simulée sur la profondeur, statut, annulation et modification.
+
+    Les ordres n'ont pas de tâche propre : l'ExecutionScheduler appelle
+    execute() à l'échéance next_slice_at (algorithmes à horaire) ou à chaque
+    mise à jour du carnet (book_driven). Chaque algorithme ne définit que la
+    quantité à exécuter à ce moment (child_quantity).
+    """
+
+    algorithm = None
+    # Réévalué à chaque mise à jour du carnet plutôt qu'à heure fixe
+    book_driven = False
+
+    def __init__(
+            self,
+            subscription_manager,
+            exchange: str,
+            symbol: str,
+            side: str,  # "buy" ou "sell"
+            quantity: float,
+            limit_price: float = None,
+            owner: str = None
+    ):
+        self.subscription_manager = subscription_manager
+        self.owner = owner
+        self.created_at = time.time()
+        self.exchange = exchange.lower()
+        # exchange="best" : chaque tranche est répartie entre tous les exchanges
+        self.venues = list(subscription_manager.exchange_connectors) if self.exchange == BEST_EXECUTION else [self.exchange]
+        self.symbol = symbol.upper()
+        self.side = side.lower()
+        self.quantity = quantity
+        self.limit_price = limit_price
+
+        # Statut et suivi
+        self.executed_quantity = 0
+        self.fees = 0.0
+        self.executions = []
+        # Callbacks appelés à chaque changement de statut : callback(ancien, nouveau)
+        self.status_listeners: List[Callable[[str, str], None]] = []
+        # Callbacks appelés à chaque exécution : callback(ordre, exécution)
+        self.fill_listeners: List[Callable[["ExecutionAlgorithm", Dict[str, Any]], None]] = []
+        # Callbacks appelés quand l'échéance change (modification, annulation) : callback(ordre)
+        self.change_listeners: List[Callable[["ExecutionAlgorithm"], None]] = []
+        self._status = "active"
+
+        # Prochaine échéance (horloge monotone), None pour un algorithme piloté par le carnet
+        self.next_slice_at = None if self.book_driven else time.monotonic()
+        self.subscribed = False
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, status: str):
+        previous, self._status = self._status, status
+        if previous != status:
+            for listener in self.status_listeners:
+                listener(previous, status)
+
+    @property
+    def remaining_quantity(self) -> float:
+        return max(self.quantity - self.executed_quantity, 0.0)
+
+    def _notify_change(self):
+        for listener in self.change_listeners:
+            listener(self)
+
+    async def prepare(self, connectors: Dict[str, Any]):
+        """Données nécessaires avant le démarrage (ex: profil de volume), connectors : connecteurs REST par exchange"""
+        pass
+
+    async def start(self):
+        """S'abonne au flux de données"""
+        await self.subscription_manager.add_subscription(self.symbol)
+        self.subscribed = True
+
+    async def release(self):
+        """Libère l'abonnement au flux (une seule fois, quelle que soit la fin de l'ordre)"""
+        if self.subscribed:
+            self.subscribed = False
+            await self.subscription_manager.remove_subscription(self.symbol)
+
+    async def cancel(self) -> bool:
+        """Annule l'ordre, False s'il n'est plus actif"""
+        if self.status != "active":
+            return False
+        self.status = "cancelled"
+        await self.release()
+        self._notify_change()
+        return True
+
+    def amend(self, limit_price: float = None, remaining_duration_seconds: float = None) -> bool:
+        """Modifie le prix limite et/ou la durée restante (pour les algorithmes à horaire)"""
+        if self.status != "active":
+            return False
+        if limit_price is not None:
+            self.limit_price = limit_price
+        if remaining_duration_seconds is not None:
+            self.reschedule(remaining_duration_seconds)
+        self._notify_change()
+        return True
+
+    def reschedule(self, remaining_duration_seconds: float):
+        pass
+
+    async def apply_command(self, command: Dict[str, Any]) -> bool:
+        """Commande reçue d'un autre worker via le store partagé"""
+        if command.get("action") == "cancel":
+            return await self.cancel()
+        if command.get("action") == "amend":
+            return self.amend(command.get("limit_price"), command.get("remaining_duration_seconds"))
+        return False
+
+    @abstractmethod
+    def child_quantity(self, now: float) -> float:
+        """Quantité à exécuter maintenant"""
+        pass
+
+    def schedule_next_slice(self, now: float):
+        """Prochaine échéance après une exécution (algorithmes à horaire)"""
+        pass
+
+    def execute(self, now: float) -> List[Dict[str, Any]]:
+        """Exécute la quantité due contre les carnets courants, renvoie les exécutions (une par exchange)"""
+        quantity = min(self.child_quantity(now), self.remaining_quantity)
+        self.schedule_next_slice(now)
+        if quantity <= QUANTITY_EPSILON:
+            return []
+
+        # Récupérer les orderbooks actuels depuis les websockets
+        connectors = self.subscription_manager.exchange_connectors
+        books = {venue: connectors[venue].order_book.get(self.symbol) for venue in self.venues}
+
+        executions = []
+        timestamp = datetime.now().isoformat()
+        # Quantité de chaque exchange arrondie à son lot, le reliquat est rattrapé à la tranche suivante
+        fills = route(books, self.side, quantity, self.limit_price,
+                      lambda venue, filled: instrument_table.round_quantity(venue, self.symbol, filled))
+        for venue, filled, execution_price in fills:
+            if filled <= QUANTITY_EPSILON:
+                continue
+            # Enregistrer l'exécution
+            execution = {
+                "exchange": venue,
+                "price": execution_price,
+                "quantity": filled,
+                "fee": fee_model(venue).fee(filled, execution_price),
+                "timestamp": timestamp
+            }
+            self.executions.append(execution)
+            self.executed_quantity += filled
+            self.fees += execution["fee"]
+            self.on_fill(filled)
+            for listener in self.fill_listeners:
+                listener(self, execution)
+            executions.append(execution)
+
+        if self.remaining_quantity <= QUANTITY_EPSILON or not self.tradable(self.remaining_quantity):
+            self.status = "completed"
+        return executions
+
+    def tradable(self, quantity: float) -> bool:
+        """False si quantity, arrondie au lot, est nulle sur chaque exchange de l'ordre"""
+        return any(instrument_table.round_quantity(venue, self.symbol, quantity) > QUANTITY_EPSILON for venue in self.venues)
+
+    def on_fill(self, quantity: float):
+        pass
+
+    def details(self) -> Dict[str, Any]:
+        """Champs propres à l'algorithme dans le statut"""
+        return {}
+
+    def get_status(self):
+        """Retourne le statut actuel de l'ordre"""
+        return {
+            "status": self.status,
+            "algorithm": self.algorithm,
+            "owner": self.owner,
+            "created_at": self.created_at,
+            "exchange": self.exchange,
+            "venues": self.venues,
+            "symbol": self.symbol,
+            "side": self.side,
+            "limit_price": self.limit_price,
+            "executed_quantity": self.executed_quantity,
+            "total_quantity": self.quantity,
+            "slices_executed": len(self.executions),
+            "fees": self.fees,
+            **self.details(),
+            "executions": self.executions,
+            "average_price": sum(ex["price"] * ex["quantity"] for ex in self.executions) /
+                             self.executed_quantity if self.executed_quantity > 0 else None
+        }
+
+
+class TWAPOrder(ExecutionAlgorithm):
+    """Tranches égales à intervalle fixe ; une tranche non exécutée est rattrapée à la suivante"""
+
+    algorithm = "twap"
+
+    def __init__(self, subscription_manager, exchange: str, symbol: str, side: str, quantity: float,
+                 slices: int, duration_seconds: int, limit_price: float = None, owner: str = None):
+        super().__init__(subscription_manager, exchange, symbol, side, quantity, limit_price, owner)
+        self.slices = slices
+        self.duration_seconds = duration_seconds
+
+        # Temps entre chaque slice
+        self.interval_seconds = duration_seconds / slices
+        self.slice_index = 0
+        # Part cumulée de la quantité à avoir exécutée après chaque slice
+        self.schedule = np.arange(1, slices + 1) / slices
+
+    def child_quantity(self, now: float) -> float:
+        target = self.quantity * float(self.schedule[min(self.slice_index, self.slices - 1)])
+        self.slice_index += 1
+        return target - self.executed_quantity
+
+    def schedule_next_slice(self, now: float):
+        self.next_slice_at = now + self.interval_seconds
+
+    def reschedule(self, remaining_duration_seconds: float):
+        """Répartit la durée restante sur les slices restantes"""
+        remaining_slices = max(self.slices - self.slice_index, 1)
+        self.interval_seconds = remaining_duration_seconds / remaining_slices
+        self.next_slice_at = time.monotonic() + self.interval_seconds
+
+    def details(self) -> Dict[str, Any]:
+        return {"total_slices": self.slices}
+
+
+def volume_profile(columns: Dict[str, np.ndarray], start: float, interval_seconds: float, slices: int,
+                   bucket_seconds: int = 300) -> Optional[np.ndarray]:
+    """
+    Part du volume quotidien attendue dans chaque slice [start + k * interval, start + (k + 1) * interval[,
+    d'après le volume moyen par tranche horaire (bucket_seconds) de l'historique. None sans historique.
+    """
+    if len(columns["timestamp"]) == 0:
+        return None
+    n_buckets = 86_400 // bucket_seconds
+    time_of_day = (columns["timestamp"] // 1_000_000_000) % 86_400
+    profile = np.bincount((time_of_day // bucket_seconds).astype(np.int64), weights=columns["volume"], minlength=n_buckets)
+    if profile.sum() <= 0:
+        return None
+
+    # Volume cumulé en fonction du temps (profil quotidien répété), interpolé dans chaque tranche
+    cumulative = np.concatenate(([0.0], np.cumsum(profile)))
+    bounds = start + interval_seconds * np.arange(slices + 1)
+    days, seconds = np.divmod(bounds, 86_400)
+    volume_at = days * cumulative[-1] + np.interp(seconds / bucket_seconds, np.arange(n_buckets + 1), cumulative)
+    weights = np.diff(volume_at)
+    return weights / weights.sum()
+
+
+class VWAPOrder(TWAPOrder):
+    """Tranches à intervalle fixe, de taille proportionnelle au volume historique de chaque tranche horaire"""
+
+    algorithm = "vwap"
+    # Historique utilisé pour le profil de volume
+    profile_days = 5
+    profile_interval = "5m"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile_source = "uniform"
+
+    async def prepare(self, connectors: Dict[str, Any]):
+        # Volume consolidé des exchanges de l'ordre
+        volumes = []
+        for venue in self.venues:
+            try:
+                volumes.append(await kline_store.get_klines_columns(
+                    connectors[venue], venue, self.symbol, self.profile_interval, self.profile_days * 288
+                ))
+            except Exception as e:
+                print(f"[VWAP] Historique indisponible pour {self.symbol} sur {venue} : {e}")
+        weights = None
+        if volumes:
+            columns = {name: np.concatenate([c[name] for c in volumes]) for name in ("timestamp", "volume")}
+            # Tranches comptées depuis la création : l'ordre a pu démarrer avant la fin du chargement
+            weights = volume_profile(columns, self.created_at, self.interval_seconds, self.slices)
+        if weights is not None:
+            self.schedule = np.minimum(np.cumsum(weights), 1.0)
+            self.schedule[-1] = 1.0
+            self.profile_source = f"{self.profile_days}d {self.profile_interval}"
+
+    def details(self) -> Dict[str, Any]:
+        return {"total_slices": self.slices, "volume_profile": self.profile_source}
+
+
+class POVOrder(ExecutionAlgorithm):
+    """
+    Participation à un pourcentage du volume échangé depuis le départ de l'ordre,
+    mesuré sur le flux de klines 1m des exchanges de l'ordre et réévalué à chaque carnet.
+    """
+
+    algorithm = "pov"
+    book_driven = True
+
+    def __init__(self, subscription_manager, exchange: str, symbol: str, side: str, quantity: float,
+                 participation_rate: float, limit_price: float = None, owner: str = None):
+        super().__init__(subscription_manager, exchange, symbol, side, quantity, limit_price, owner)
+        self.participation_rate = participation_rate
+        # Volume de marché par exchange : bougies terminées + bougie en cours - volume déjà échangé au départ
+        self.closed_volume = dict.fromkeys(self.venues, 0.0)
+        self.bar_volume = dict.fromkeys(self.venues, 0.0)
+        self.bar_timestamp = dict.fromkeys(self.venues)
+        self.baseline = dict.fromkeys(self.venues, 0.0)
+        self.kline_listeners = {}
+
+    @property
+    def market_volume(self) -> float:
+        return sum(self.closed_volume[venue] + self.bar_volume[venue] - self.baseline[venue] for venue in self.venues)
+
+    async def start(self):
+        await super().start()
+        for venue in self.venues:
+            listener = self.kline_listeners[venue] = partial(self.on_kline, venue)
+            self.subscription_manager.exchange_connectors[venue].kline_listeners.append(listener)
+            await self.subscription_manager.add_kline_subscription(venue, self.symbol, "1m")
+
+    async def release(self):
+        await super().release()
+        for venue, listener in list(self.kline_listeners.items()):
+            del self.kline_listeners[venue]
+            self.subscription_manager.exchange_connectors[venue].kline_listeners.remove(listener)
+            await self.subscription_manager.remove_kline_subscription(venue, self.symbol, "1m")
+
+    def on_kline(self, venue: str, symbol: str, interval: str, kline: Dict[str, Any], closed: bool):
+        if symbol != self.symbol or interval != "1m":
+            return
+        if self.bar_timestamp[venue] is None:
+            self.bar_timestamp[venue] = kline["timestamp"]
+            self.baseline[venue] = kline["volume"]
+        if kline["timestamp"] > self.bar_timestamp[venue]:
+            self.closed_volume[venue] += self.bar_volume[venue]
+            self.bar_timestamp[venue] = kline["timestamp"]
+        self.bar_volume[venue] = kline["volume"]
+
+    def child_quantity(self, now: float) -> float:
+        return self.participation_rate * self.market_volume - self.executed_quantity
+
+    def details(self) -> Dict[str, Any]:
+        return {"participation_rate": self.participation_rate, "market_volume": self.market_volume}
+
+
+class IcebergOrder(ExecutionAlgorithm):
+    """
+    Ordre limite dont seule une partie (display_quantity) est visible : la
+    partie visible est exécutée dès que le carnet atteint le prix limite,
+    puis renouvelée jusqu'à exécution complète.
+    """
+
+    algorithm = "iceberg"
+    book_driven = True
+
+    def __init__(self, subscription_manager, exchange: str, symbol: str, side: str, quantity: float,
+                 display_quantity: float, limit_price: float = None, owner: str = None):
+        super().__init__(subscription_manager, exchange, symbol, side, quantity, limit_price, owner)
+        self.display_quantity = display_quantity
+        self.visible_quantity = min(display_quantity, quantity)
+        self.clips_filled = 0
+
+    def child_quantity(self, now: float) -> float:
+        return self.visible_quantity
+
+    def on_fill(self, quantity: float):
+        self.visible_quantity -= quantity
+        if self.visible_quantity <= QUANTITY_EPSILON:
+            # Partie visible exécutée : nouvelle partie visible
+            self.clips_filled += 1
+            self.visible_quantity = min(self.display_quantity, self.remaining_quantity)
+
+    def details(self) -> Dict[str, Any]:
+        return {"display_quantity": self.display_quantity, "clips_filled": self.clips_filled}
+
+
+ALGORITHMS = {
+    algorithm.algorithm: algorithm
+    for algorithm in (TWAPOrder, VWAPOrder, POVOrder, IcebergOrder)
+}
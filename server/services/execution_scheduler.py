@@ -0,0 +1,190 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict
+from functools import partial
+from typing import Dict, Set, Tuple
+from server.services.loop_monitor import loop_monitor
+from server.services.rate_limiter import use_priority, PRIORITY_TRADING
+
+# Fréquence de lecture des commandes (annulation, modification) envoyées par les autres workers
+COMMAND_POLL_SECONDS = 1.0
+
+
+class ExecutionScheduler:
+    """
+    Exécute tous les ordres du worker dans une seule tâche.
+
+    - algorithmes à horaire (TWAP, VWAP) : tas d'échéances (next_slice_at),
+      une échéance modifiée par amend() est réinsérée et l'ancienne ignorée
+    - algorithmes pilotés par le carnet (POV, Iceberg) : index par
+      (exchange, symbole) pour chaque exchange de l'ordre, réévalués à la
+      mise à jour du carnet
+
+    Chaque passage exécute en lot les ordres dus puis persiste leurs statuts
+    en une transaction. Les commandes des autres workers sont lues en une
+    requête pour tous les ordres.
+
+    Les données préalables d'un ordre (profil de volume VWAP) sont chargées en
+    arrière-plan : l'ordre s'exécute dès son ajout avec son profil par défaut.
+    """
+
+    def __init__(self, shared_store=None):
+        self.shared_store = shared_store
+        self.orders: Dict[str, "ExecutionAlgorithm"] = {}
+        self.timers = []  # tas de (échéance, ordre d'insertion, order_id)
+        self._counter = itertools.count()
+        self.book_driven: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self.ready: Set[str] = set()
+        # Ordres modifiés depuis le dernier passage, à persister
+        self.dirty: Set[str] = set()
+        self.wakeup = asyncio.Event()
+        # Chargements en cours de order.prepare, par ordre
+        self.preparing: Dict[str, asyncio.Task] = {}
+
+        # Compteurs
+        self.ticks = 0
+        self.executions = 0
+
+    def attach(self, subscription_manager):
+        """Réveille les ordres pilotés par le carnet à chaque mise à jour des connexions"""
+        for exchange, connector in subscription_manager.exchange_connectors.items():
+            connector.book_listeners.append(partial(self.on_order_book, exchange))
+
+    def add(self, order_id: str, order, connectors=None):
+        """Ajoute un ordre démarré ; connectors (connecteurs REST par exchange) lance order.prepare en arrière-plan"""
+        self.orders[order_id] = order
+        order.change_listeners.append(partial(self.on_change, order_id))
+        if connectors is not None:
+            self.preparing[order_id] = asyncio.get_running_loop().create_task(self.prepare(order_id, order, connectors))
+        if order.book_driven:
+            for venue in order.venues:
+                self.book_driven[(venue, order.symbol)].add(order_id)
+            self.ready.add(order_id)
+            self.wakeup.set()
+        else:
+            self._push_timer(order_id, order)
+
+    async def prepare(self, order_id: str, order, connectors):
+        try:
+            # Les requêtes REST des ordres passent avant les requêtes des clients et les téléchargements d'historique
+            with use_priority(PRIORITY_TRADING):
+                await order.prepare(connectors)
+            # Le statut (ex: volume_profile) a changé
+            self.dirty.add(order_id)
+        except Exception as e:
+            print(f"Erreur lors de la préparation de l'ordre {order_id}: {e}")
+        finally:
+            self.preparing.pop(order_id, None)
+
+    def _push_timer(self, order_id: str, order):
+        heapq.heappush(self.timers, (order.next_slice_at, next(self._counter), order_id))
+        if self.timers[0][2] == order_id:
+            self.wakeup.set()
+
+    def on_change(self, order_id: str, order):
+        """Ordre modifié ou annulé : nouvelle échéance, ou libération au prochain passage"""
+        self.dirty.add(order_id)
+        if order.status != "active":
+            self.ready.add(order_id)
+            self.wakeup.set()
+        elif not order.book_driven:
+            self._push_timer(order_id, order)
+        else:
+            self.ready.add(order_id)
+            self.wakeup.set()
+
+    def on_order_book(self, exchange: str, symbol: str, book):
+        order_ids = self.book_driven.get((exchange, symbol))
+        if order_ids:
+            self.ready.update(order_ids)
+            self.wakeup.set()
+
+    def _due_orders(self, now: float) -> Set[str]:
+        due, self.ready = self.ready, set()
+        while self.timers and self.timers[0][0] <= now:
+            when, _, order_id = heapq.heappop(self.timers)
+            order = self.orders.get(order_id)
+            # Echéance périmée (ordre terminé ou replanifié)
+            if order is not None and order.next_slice_at == when:
+                due.add(order_id)
+        return due
+
+    async def tick(self, now: float):
+        finished = []
+        # Ordres dont le statut est à persister
+        changed = {order_id: self.orders[order_id] for order_id in self.dirty if order_id in self.orders}
+        self.dirty = set()
+        with loop_monitor.section("execution.tick"):
+            for order_id in self._due_orders(now):
+                order = self.orders.get(order_id)
+                if order is None:
+                    continue
+                if order.status == "active":
+                    try:
+                        executions = order.execute(now)
+                        if executions:
+                            self.executions += len(executions)
+                            changed[order_id] = order
+                    except Exception as e:
+                        order.status = "error"
+                        print(f"Erreur lors de l'exécution de l'ordre {order_id}: {e}")
+                if order.status != "active":
+                    finished.append((order_id, order))
+                elif not order.book_driven:
+                    self._push_timer(order_id, order)
+        self.ticks += 1
+
+        for order_id, order in finished:
+            changed[order_id] = order
+            del self.orders[order_id]
+            task = self.preparing.pop(order_id, None)
+            if task is not None:
+                task.cancel()
+            for venue in order.venues:
+                self.book_driven.get((venue, order.symbol), set()).discard(order_id)
+            await order.release()
+        if self.shared_store is not None and changed:
+            self.shared_store.save_orders([(order_id, order.get_status()) for order_id, order in changed.items()])
+
+    async def poll_commands(self):
+        """Applique les commandes envoyées par les autres workers aux ordres de ce worker"""
+        for order_id in self.shared_store.pending_command_order_ids():
+            order = self.orders.get(order_id)
+            if order is None:
+                continue
+            for command in self.shared_store.pop_order_commands(order_id):
+                await order.apply_command(command)
+
+    async def run(self):
+        next_poll = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if self.shared_store is not None and now >= next_poll:
+                await self.poll_commands()
+                next_poll = now + COMMAND_POLL_SECONDS
+            await self.tick(now)
+
+            timeout = self.timers[0][0] - time.monotonic() if self.timers else None
+            if self.shared_store is not None:
+                timeout = min(timeout, COMMAND_POLL_SECONDS) if timeout is not None else COMMAND_POLL_SECONDS
+            if self.ready or (timeout is not None and timeout <= 0):
+                # Laisse passer les autres tâches avant le passage suivant
+                await asyncio.sleep(0)
+                continue
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self):
+        return {
+            "orders": len(self.orders),
+            "timers": len(self.timers),
+            "book_driven": sum(len(ids) for ids in self.book_driven.values()),
+            "preparing": len(self.preparing),
+            "ticks": self.ticks,
+            "executions": self.executions,
+        }
@@ -1,7 +1,30 @@
+# Devises de cotation reconnues en fin de symbole, les plus longues d'abord (USDT avant USD)
+QUOTE_ASSETS = ("USDT", "USDC", "DAI", "USD", "EUR", "GBP", "JPY", "CAD", "CHF", "AUD", "BTC", "ETH")
+
+# Codes usuels -> codes Kraken, et inversement
+KRAKEN_ASSETS = {"BTC": "XBT", "DOGE": "XDG"}
+STANDARD_ASSETS = {kraken: standard for standard, kraken in KRAKEN_ASSETS.items()}
+
+
+def split_symbol(symbol: str):
+    """'DOTUSD' -> ('DOT', 'USD') ; base sur 3 lettres si la cotation n'est pas reconnue"""
+    symbol = symbol.upper().replace("/", "")
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return symbol[:3], symbol[3:]
+
+
 def format_kraken(symbol: str):
-    symbol = symbol.upper().replace("BTC", "XBT")
-    return symbol[0:3] + "/" + symbol[3:6]
+    """Nom WebSocket Kraken d'un symbole ('BTCUSDT' -> 'XBT/USDT'), à défaut de la table des instruments"""
+    base, quote = split_symbol(symbol)
+    return KRAKEN_ASSETS.get(base, base) + "/" + KRAKEN_ASSETS.get(quote, quote)
 
 
 def format_base(symbol: str):
-    return symbol.upper().replace("/", "").replace("XBT", "BTC").replace("USD", "USDT")
+    """Symbole usuel d'un nom Kraken ('XBT/USD' -> 'BTCUSD'), à défaut de la table des instruments"""
+    if "/" in symbol:
+        base, quote = symbol.upper().split("/", 1)
+    else:
+        base, quote = split_symbol(symbol)
+    return STANDARD_ASSETS.get(base, base) + STANDARD_ASSETS.get(quote, quote)
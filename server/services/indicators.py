@@ -0,0 +1,136 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+NANOSECONDS_PER_DAY = 86_400 * 1_000_000_000
+
+# Nom -> fenêtre par défaut
+INDICATORS = {"sma": 20, "ema": 20, "vwap": None, "vol": 20}
+
+
+def parse_indicators(spec: str) -> List[Tuple[str, int]]:
+    """
+    Parse le paramètre de requête indicators, ex: "sma:20,ema:50,vwap,vol:30"
+    Renvoie une liste de (nom, fenêtre).
+    """
+    indicators = []
+    for item in filter(None, (part.strip().lower() for part in spec.split(","))):
+        name, _, window = item.partition(":")
+        if name not in INDICATORS:
+            raise ValueError(f"Indicateur inconnu : {name} (disponibles : {', '.join(INDICATORS)})")
+        if INDICATORS[name] is None:
+            indicators.append((name, None))
+            continue
+        window = int(window) if window else INDICATORS[name]
+        if window < 1:
+            raise ValueError(f"Fenêtre invalide pour {name} : {window}")
+        indicators.append((name, window))
+    return indicators
+
+
+def indicator_column(name: str, window: int) -> str:
+    return name if window is None else f"{name}_{window}"
+
+
+def sma(close: np.ndarray, window: int) -> np.ndarray:
+    """Moyenne mobile simple (NaN tant que la fenêtre n'est pas pleine)"""
+    result = np.full(len(close), np.nan)
+    if len(close) >= window:
+        cumsum = np.cumsum(np.concatenate(([0.0], close)))
+        result[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+    return result
+
+
+def ema(close: np.ndarray, window: int, seed: float = None) -> np.ndarray:
+    """
+    Moyenne mobile exponentielle (alpha = 2 / (window + 1)), vectorisée par blocs :
+    dans un bloc, ema[i] = d^(i+1) * prev + alpha * d^i * cumsum(x[j] / d^j) avec d = 1 - alpha.
+    La taille des blocs est choisie pour que d^-j reste représentable.
+    seed est la valeur de l'EMA juste avant close[0] (reprise incrémentale).
+    """
+    result = np.empty(len(close))
+    if len(close) == 0:
+        return result
+    alpha = 2.0 / (window + 1)
+    decay = 1.0 - alpha
+    start = 0
+    if seed is None or np.isnan(seed):
+        seed = close[0]
+    block = len(close) if decay == 0 else max(1, int(200 * np.log(10) / -np.log(decay)))
+    previous = seed
+    while start < len(close):
+        chunk = close[start:start + block]
+        powers = decay ** np.arange(len(chunk))
+        weighted = np.cumsum(chunk / powers) * powers
+        result[start:start + len(chunk)] = decay * powers * previous + alpha * weighted
+        previous = result[start + len(chunk) - 1]
+        start += block
+    return result
+
+
+def rolling_volatility(close: np.ndarray, window: int) -> np.ndarray:
+    """Ecart-type glissant des rendements logarithmiques sur window bougies"""
+    result = np.full(len(close), np.nan)
+    if len(close) <= window:
+        return result
+    returns = np.diff(np.log(close))
+    cumsum = np.cumsum(np.concatenate(([0.0], returns)))
+    cumsum_sq = np.cumsum(np.concatenate(([0.0], returns ** 2)))
+    total = cumsum[window:] - cumsum[:-window]
+    total_sq = cumsum_sq[window:] - cumsum_sq[:-window]
+    variance = np.maximum(total_sq / window - (total / window) ** 2, 0.0) * window / max(window - 1, 1)
+    result[window:] = np.sqrt(variance)
+    return result
+
+
+def vwap(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """VWAP ancré sur le jour UTC (remis à zéro à chaque changement de jour)"""
+    typical = (columns["high"] + columns["low"] + columns["close"]) / 3
+    volume = columns["volume"]
+    if len(volume) == 0:
+        return np.empty(0)
+    day = columns["timestamp"] // NANOSECONDS_PER_DAY
+    day_start = np.flatnonzero(np.concatenate(([True], day[1:] != day[:-1])))
+
+    def cumsum_per_day(values):
+        cumsum = np.cumsum(values)
+        offsets = np.concatenate(([0.0], cumsum[day_start[1:] - 1]))
+        return cumsum - np.repeat(offsets, np.diff(np.concatenate((day_start, [len(values)]))))
+
+    cum_volume = cumsum_per_day(volume)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(cum_volume > 0, cumsum_per_day(typical * volume) / cum_volume, np.nan)
+
+
+def lookback(name: str, window: int) -> int:
+    """Nombre de bougies précédentes nécessaires pour recalculer une valeur"""
+    if name == "sma":
+        return window - 1
+    if name == "vol":
+        return window
+    return 0
+
+
+def warmup(name: str, window: int, interval_seconds: int = None) -> int:
+    """
+    Bougies supplémentaires à charger pour que les premières valeurs renvoyées soient significatives.
+    interval_seconds : durée des bougies, None pour un intervalle calendaire (1M)
+    """
+    if name == "ema":
+        return 3 * window
+    if name == "vwap":
+        # Jusqu'au début du jour UTC de la première bougie renvoyée, où le VWAP est ancré
+        return -(-86_400 // interval_seconds) - 1 if interval_seconds else 0
+    return lookback(name, window)
+
+
+def compute(name: str, window: int, columns: Dict[str, np.ndarray], seed: float = None) -> np.ndarray:
+    if name == "sma":
+        return sma(columns["close"], window)
+    if name == "ema":
+        return ema(columns["close"], window, seed)
+    if name == "vol":
+        return rolling_volatility(columns["close"], window)
+    if name == "vwap":
+        return vwap(columns)
+    raise ValueError(f"Indicateur inconnu : {name}")
@@ -0,0 +1,173 @@
+import asyncio
+import math
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from server.services.formatters import format_base, format_kraken
+
+# Codes d'actifs propres à Kraken -> codes usuels
+KRAKEN_ASSET_ALIASES = {"XBT": "BTC", "XDG": "DOGE"}
+
+
+class Instrument:
+    """
+    Paire d'un exchange : symbole canonique (base + quote usuels, ex: BTCUSDT),
+    noms natifs REST et WebSocket, pas de prix (tick_size) et de quantité (lot_size).
+    """
+
+    __slots__ = ("exchange", "symbol", "native", "ws_name", "base", "quote", "tick_size", "lot_size", "min_quantity")
+
+    def __init__(self, exchange: str, base: str, quote: str, native: str, ws_name: str = None,
+                 tick_size: float = 0.0, lot_size: float = 0.0, min_quantity: float = 0.0):
+        self.exchange = exchange
+        self.base = sys.intern(base)
+        self.quote = sys.intern(quote)
+        self.symbol = sys.intern(base + quote)
+        self.native = sys.intern(native)
+        self.ws_name = sys.intern(ws_name or native)
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        self.min_quantity = min_quantity
+
+    def round_quantity(self, quantity: float) -> float:
+        """Quantité arrondie au lot inférieur (0 si sous la quantité minimale)"""
+        if self.lot_size > 0:
+            # La marge absorbe les erreurs d'arrondi (0.3 / 0.1 = 2.9999999999999996)
+            quantity = round(math.floor(quantity / self.lot_size + 1e-9) * self.lot_size, 12)
+        return quantity if quantity >= self.min_quantity else 0.0
+
+    def round_price(self, price: float) -> float:
+        """Prix arrondi au tick le plus proche"""
+        if self.tick_size > 0:
+            return round(price / self.tick_size) * self.tick_size
+        return price
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def parse_binance_exchange_info(data: Dict[str, Any]) -> List[Instrument]:
+    """Réponse de /exchangeInfo -> instruments (filtres PRICE_FILTER et LOT_SIZE)"""
+    instruments = []
+    for info in data["symbols"]:
+        filters = {f["filterType"]: f for f in info.get("filters", [])}
+        price_filter = filters.get("PRICE_FILTER", {})
+        lot_filter = filters.get("LOT_SIZE", {})
+        instruments.append(Instrument(
+            "binance", info["baseAsset"], info["quoteAsset"], info["symbol"],
+            tick_size=float(price_filter.get("tickSize", 0)),
+            lot_size=float(lot_filter.get("stepSize", 0)),
+            min_quantity=float(lot_filter.get("minQty", 0)),
+        ))
+    return instruments
+
+
+def parse_kraken_asset_pairs(data: Dict[str, Any]) -> List[Instrument]:
+    """Réponse de /AssetPairs -> instruments ; les paires sans wsname (dark pool) sont ignorées"""
+    instruments = []
+    for key, info in data["result"].items():
+        ws_name = info.get("wsname")
+        if not ws_name or "/" not in ws_name:
+            continue
+        base, quote = (KRAKEN_ASSET_ALIASES.get(asset, asset) for asset in ws_name.split("/"))
+        instruments.append(Instrument(
+            "kraken", base, quote, info.get("altname", key), ws_name,
+            tick_size=float(info.get("tick_size") or 10 ** -info.get("pair_decimals", 0)),
+            lot_size=10 ** -info["lot_decimals"] if "lot_decimals" in info else 0.0,
+            min_quantity=float(info.get("ordermin", 0)),
+        ))
+    return instruments
+
+
+class InstrumentTable:
+    """
+    Table canonique des instruments, construite une fois par exchange depuis sa
+    liste de paires (exchangeInfo, AssetPairs) : symbole canonique -> instrument
+    et nom natif (REST ou WebSocket) -> instrument, en O(1) dans les deux sens.
+
+    Tant qu'un exchange n'est pas chargé (ou si son chargement échoue), les noms
+    sont convertis par format_kraken / format_base, une seule fois par nom.
+    """
+
+    def __init__(self, retry_after: float = 60.0):
+        self.by_symbol: Dict[str, Dict[str, Instrument]] = {}
+        self.by_native: Dict[str, Dict[str, Instrument]] = {}
+        # Conversions de repli déjà calculées, par exchange et nom
+        self.fallback_symbols: Dict[tuple, str] = {}
+        self.loading: Dict[str, asyncio.Task] = {}
+        self.failed_at: Dict[str, float] = {}
+        self.retry_after = retry_after
+
+    def add(self, exchange: str, instruments: Iterable[Instrument]):
+        by_symbol = self.by_symbol.setdefault(exchange, {})
+        by_native = self.by_native.setdefault(exchange, {})
+        for instrument in instruments:
+            by_symbol[instrument.symbol] = instrument
+            by_native[instrument.native] = instrument
+            by_native[instrument.ws_name] = instrument
+
+    def loaded(self, exchange: str) -> bool:
+        return exchange in self.by_symbol
+
+    def get(self, exchange: str, symbol: str) -> Optional[Instrument]:
+        return self.by_symbol.get(exchange, {}).get(symbol)
+
+    def symbols(self, exchange: str) -> List[str]:
+        return list(self.by_symbol.get(exchange, {}))
+
+    def to_native(self, exchange: str, symbol: str, ws: bool = False) -> str:
+        """Symbole canonique -> nom natif (REST, ou WebSocket avec ws)"""
+        instrument = self.by_symbol.get(exchange, {}).get(symbol)
+        if instrument is not None:
+            return instrument.ws_name if ws else instrument.native
+        if exchange == "kraken":
+            key = (exchange, symbol, ws)
+            native = self.fallback_symbols.get(key)
+            if native is None:
+                native = self.fallback_symbols[key] = sys.intern(format_kraken(symbol) if ws else format_kraken(symbol).replace("/", ""))
+            return native
+        return symbol
+
+    def to_symbol(self, exchange: str, native: str) -> str:
+        """Nom natif -> symbole canonique"""
+        instrument = self.by_native.get(exchange, {}).get(native)
+        if instrument is not None:
+            return instrument.symbol
+        key = (exchange, native)
+        symbol = self.fallback_symbols.get(key)
+        if symbol is None:
+            symbol = self.fallback_symbols[key] = sys.intern(format_base(native))
+        return symbol
+
+    def round_quantity(self, exchange: str, symbol: str, quantity: float) -> float:
+        instrument = self.get(exchange, symbol)
+        return instrument.round_quantity(quantity) if instrument is not None else quantity
+
+    async def ensure(self, exchange: str, connector=None):
+        """
+        Charge la table de exchange si elle ne l'est pas (chargements concurrents fusionnés,
+        nouvel essai au plus toutes les retry_after secondes après un échec)
+        """
+        if self.loaded(exchange) or time.monotonic() - self.failed_at.get(exchange, -math.inf) < self.retry_after:
+            return
+        task = self.loading.get(exchange)
+        if task is None:
+            task = self.loading[exchange] = asyncio.create_task(self._load(exchange, connector))
+        await asyncio.shield(task)
+
+    async def _load(self, exchange: str, connector=None):
+        try:
+            if connector is None:
+                from server.connectors.registry import connector_registry
+                connector = connector_registry.rest(exchange)
+            self.add(exchange, await connector.load_instruments())
+            print(f"[Instruments] {exchange} : {len(self.by_symbol[exchange])} instruments")
+        except Exception as e:
+            self.failed_at[exchange] = time.monotonic()
+            print(f"[Instruments] Chargement de {exchange} impossible, noms convertis par défaut : {e}")
+        finally:
+            self.loading.pop(exchange, None)
+
+
+# Table partagée par le process
+instrument_table = InstrumentTable()
@@ -0,0 +1,46 @@
+import re
+
+
+# Durée en secondes des unités d'intervalle acceptées (notation Binance : 1m, 15m, 4h, 1d, 1w)
+INTERVAL_UNITS = {
+    "s": 1,
+    "m": 60,
+    "h": 60 * 60,
+    "d": 24 * 60 * 60,
+    "w": 7 * 24 * 60 * 60,
+}
+# Unités calendaires (1M : mois calendaire) : pas de durée fixe, ni agrégation,
+# l'intervalle est transmis tel quel aux exchanges qui le fournissent
+CALENDAR_UNITS = ("M",)
+
+_INTERVAL_PATTERN = re.compile(r"^\s*(\d+)\s*(s|m|min|h|d|w|M)\s*$")
+
+
+def is_calendar_interval(interval: str) -> bool:
+    match = _INTERVAL_PATTERN.match(interval)
+    return match is not None and match.group(2) in CALENDAR_UNITS
+
+
+def interval_to_seconds(interval: str) -> int:
+    """Convertit un intervalle de klines ("1m", "15m", "4h", "1d"...) en secondes"""
+    match = _INTERVAL_PATTERN.match(interval)
+    if not match:
+        raise ValueError(f"Intervalle invalide : {interval}")
+    value, unit = match.groups()
+    if unit in CALENDAR_UNITS:
+        raise ValueError(f"Intervalle calendaire sans durée fixe : {interval}")
+    if unit == "min":
+        unit = "m"
+    return int(value) * INTERVAL_UNITS[unit]
+
+
+def interval_to_minutes(interval: str) -> int:
+    return interval_to_seconds(interval) // 60
+
+
+def format_interval(seconds: int) -> str:
+    """Inverse de interval_to_seconds : 900 -> "15m", 14400 -> "4h" """
+    for unit in ("w", "d", "h", "m"):
+        if seconds % INTERVAL_UNITS[unit] == 0 and seconds >= INTERVAL_UNITS[unit]:
+            return f"{seconds // INTERVAL_UNITS[unit]}{unit}"
+    return f"{seconds}s"
@@ -0,0 +1,57 @@
+from typing import List, Dict, Any, Tuple
+import numpy as np
+
+
+KLINE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def klines_to_columns(
+        raw_data: List[List[Any]],
+        timestamp_unit_ns: int,
+        value_indices: Tuple[int, ...] = (1, 2, 3, 4, 5)
+) -> Dict[str, np.ndarray]:
+    """
+    Construit les klines en colonnes NumPy directement depuis les lignes brutes de l'exchange
+    [timestamp, ...], sans passer par un dict par bougie. value_indices donne la position
+    de open, high, low, close et volume dans chaque ligne.
+    """
+    count = len(raw_data)
+    timestamps = np.fromiter((entry[0] for entry in raw_data), dtype=np.int64, count=count) * timestamp_unit_ns
+    # Les prix arrivent en chaînes : NumPy les convertit en une passe
+    values = np.array(raw_data, dtype=object)[:, list(value_indices)].astype(np.float64) if count else np.empty((0, 5))
+    values = np.ascontiguousarray(values.T)  # une ligne contiguë par colonne
+    return {"timestamp": timestamps, **dict(zip(KLINE_COLUMNS[1:], values))}
+
+
+def _to_list(values: np.ndarray) -> List:
+    """tolist() avec NaN -> None (indicateurs incomplets), le JSON n'acceptant pas NaN"""
+    if values.dtype.kind == "f" and np.isnan(values).any():
+        return np.where(np.isnan(values), None, values).tolist()
+    return values.tolist()
+
+
+def columns_to_json(columns: Dict[str, np.ndarray]) -> Dict[str, List]:
+    """Format struct-of-arrays : {"timestamp": [...], "open": [...], ...}"""
+    return {name: _to_list(values) for name, values in columns.items()}
+
+
+def columns_to_records(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Format historique : une liste de dicts, un par bougie"""
+    names = list(columns.keys())
+    return [dict(zip(names, row)) for row in zip(*(_to_list(values) for values in columns.values()))]
+
+
+def columns_to_arrow(columns: Dict[str, np.ndarray]) -> bytes:
+    """Sérialise les colonnes au format Arrow IPC (stream)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError("pyarrow n'est pas installé sur le serveur")
+
+    batch = pa.record_batch([pa.array(values) for values in columns.values()], names=list(columns.keys()))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
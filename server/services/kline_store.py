@@ -0,0 +1,176 @@
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Tuple, List, Any
+import numpy as np
+from fastapi import HTTPException
+from server.services import indicators
+from server.services.intervals import interval_to_seconds, format_interval, is_calendar_interval
+from server.services.kline_columns import KLINE_COLUMNS
+
+
+NANOSECONDS = 1_000_000_000
+
+
+def resample(columns: Dict[str, np.ndarray], interval_seconds: int, base_seconds: int) -> Dict[str, np.ndarray]:
+    """
+    Agrège des bougies de base en bougies de interval_seconds (alignées sur l'epoch).
+    La première bougie est ignorée si elle est incomplète, la dernière est la bougie en cours.
+    """
+    if len(columns["timestamp"]) == 0:
+        return columns
+    bucket = columns["timestamp"] // (interval_seconds * NANOSECONDS)
+    starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+    ends = np.concatenate((starts[1:], [len(bucket)])) - 1
+
+    resampled = {
+        "timestamp": bucket[starts] * interval_seconds * NANOSECONDS,
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+    first_is_partial = columns["timestamp"][0] != resampled["timestamp"][0]
+    if first_is_partial and len(starts) > 1:
+        resampled = {name: values[1:] for name, values in resampled.items()}
+    return resampled
+
+
+class KlineStore:
+    """
+    Cache des bougies par (exchange, symbole, intervalle de base), en colonnes NumPy.
+
+    Les intervalles non supportés par un exchange sont dérivés des bougies de base
+    par agrégation vectorisée. Seules les bougies manquantes sont redemandées à
+    l'exchange, et les indicateurs sont mis à jour incrémentalement sur les
+    nouvelles bougies.
+
+    Les séries et les indicateurs sont gardés en LRU (max_series, max_indicators
+    entrées) : les moins récemment utilisés sont retirés.
+    """
+
+    def __init__(self, max_bars: int = 50_000, max_series: int = 500, max_indicators: int = 2000):
+        self.max_bars = max_bars
+        self.max_series = max_series
+        self.max_indicators = max_indicators
+        self.series: "OrderedDict[Tuple[str, str, int], Dict[str, np.ndarray]]" = OrderedDict()
+        # (exchange, symbole, intervalle, indicateur, fenêtre) -> (timestamps, valeurs)
+        self.indicator_cache: "OrderedDict[Tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+    @staticmethod
+    def _store(cache: OrderedDict, key, value, max_entries: int):
+        """Enregistre value comme la plus récemment utilisée, retire les plus anciennes au-delà de max_entries"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+    def merge(self, key: Tuple[str, str, int], columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Fusionne de nouvelles bougies dans la série (la version la plus récente d'une bougie l'emporte)"""
+        current = self.series.get(key)
+        if current is not None and len(current["timestamp"]):
+            columns = {name: np.concatenate((current[name], columns[name])) for name in KLINE_COLUMNS}
+            # np.unique garde la première occurrence : on inverse pour garder la plus récente
+            reversed_ts = columns["timestamp"][::-1]
+            _, index = np.unique(reversed_ts, return_index=True)
+            index = len(reversed_ts) - 1 - index
+            columns = {name: values[index] for name, values in columns.items()}
+        columns = {name: values[-self.max_bars:] for name, values in columns.items()}
+        self._store(self.series, key, columns, self.max_series)
+        return columns
+
+    def write_bar(self, exchange: str, symbol: str, interval_seconds: int, bar: Dict[str, Any]):
+        """Ajoute une bougie (ex: bougie clôturée reçue en streaming) à une série en cache"""
+        key = (exchange, symbol.upper(), interval_seconds)
+        current = self.series.get(key)
+        if current is not None and len(current["timestamp"]):
+            # Pas de trou dans la série : get_base_bars ne redemande que les bougies après la dernière connue
+            if bar["timestamp"] > int(current["timestamp"][-1]) + interval_seconds * NANOSECONDS:
+                return
+        self.merge(key, {name: np.array([bar[name]], dtype=np.int64 if name == "timestamp" else np.float64)
+                         for name in KLINE_COLUMNS})
+
+    def attach(self, subscription_manager):
+        """Enregistre les bougies clôturées des flux de klines de toutes les connexions"""
+        for exchange, connector in subscription_manager.exchange_connectors.items():
+            connector.kline_listeners.append(partial(self.on_kline, exchange))
+
+    def on_kline(self, exchange: str, symbol: str, interval: str, kline: Dict[str, Any], closed: bool):
+        if closed:
+            self.write_bar(exchange, symbol, interval_to_seconds(interval), kline)
+
+    @staticmethod
+    def base_interval(connector, interval_seconds: int) -> int:
+        """Plus grand intervalle supporté par l'exchange qui divise l'intervalle demandé"""
+        candidates = [s for s in connector.supported_intervals if interval_seconds % s == 0]
+        if not candidates:
+            raise HTTPException(status_code=400, detail="Invalid interval")
+        return max(candidates)
+
+    async def get_base_bars(self, connector, exchange: str, symbol: str, base_seconds: int, count: int):
+        key = (exchange, symbol.upper(), base_seconds)
+        cached = self.series.get(key)
+        to_fetch = count
+        if cached is not None and len(cached["timestamp"]) >= count:
+            # Uniquement les bougies depuis la dernière connue (qui était peut-être en cours)
+            elapsed = time.time_ns() - int(cached["timestamp"][-1])
+            to_fetch = min(count, elapsed // (base_seconds * NANOSECONDS) + 1)
+        fresh = await connector.get_klines_columns(symbol, format_interval(base_seconds), int(to_fetch))
+        columns = self.merge(key, fresh)
+        return {name: values[-count:] for name, values in columns.items()}
+
+    async def get_klines_columns(self, connector, exchange: str, symbol: str, interval: str, limit: int):
+        """Bougies de n'importe quel intervalle multiple d'un intervalle supporté par l'exchange"""
+        if is_calendar_interval(interval):
+            # Un mois n'est pas un multiple fixe d'un intervalle de base
+            raise HTTPException(status_code=400, detail="Calendar intervals (1M) cannot be resampled")
+        try:
+            interval_seconds = interval_to_seconds(interval)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid interval")
+        base_seconds = self.base_interval(connector, interval_seconds)
+        ratio = interval_seconds // base_seconds
+        # Une bougie agrégée de plus pour compenser une première bougie incomplète
+        columns = await self.get_base_bars(connector, exchange, symbol, base_seconds, (limit + 1) * ratio if ratio > 1 else limit)
+        if ratio > 1:
+            columns = resample(columns, interval_seconds, base_seconds)
+        return {name: values[-limit:] for name, values in columns.items()}
+
+    def compute_indicators(self, key: Tuple[str, str, str], columns: Dict[str, np.ndarray], requested: List[Tuple[str, int]]):
+        """
+        Ajoute les colonnes d'indicateurs. Les valeurs des bougies clôturées lors du
+        calcul précédent sont reprises du cache : seules les nouvelles bougies (et la
+        dernière, peut-être en cours) sont recalculées.
+        """
+        timestamps = columns["timestamp"]
+        for name, window in requested:
+            cache_key = (*key, name, window)
+            values = np.full(len(timestamps), np.nan)
+            start = 0
+
+            cached = self.indicator_cache.get(cache_key)
+            if cached is not None and len(cached[0]):
+                cached_ts, cached_values = cached
+                # Préfixe de bougies déjà calculées (la dernière du calcul précédent était peut-être en cours)
+                known = np.isin(timestamps, cached_ts[:-1], assume_unique=True)
+                start = len(known) if known.all() else int(np.argmin(known))
+                if name == "vwap" and start < len(timestamps):
+                    # Le VWAP repart du début du jour de la première bougie à recalculer
+                    day = timestamps // indicators.NANOSECONDS_PER_DAY
+                    start = int(np.searchsorted(day, day[start]))
+                if start:
+                    values[:start] = cached_values[np.searchsorted(cached_ts, timestamps[:start])]
+
+            if start < len(timestamps):
+                tail_from = max(0, start - indicators.lookback(name, window))
+                tail = {column: columns[column][tail_from:] for column in KLINE_COLUMNS}
+                seed = values[start - 1] if name == "ema" and start else None
+                values[start:] = indicators.compute(name, window, tail, seed)[start - tail_from:]
+
+            self._store(self.indicator_cache, cache_key, (timestamps, values), self.max_indicators)
+            columns[indicators.indicator_column(name, window)] = values
+        return columns
+
+
+kline_store = KlineStore()
@@ -0,0 +1,213 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+
+
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.environ.get(name, default).lower() in ("1", "true", "yes", "on")
+
+
+class LoopMonitor:
+    """
+    Profileur opt-in de la boucle asyncio partagée par tout le serveur.
+
+    - échantillonne le retard (lag) de la boucle à intervalle régulier
+    - un thread watchdog détecte les callbacks qui bloquent la boucle plus
+      longtemps que le seuil et capture leur pile
+    - les sections instrumentées (``with loop_monitor.section(...)``) sont
+      chronométrées et enregistrées si elles dépassent le seuil
+    - le profil échantillonné est exporté au format "folded" (flamegraph.pl,
+      speedscope, inferno...)
+
+    Activé avec la variable d'environnement LOOP_PROFILING=1.
+    """
+
+    _IDLE_FUNCTIONS = {"select", "poll", "epoll", "kqueue", "control"}
+
+    def __init__(
+            self,
+            enabled: bool = None,
+            lag_interval: float = None,
+            slow_threshold: float = None,
+            sample_interval: float = None,
+            max_slow_callbacks: int = 200,
+            max_lag_samples: int = 1000
+    ):
+        self.enabled = _env_flag("LOOP_PROFILING") if enabled is None else enabled
+        self.lag_interval = lag_interval or float(os.environ.get("LOOP_LAG_INTERVAL", 0.1))
+        self.slow_threshold = slow_threshold or float(os.environ.get("LOOP_SLOW_CALLBACK_MS", 100)) / 1000
+        self.sample_interval = sample_interval or float(os.environ.get("LOOP_SAMPLE_INTERVAL_MS", 5)) / 1000
+
+        # Statistiques
+        self.lag_samples = deque(maxlen=max_lag_samples)
+        self.slow_callbacks = deque(maxlen=max_slow_callbacks)
+        self.sections = {}  # nom -> {"count", "total", "max"}
+        self.folded_stacks = Counter()
+        # folded_stacks et slow_callbacks sont aussi écrits par le thread watchdog
+        self._lock = threading.Lock()
+
+        # Etat interne
+        self._loop = None
+        self._loop_thread_id = None
+        self._lag_task = None
+        self._watchdog = None
+        self._stop = threading.Event()
+        self._expected_wakeup = None
+        self._current_section = None
+        self._stall_start = None
+        self._stall_stack = None
+
+    def start(self):
+        """Démarre l'échantillonnage sur la boucle courante (à appeler depuis la boucle)"""
+        if not self.enabled or self._lag_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._lag_task = asyncio.create_task(self._sample_lag())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        print(f"[LoopMonitor] Profiling activé (seuil {self.slow_threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        """Arrête l'échantillonnage"""
+        self._stop.set()
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        self._watchdog = None
+        self._expected_wakeup = None
+
+    def reset(self):
+        """Vide les statistiques accumulées"""
+        self.lag_samples.clear()
+        self.sections.clear()
+        with self._lock:
+            self.slow_callbacks.clear()
+            self.folded_stacks.clear()
+
+    async def _sample_lag(self):
+        while True:
+            start = time.perf_counter()
+            self._expected_wakeup = start + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag_samples.append(max(0.0, time.perf_counter() - self._expected_wakeup))
+
+    def _watch(self):
+        """Thread watchdog : échantillonne la pile du thread de la boucle"""
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = self._extract(frame)
+            if stack and stack[-1][0] not in self._IDLE_FUNCTIONS:
+                folded = self._fold(stack, self._current_section)
+                with self._lock:
+                    self.folded_stacks[folded] += 1
+
+            expected = self._expected_wakeup
+            blocked_for = time.perf_counter() - expected if expected else 0.0
+            if blocked_for > self.slow_threshold:
+                if self._stall_start is None:
+                    self._stall_start = expected
+                    self._stall_stack = stack
+            elif self._stall_start is not None:
+                self._record_slow("loop_stall", time.perf_counter() - self._stall_start, self._stall_stack)
+                self._stall_start = None
+                self._stall_stack = None
+
+    @staticmethod
+    def _extract(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, os.path.basename(code.co_filename), code.co_firstlineno, frame.f_lineno))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    @staticmethod
+    def _fold(stack, section=None):
+        frames = [f"{name} ({filename}:{firstlineno})" for name, filename, firstlineno, _ in stack]
+        if section:
+            frames.insert(0, f"[{section}]")
+        return ";".join(frames)
+
+    def _record_slow(self, name: str, duration: float, stack):
+        record = {
+            "name": name,
+            "duration_ms": round(duration * 1000, 3),
+            "timestamp": time.time(),
+            "stack": [f"{filename}:{lineno} in {func}" for func, filename, _, lineno in (stack or [])],
+        }
+        with self._lock:
+            self.slow_callbacks.append(record)
+
+    @contextmanager
+    def _timed_section(self, name: str):
+        previous = self._current_section
+        self._current_section = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._current_section = previous
+            stats = self.sections.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+            if duration > self.slow_threshold:
+                stack = [(f.name, os.path.basename(f.filename), 0, f.lineno) for f in traceback.extract_stack()[:-2]]
+                self._record_slow(name, duration, stack)
+
+    def section(self, name: str):
+        """Chronomètre un bloc de code exécuté sur la boucle (no-op si le profiling est désactivé)"""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed_section(name)
+
+    def get_stats(self):
+        """Résumé des mesures : lag, sections instrumentées et derniers callbacks lents"""
+        lags = sorted(self.lag_samples)
+        with self._lock:
+            slow_callbacks = list(self.slow_callbacks)
+
+        def percentile(p):
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(p * len(lags)))] * 1000, 3)
+
+        return {
+            "enabled": self.enabled,
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "lag_ms": {
+                "samples": len(lags),
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": round(lags[-1] * 1000, 3) if lags else None,
+            },
+            "sections": {
+                name: {
+                    "count": stats["count"],
+                    "avg_ms": round(stats["total"] / stats["count"] * 1000, 3),
+                    "max_ms": round(stats["max"] * 1000, 3),
+                }
+                for name, stats in self.sections.items()
+            },
+            "slow_callbacks": slow_callbacks,
+        }
+
+    def dump_folded(self) -> str:
+        """Profil échantillonné au format folded : 'frame1;frame2;... count' par ligne"""
+        with self._lock:
+            folded_stacks = Counter(self.folded_stacks)
+        return "\n".join(f"{stack} {count}" for stack, count in folded_stacks.most_common())
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import os
+from functools import partial
+from typing import Dict, Set, Any, List, Callable, Tuple
+from server.services.subscription_manager import SubscriptionManager
+
+
+DEFAULT_BUS_PATH = "/tmp/cryptoapi-market-data.sock"
+
+# Au-delà de ce volume en attente d'écriture, un worker lent saute des mises à jour
+MAX_WORKER_BUFFER = 4 * 1024 * 1024
+
+
+def get_bus_path():
+    """Chemin du socket Unix du bus, None si le serveur tourne en mode mono-process"""
+    return os.environ.get("MARKET_DATA_BUS")
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message) + "\n").encode()
+
+
+class MarketDataBusServer:
+    """
+    Processus market data : seul propriétaire des connexions aux exchanges.
+
+    Les workers API se connectent sur un socket Unix et envoient des lignes
+    JSON {"action": "subscribe"|"unsubscribe", "symbol": ...}. Chaque mise à
+    jour de carnet est republiée aux workers abonnés au symbole.
+    Les flux de klines suivent le même principe avec les actions
+    "subscribe_klines"/"unsubscribe_klines" (exchange, symbol, interval).
+    """
+
+    def __init__(self, path: str = None, subscription_manager: SubscriptionManager = None):
+        self.path = path or get_bus_path() or DEFAULT_BUS_PATH
+        self.subscription_manager = subscription_manager or SubscriptionManager()
+        self.workers: Dict[asyncio.StreamWriter, Set[str]] = {}
+        self.worker_klines: Dict[asyncio.StreamWriter, Set[Tuple[str, str, str]]] = {}
+        self.server = None
+
+    async def start(self):
+        await self.subscription_manager.connect()
+        await self.subscription_manager.run()
+        for exchange, connector in self.subscription_manager.exchange_connectors.items():
+            connector.book_listeners.append(partial(self.publish, exchange))
+            connector.kline_listeners.append(partial(self.publish_kline, exchange))
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self.handle_worker, path=self.path)
+        print(f"[MarketDataBus] En écoute sur {self.path}")
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        symbols = self.workers.setdefault(writer, set())
+        klines = self.worker_klines.setdefault(writer, set())
+        writer.write(_encode({
+            "type": "hello",
+            "exchanges": list(self.subscription_manager.exchange_connectors.keys()),
+            "kline_intervals": {
+                exchange: connector.kline_intervals
+                for exchange, connector in self.subscription_manager.exchange_connectors.items()
+            }
+        }))
+        print(f"[MarketDataBus] Worker connecté ({len(self.workers)} au total)")
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                action = message.get("action")
+                symbol = message.get("symbol", "").upper()
+
+                if action == "subscribe" and symbol not in symbols:
+                    symbols.add(symbol)
+                    await self.subscription_manager.add_subscription(symbol)
+                    self.send_snapshot(writer, symbol)
+                elif action == "unsubscribe" and symbol in symbols:
+                    symbols.remove(symbol)
+                    await self.subscription_manager.remove_subscription(symbol)
+                elif action in ("subscribe_klines", "unsubscribe_klines"):
+                    key = (message["exchange"], symbol, message["interval"])
+                    if action == "subscribe_klines" and key not in klines:
+                        klines.add(key)
+                        await self.subscription_manager.add_kline_subscription(*key)
+                        self.send_kline_snapshot(writer, *key)
+                    elif action == "unsubscribe_klines" and key in klines:
+                        klines.remove(key)
+                        await self.subscription_manager.remove_kline_subscription(*key)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            print(f"[MarketDataBus] Erreur worker : {e}")
+        finally:
+            # Libère les abonnements du worker déconnecté
+            for symbol in self.workers.pop(writer, set()):
+                await self.subscription_manager.remove_subscription(symbol)
+            for key in self.worker_klines.pop(writer, set()):
+                await self.subscription_manager.remove_kline_subscription(*key)
+            writer.close()
+            print(f"[MarketDataBus] Worker déconnecté ({len(self.workers)} restants)")
+
+    def send_snapshot(self, writer: asyncio.StreamWriter, symbol: str):
+        """Envoie les carnets déjà connus à un worker qui vient de s'abonner"""
+        for exchange, connector in self.subscription_manager.exchange_connectors.items():
+            book = connector.order_book.get(symbol)
+            if book is not None:
+                writer.write(_encode({"type": "order_book", "exchange": exchange, "symbol": symbol, "book": book}))
+
+    def publish(self, exchange: str, symbol: str, book: Dict[str, Any]):
+        line = None
+        for writer, symbols in self.workers.items():
+            if symbol not in symbols or writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_WORKER_BUFFER:
+                continue
+            if line is None:
+                line = _encode({"type": "order_book", "exchange": exchange, "symbol": symbol, "book": book})
+            writer.write(line)
+
+    def send_kline_snapshot(self, writer: asyncio.StreamWriter, exchange: str, symbol: str, interval: str):
+        kline = self.subscription_manager.exchange_connectors[exchange].klines.get((symbol, interval))
+        if kline is not None:
+            writer.write(_encode({
+                "type": "kline", "exchange": exchange, "symbol": symbol,
+                "interval": interval, "kline": kline, "closed": False
+            }))
+
+    def publish_kline(self, exchange: str, symbol: str, interval: str, kline: Dict[str, Any], closed: bool):
+        key = (exchange, symbol, interval)
+        line = None
+        for writer, klines in self.worker_klines.items():
+            if key not in klines or writer.is_closing():
+                continue
+            # Une bougie clôturée n'est jamais sautée, même pour un worker lent
+            if not closed and writer.transport.get_write_buffer_size() > MAX_WORKER_BUFFER:
+                continue
+            if line is None:
+                line = _encode({
+                    "type": "kline", "exchange": exchange, "symbol": symbol,
+                    "interval": interval, "kline": kline, "closed": closed
+                })
+            writer.write(line)
+
+
+class BusBookView:
+    """Vue locale des carnets d'un exchange, alimentée par le bus (même interface que les connexions WS)"""
+
+    def __init__(self, exchange: str, kline_intervals: List[int] = None):
+        self.exchange = exchange
+        self.order_book = {}
+        self.book_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self.kline_intervals = kline_intervals or []
+        self.klines: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.kline_listeners: List[Callable[[str, str, Dict[str, Any], bool], None]] = []
+
+    def update_order_book(self, symbol: str, standardized: Dict[str, Any]):
+        self.order_book[symbol] = standardized
+        for listener in self.book_listeners:
+            listener(symbol, standardized)
+
+    def update_kline(self, symbol: str, interval: str, kline: Dict[str, Any], closed: bool):
+        self.klines[(symbol, interval)] = kline
+        for listener in self.kline_listeners:
+            listener(symbol, interval, kline, closed)
+
+
+class MarketDataBusClient:
+    """
+    Remplace le SubscriptionManager dans les workers API : les carnets sont
+    reçus du processus market data au lieu d'ouvrir des connexions aux exchanges.
+    """
+
+    def __init__(self, path: str = None, reconnect_delay: float = 1.0):
+        self.path = path or get_bus_path() or DEFAULT_BUS_PATH
+        self.reconnect_delay = reconnect_delay
+        self.exchange_connectors: Dict[str, BusBookView] = {}
+        self.subscriptions: Dict[str, int] = {}
+        self.kline_subscriptions: Dict[Tuple[str, str, str], int] = {}
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        print("Connecting to market data bus")
+        self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+        hello = json.loads(await self.reader.readline())
+        for exchange in hello["exchanges"]:
+            view = self.exchange_connectors.setdefault(exchange, BusBookView(exchange))
+            view.kline_intervals = hello.get("kline_intervals", {}).get(exchange, [])
+        # Rejoue les abonnements après une reconnexion
+        for symbol in self.subscriptions:
+            await self._send({"action": "subscribe", "symbol": symbol})
+        for exchange, symbol, interval in self.kline_subscriptions:
+            await self._send({"action": "subscribe_klines", "exchange": exchange, "symbol": symbol, "interval": interval})
+
+    async def run(self):
+        asyncio.create_task(self.listen())
+
+    async def listen(self):
+        while True:
+            try:
+                async for line in self.reader:
+                    message = json.loads(line)
+                    if message.get("type") == "order_book":
+                        view = self.exchange_connectors.setdefault(message["exchange"], BusBookView(message["exchange"]))
+                        view.update_order_book(message["symbol"], message["book"])
+                    elif message.get("type") == "kline":
+                        view = self.exchange_connectors[message["exchange"]]
+                        view.update_kline(message["symbol"], message["interval"], message["kline"], message["closed"])
+            except (ConnectionError, json.JSONDecodeError) as e:
+                print(f"[MarketDataBus] Erreur de lecture : {e}")
+
+            print("[MarketDataBus] Connexion au bus perdue, reconnexion...")
+            while True:
+                await asyncio.sleep(self.reconnect_delay)
+                try:
+                    await self.connect()
+                    break
+                except (ConnectionError, FileNotFoundError):
+                    continue
+
+    async def _send(self, message: Dict[str, Any]):
+        try:
+            self.writer.write(_encode(message))
+            await self.writer.drain()
+        except ConnectionError:
+            # Les abonnements seront rejoués à la reconnexion
+            pass
+
+    async def add_subscription(self, symbol: str):
+        if self.subscriptions.get(symbol, 0) == 0:
+            self.subscriptions[symbol] = 1
+            await self._send({"action": "subscribe", "symbol": symbol})
+        else:
+            self.subscriptions[symbol] += 1
+
+    async def remove_subscription(self, symbol: str):
+        if symbol in self.subscriptions:
+            self.subscriptions[symbol] -= 1
+            if self.subscriptions[symbol] <= 0:
+                del self.subscriptions[symbol]
+                await self._send({"action": "unsubscribe", "symbol": symbol})
+
+    async def add_kline_subscription(self, exchange: str, symbol: str, interval: str):
+        key = (exchange, symbol, interval)
+        count = self.kline_subscriptions.get(key, 0)
+        self.kline_subscriptions[key] = count + 1
+        if count == 0:
+            await self._send({"action": "subscribe_klines", "exchange": exchange, "symbol": symbol, "interval": interval})
+
+    async def remove_kline_subscription(self, exchange: str, symbol: str, interval: str):
+        key = (exchange, symbol, interval)
+        if key in self.kline_subscriptions:
+            self.kline_subscriptions[key] -= 1
+            if self.kline_subscriptions[key] <= 0:
+                del self.kline_subscriptions[key]
+                await self._send({"action": "unsubscribe_klines", "exchange": exchange, "symbol": symbol, "interval": interval})
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import time
+import uuid
+from bisect import insort, bisect_left
+from collections import defaultdict, OrderedDict
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def new_order_id() -> str:
+    """ID aléatoire : unique sans coordination entre workers, et impossible à deviner"""
+    return f"order_{uuid.uuid4().hex}"
+
+
+def encode_cursor(created_at: float, order_id: str) -> str:
+    return f"{created_at!r}|{order_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Curseur de pagination : position (created_at, order_id) du dernier ordre renvoyé"""
+    created_at, _, order_id = cursor.partition("|")
+    return float(created_at), order_id
+
+
+class OrderRegistry:
+    """
+    Ordres du worker, indexés par propriétaire, (propriétaire, symbole) et
+    (propriétaire, statut).
+
+    Les index par propriétaire et symbole sont des listes triées par date de
+    création : une page s'obtient par bisection à partir du curseur, sans
+    parcourir l'historique. L'index par statut est mis à jour à chaque
+    changement de statut d'un ordre.
+
+    Les update_listeners sont appelés à chaque exécution, changement de statut
+    ou modification d'un ordre : listener(order_id, ordre).
+
+    Les ordres terminés sont retirés après retention_seconds, et les plus
+    anciens au-delà de max_finished ordres terminés ; en mode multi-worker
+    leur dernier statut reste dans le store partagé.
+    """
+
+    finished_statuses = ("completed", "cancelled", "error")
+
+    def __init__(self, retention_seconds: float = None, max_finished: int = None):
+        self.retention_seconds = retention_seconds or float(os.environ.get("ORDER_RETENTION_SECONDS", 86400))
+        self.max_finished = max_finished or int(os.environ.get("MAX_FINISHED_ORDERS", 10000))
+        # Ordres terminés -> date de fin, du plus ancien au plus récent
+        self.finished: "OrderedDict[str, float]" = OrderedDict()
+        self.orders: Dict[str, "TWAPOrder"] = {}
+        self.by_owner: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+        self.by_owner_symbol: Dict[Tuple[str, str], List[Tuple[float, str]]] = defaultdict(list)
+        self.by_owner_status: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(dict)
+        self.update_listeners: List[Callable[[str, Any], None]] = []
+
+    def __contains__(self, order_id: str):
+        return order_id in self.orders
+
+    def __getitem__(self, order_id: str):
+        return self.orders[order_id]
+
+    def __len__(self):
+        return len(self.orders)
+
+    def get(self, order_id: str, default=None):
+        return self.orders.get(order_id, default)
+
+    def add(self, order_id: str, order):
+        self.evict()
+        self.orders[order_id] = order
+        key = (order.created_at, order_id)
+        insort(self.by_owner[order.owner], key)
+        insort(self.by_owner_symbol[(order.owner, order.symbol)], key)
+        self.by_owner_status[(order.owner, order.status)][order_id] = order.created_at
+        order.status_listeners.append(partial(self._on_status_change, order_id))
+        order.fill_listeners.append(lambda order, fill: self._notify(order_id))
+        order.change_listeners.append(lambda order: self._notify(order_id))
+        self._notify(order_id)
+
+    def _on_status_change(self, order_id: str, previous: str, status: str):
+        order = self.orders[order_id]
+        self.by_owner_status[(order.owner, previous)].pop(order_id, None)
+        self.by_owner_status[(order.owner, status)][order_id] = order.created_at
+        if status in self.finished_statuses and order_id not in self.finished:
+            self.finished[order_id] = time.time()
+        self._notify(order_id)
+
+    def evict(self, now: float = None):
+        """Retire les ordres terminés depuis plus de retention_seconds, et les plus anciens au-delà de max_finished"""
+        now = time.time() if now is None else now
+        while self.finished:
+            order_id, finished_at = next(iter(self.finished.items()))
+            if now - finished_at <= self.retention_seconds and len(self.finished) <= self.max_finished:
+                break
+            del self.finished[order_id]
+            self._remove(order_id)
+
+    def _remove(self, order_id: str):
+        order = self.orders.pop(order_id)
+        key = (order.created_at, order_id)
+        for indexes, index_key in ((self.by_owner, order.owner), (self.by_owner_symbol, (order.owner, order.symbol))):
+            index = indexes[index_key]
+            position = bisect_left(index, key)
+            if position < len(index) and index[position] == key:
+                del index[position]
+            if not index:
+                del indexes[index_key]
+        bucket = self.by_owner_status[(order.owner, order.status)]
+        bucket.pop(order_id, None)
+        if not bucket:
+            del self.by_owner_status[(order.owner, order.status)]
+
+    def _notify(self, order_id: str):
+        order = self.orders[order_id]
+        for listener in self.update_listeners:
+            listener(order_id, order)
+
+    def query(self, owner: str, status: str = None, symbol: str = None, cursor: str = None, limit: int = 50):
+        """
+        Ordres de owner du plus récent au plus ancien, filtrés par statut et/ou symbole.
+        Renvoie ([(order_id, ordre)], curseur de la page suivante ou None).
+        """
+        before = decode_cursor(cursor) if cursor else None
+
+        index = self.by_owner_symbol.get((owner, symbol), []) if symbol is not None else self.by_owner.get(owner, [])
+        bucket = self.by_owner_status.get((owner, status), {}) if status is not None else None
+
+        if bucket is not None and (len(bucket) <= 1000 or 4 * len(bucket) < len(index)):
+            # Statut rare (ex: ordres actifs) : on ne trie que les ordres de ce statut
+            keys = sorted(((created_at, order_id) for order_id, created_at in bucket.items()), reverse=True)
+            if before is not None:
+                keys = [key for key in keys if key < before]
+        else:
+            # Statut fréquent : parcours de l'index trié, les ordres d'un autre statut sont rares
+            end = bisect_left(index, before) if before is not None else len(index)
+            keys = (index[i] for i in range(end - 1, -1, -1))
+
+        page = []
+        for created_at, order_id in keys:
+            order = self.orders[order_id]
+            if (symbol is not None and order.symbol != symbol) or (status is not None and order.status != status):
+                continue
+            page.append((order_id, order))
+            if len(page) > limit:
+                break
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1][1].created_at, page[-1][0])
+        return page, next_cursor
+
+
+class SharedOrderFeed:
+    """
+    Statuts des ordres exécutés par les autres workers (mode multi-worker) : les
+    ordres modifiés depuis la lecture précédente sont relus dans le store partagé
+    toutes les poll_seconds et transmis aux listeners(order_id, statut). Les
+    ordres du worker sont ignorés, l'OrderRegistry les notifie déjà.
+    """
+
+    # Marge de relecture : un statut horodaté avant une lecture peut être écrit après elle
+    overlap_seconds = 2.0
+
+    def __init__(self, store, registry: OrderRegistry, poll_seconds: float = 1.0):
+        self.store = store
+        self.registry = registry
+        self.poll_seconds = poll_seconds
+        self.listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self.since = time.time()
+        # order_id -> updated_at déjà transmis, pour ne pas renvoyer un statut relu dans la marge
+        self.seen: Dict[str, float] = {}
+
+    def poll(self):
+        if not self.listeners:
+            # Personne à notifier : rien à rattraper au prochain abonnement
+            self.since = time.time()
+            self.seen.clear()
+            return
+        rows = self.store.orders_updated_since(self.since - self.overlap_seconds)
+        for order_id, updated_at, status in rows:
+            if self.seen.get(order_id) == updated_at or order_id in self.registry:
+                continue
+            self.seen[order_id] = updated_at
+            for listener in self.listeners:
+                listener(order_id, status)
+        if rows:
+            self.since = max(self.since, rows[-1][1])
+        horizon = self.since - self.overlap_seconds
+        self.seen = {order_id: updated_at for order_id, updated_at in self.seen.items() if updated_at > horizon}
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[Orders] Lecture des ordres des autres workers impossible : {e}")
@@ -0,0 +1,79 @@
+import heapq
+from itertools import takewhile
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from server.connectors.registry import connector_registry
+
+
+# Mode de routage : chaque tranche est répartie entre les exchanges
+BEST_EXECUTION = "best"
+
+
+class FeeModel:
+    """Frais d'un exchange, proportionnels au montant exécuté (ordres taker)"""
+
+    def __init__(self, taker_rate: float):
+        self.taker_rate = taker_rate
+
+    def fee(self, quantity: float, price: float) -> float:
+        return quantity * price * self.taker_rate
+
+
+def fee_model(venue: str) -> FeeModel:
+    """Frais de l'exchange, déclarés par son connecteur (ou son ExchangeSpec) dans le registre"""
+    return FeeModel(connector_registry.taker_fee(venue))
+
+
+def _levels(book: Dict[str, Any], side: str, venue: str, limit_price: float = None):
+    """Niveaux exécutables d'un carnet : (clé de tri, prix, taille, exchange), meilleur prix net de frais d'abord"""
+    if side == "buy":
+        rate = 1 + fee_model(venue).taker_rate
+        levels = book.get("asks") or []
+        if limit_price:
+            levels = takewhile(lambda level: level[0] <= limit_price, levels)
+        return ((price * rate, price, size, venue) for price, size in levels)
+    rate = 1 - fee_model(venue).taker_rate
+    levels = book.get("bids") or []
+    if limit_price:
+        levels = takewhile(lambda level: level[0] >= limit_price, levels)
+    return ((-price * rate, price, size, venue) for price, size in levels)
+
+
+def route(books: Dict[str, Optional[Dict[str, Any]]], side: str, quantity: float,
+          limit_price: float = None,
+          round_quantity: Callable[[str, float], float] = None) -> List[Tuple[str, float, float]]:
+    """
+    Répartit quantity entre les carnets de plusieurs exchanges en parcourant le
+    carnet consolidé, niveau par niveau, du meilleur prix net de frais au moins
+    bon. Le prix limite s'applique au prix affiché de chaque exchange.
+
+    Les carnets sont fusionnés paresseusement (heapq.merge) : seuls les niveaux
+    consommés sont lus. round_quantity(exchange, quantité) arrondit la quantité
+    de chaque exchange (lot) ; le prix moyen est celui des meilleurs niveaux de
+    la quantité arrondie. Renvoie [(exchange, quantité, prix moyen)].
+    """
+    streams = [_levels(book, side, venue, limit_price) for venue, book in books.items() if book]
+    taken: Dict[str, List[Tuple[float, float]]] = {}  # exchange -> [(prix, quantité)], meilleur prix d'abord
+    remaining = quantity
+    for _, price, size, venue in heapq.merge(*streams):
+        take = min(size, remaining)
+        taken.setdefault(venue, []).append((price, take))
+        remaining -= take
+        if remaining <= 1e-12:
+            break
+
+    fills = []
+    for venue, levels in taken.items():
+        total = sum(take for _, take in levels)
+        if round_quantity is not None:
+            total = round_quantity(venue, total)
+        if total <= 0:
+            continue
+        notional, left = 0.0, total
+        for price, take in levels:
+            take = min(take, left)
+            notional += take * price
+            left -= take
+            if left <= 1e-12:
+                break
+        fills.append((venue, total, notional / total))
+    return fills
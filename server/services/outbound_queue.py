@@ -0,0 +1,81 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Hashable, List, Tuple
+
+
+class ConflatingQueue:
+    """
+    File sortante bornée d'un client WebSocket.
+
+    Les messages de données sont indexés par clé (ex: ("order_book", "BTCUSDT")) :
+    si un message de même clé attend encore d'être envoyé, il est remplacé par
+    le plus récent (conflation), seul le dernier carnet par symbole est gardé.
+    Les messages de contrôle (authentification, erreurs) ne sont jamais conflatés.
+    """
+
+    def __init__(self, max_pending: int = 256):
+        self.max_pending = max_pending
+        self.pending: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.control: deque = deque()
+        self._ready = asyncio.Event()
+
+        # Compteurs
+        self.enqueued = 0
+        self.conflated = 0  # messages remplacés par une version plus récente avant envoi
+        self.dropped = 0    # messages rejetés car la file est pleine
+        self.sent = 0
+
+    def __len__(self):
+        return len(self.pending) + len(self.control)
+
+    def put(self, key: Hashable, message: Any) -> bool:
+        """Ajoute un message de données, sans jamais bloquer le producteur"""
+        self.enqueued += 1
+        if key in self.pending:
+            # On garde la date du plus ancien message non envoyé pour mesurer le retard
+            _, enqueued_at = self.pending[key]
+            self.pending[key] = (message, enqueued_at)
+            self.conflated += 1
+        elif len(self) >= self.max_pending:
+            self.dropped += 1
+            return False
+        else:
+            self.pending[key] = (message, time.monotonic())
+        self._ready.set()
+        return True
+
+    def put_control(self, message: Any):
+        """Ajoute un message de contrôle, envoyé tel quel et dans l'ordre"""
+        self.enqueued += 1
+        self.control.append(message)
+        self._ready.set()
+
+    async def get_batch(self) -> Tuple[List[Any], List[Any]]:
+        """Attend puis vide la file : (messages de contrôle, messages de données)"""
+        while not len(self):
+            self._ready.clear()
+            await self._ready.wait()
+        control = list(self.control)
+        self.control.clear()
+        data = [message for message, _ in self.pending.values()]
+        self.pending.clear()
+        self.sent += len(control) + len(data)
+        return control, data
+
+    def lag(self) -> float:
+        """Ancienneté (en secondes) du plus vieux message en attente"""
+        if not self.pending:
+            return 0.0
+        oldest = min(enqueued_at for _, enqueued_at in self.pending.values())
+        return time.monotonic() - oldest
+
+    def get_stats(self):
+        return {
+            "pending": len(self),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "conflated": self.conflated,
+            "dropped": self.dropped,
+            "lag_seconds": round(self.lag(), 3),
+        }
@@ -0,0 +1,240 @@
+import asyncio
+import uuid
+from functools import partial
+from typing import Dict, Any, List, Tuple
+import numpy as np
+
+
+class PortfolioLedger:
+    """
+    Portefeuille fictif de chaque utilisateur, alimenté par les exécutions des ordres.
+
+    Une ligne par (utilisateur, symbole) dans des tableaux NumPy : quantité,
+    prix moyen, PnL réalisé et flux de cash. Chaque exécution met à jour sa
+    ligne en O(1) (méthode du prix moyen). Chaque carnet met à jour le mid
+    consolidé du symbole ; le PnL latent de toutes les lignes est recalculé en
+    une opération vectorisée, au plus une fois par version des données.
+
+    En mode multi-worker (store partagé), les exécutions du worker sont
+    publiées dans le store et celles des autres workers y sont relues :
+    chaque worker tient le portefeuille complet de tous les utilisateurs.
+    """
+
+    def __init__(self, subscription_manager=None, capacity: int = 1024, store=None):
+        self.subscription_manager = subscription_manager
+        self.store = store
+        self.worker_id = uuid.uuid4().hex
+        # Exécutions du worker pas encore publiées, et dernière exécution relue dans le store
+        self.pending_fills: List[Tuple[str, str, float, float, float]] = []
+        self.last_fill_id = 0
+        self.n_rows = 0
+        self.quantity = np.zeros(capacity)
+        self.average_price = np.zeros(capacity)
+        self.realized_pnl = np.zeros(capacity)
+        self.cash = np.zeros(capacity)
+        self.user_index = np.zeros(capacity, dtype=np.int64)
+        self.symbol_index = np.zeros(capacity, dtype=np.int64)
+
+        self.users: Dict[str, int] = {}
+        self.symbols: Dict[str, int] = {}
+        self.rows: Dict[Tuple[str, str], int] = {}
+        self.user_rows: Dict[str, List[int]] = {}
+
+        # Meilleurs prix par symbole et par exchange, et mid consolidé par symbole
+        self.best_prices: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self.mids = np.full(64, np.nan)
+        # Nombre de positions ouvertes par symbole : le carnet est suivi tant qu'il y en a une
+        self.open_positions: Dict[str, int] = {}
+
+        self.version = 0
+        self._marks = None  # (version, pnl latent par ligne)
+        # Versions par utilisateur (exécutions) et par symbole (mid) : un portefeuille
+        # n'est recalculé et renvoyé que si l'une de ses lignes a changé
+        self.fill_versions: Dict[str, int] = {}
+        self.mid_versions = np.zeros(64, dtype=np.int64)
+
+    def attach(self, subscription_manager):
+        """Valorise les positions avec les carnets de toutes les connexions"""
+        self.subscription_manager = subscription_manager
+        for exchange, connector in subscription_manager.exchange_connectors.items():
+            connector.book_listeners.append(partial(self.on_order_book, exchange))
+
+    def _grow(self):
+        for name in ("quantity", "average_price", "realized_pnl", "cash", "user_index", "symbol_index"):
+            values = getattr(self, name)
+            setattr(self, name, np.concatenate((values, np.zeros_like(values))))
+
+    def _get_row(self, user: str, symbol: str) -> int:
+        row = self.rows.get((user, symbol))
+        if row is not None:
+            return row
+        if self.n_rows == len(self.quantity):
+            self._grow()
+        if symbol not in self.symbols:
+            self.symbols[symbol] = len(self.symbols)
+            if len(self.symbols) > len(self.mids):
+                self.mids = np.concatenate((self.mids, np.full(len(self.mids), np.nan)))
+                self.mid_versions = np.concatenate((self.mid_versions, np.zeros_like(self.mid_versions)))
+        row = self.rows[(user, symbol)] = self.n_rows
+        self.user_index[row] = self.users.setdefault(user, len(self.users))
+        self.symbol_index[row] = self.symbols[symbol]
+        self.user_rows.setdefault(user, []).append(row)
+        self.n_rows += 1
+        return row
+
+    def on_fill(self, order, fill: Dict[str, Any]):
+        """Callback des ordres : met à jour la position du propriétaire"""
+        signed_quantity = fill["quantity"] if order.side == "buy" else -fill["quantity"]
+        fee = fill.get("fee", 0.0)
+        self.record_fill(order.owner, order.symbol, signed_quantity, fill["price"], fee)
+        if self.store is not None:
+            self.pending_fills.append((order.owner, order.symbol, signed_quantity, fill["price"], fee))
+
+    def sync(self, batch_size: int = 10000):
+        """Mode multi-worker : publie les exécutions du worker et applique celles des autres workers"""
+        if self.pending_fills:
+            pending, self.pending_fills = self.pending_fills, []
+            self.store.save_fills(self.worker_id, pending)
+        while True:
+            rows = self.store.fills_after(self.last_fill_id, batch_size)
+            for fill_id, worker, owner, symbol, signed_quantity, price, fee in rows:
+                if worker != self.worker_id:
+                    self.record_fill(owner, symbol, signed_quantity, price, fee)
+            if rows:
+                self.last_fill_id = rows[-1][0]
+            if len(rows) < batch_size:
+                break
+
+    async def run(self, poll_seconds: float = 1.0):
+        while True:
+            await asyncio.sleep(poll_seconds)
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"[Portfolio] Synchronisation des exécutions impossible : {e}")
+
+    def record_fill(self, user: str, symbol: str, signed_quantity: float, price: float, fee: float = 0.0):
+        row = self._get_row(user, symbol)
+        position = self.quantity[row]
+        average = self.average_price[row]
+
+        if position == 0 or np.sign(position) == np.sign(signed_quantity):
+            # Ouverture ou renforcement : nouveau prix moyen
+            self.average_price[row] = (position * average + signed_quantity * price) / (position + signed_quantity)
+        else:
+            # Réduction : PnL réalisé sur la quantité fermée
+            closed = np.sign(position) * min(abs(signed_quantity), abs(position))
+            self.realized_pnl[row] += closed * (price - average)
+            if abs(signed_quantity) > abs(position):
+                # Retournement : le reste ouvre une position au prix de l'exécution
+                self.average_price[row] = price
+            elif abs(signed_quantity) == abs(position):
+                self.average_price[row] = 0.0
+
+        quantity = position + signed_quantity
+        if abs(quantity) < 1e-12:
+            # Position soldée (aux erreurs d'arrondi près)
+            quantity = 0.0
+            self.average_price[row] = 0.0
+        self.quantity[row] = quantity
+        # Les frais sont payés en cash et réduisent le PnL réalisé
+        self.cash[row] -= signed_quantity * price + fee
+        self.realized_pnl[row] -= fee
+        self.version += 1
+        self.fill_versions[user] = self.fill_versions.get(user, 0) + 1
+
+        if position == 0 and quantity != 0:
+            self._follow(symbol, 1)
+        elif position != 0 and quantity == 0:
+            self._follow(symbol, -1)
+
+    def _follow(self, symbol: str, change: int):
+        """
+        Suit le carnet d'un symbole tant qu'une position y est ouverte,
+        pour que le mid reste à jour après la fin des ordres
+        """
+        count = self.open_positions.get(symbol, 0) + change
+        self.open_positions[symbol] = count
+        if self.subscription_manager is None:
+            return
+        if count == 1 and change > 0:
+            asyncio.get_running_loop().create_task(self.subscription_manager.add_subscription(symbol))
+        elif count == 0:
+            asyncio.get_running_loop().create_task(self.subscription_manager.remove_subscription(symbol))
+
+    def on_order_book(self, exchange: str, symbol: str, book: Dict[str, Any]):
+        index = self.symbols.get(symbol)
+        if index is None:
+            return
+        bids, asks = book.get("bids"), book.get("asks")
+        best = self.best_prices.setdefault(symbol, {})
+        best[exchange] = (bids[0][0] if bids else np.nan, asks[0][0] if asks else np.nan)
+        best_bid = max((bid for bid, _ in best.values() if bid == bid), default=np.nan)
+        best_ask = min((ask for _, ask in best.values() if ask == ask), default=np.nan)
+        mid = (best_bid + best_ask) / 2
+        if mid != self.mids[index]:
+            self.mids[index] = mid
+            self.mid_versions[index] += 1
+            self.version += 1
+
+    def user_version(self, user: str) -> int:
+        """Version du portefeuille de user : change à chaque exécution de user ou mid d'un de ses symboles"""
+        rows = self.user_rows.get(user)
+        if not rows:
+            return self.fill_versions.get(user, 0)
+        return self.fill_versions.get(user, 0) + int(self.mid_versions[self.symbol_index[rows]].sum())
+
+    def unrealized_pnl(self) -> np.ndarray:
+        """PnL latent de toutes les lignes, recalculé seulement si une exécution ou un mid a changé"""
+        if self._marks is None or self._marks[0] != self.version:
+            n = self.n_rows
+            mids = self.mids[self.symbol_index[:n]]
+            unrealized = self.quantity[:n] * (mids - self.average_price[:n])
+            self._marks = (self.version, np.where(self.quantity[:n] == 0, 0.0, unrealized))
+        return self._marks[1]
+
+    def get_portfolio(self, user: str) -> Dict[str, Any]:
+        rows = np.array(self.user_rows.get(user, []), dtype=np.int64)
+        unrealized = self.unrealized_pnl()[rows]
+        mids = self.mids[self.symbol_index[rows]]
+        symbols = list(self.symbols)
+
+        def value(x):
+            return None if np.isnan(x) else float(x)
+
+        positions = [
+            {
+                "symbol": symbols[self.symbol_index[row]],
+                "quantity": float(self.quantity[row]),
+                "average_price": float(self.average_price[row]),
+                "mid_price": value(mids[i]),
+                "realized_pnl": float(self.realized_pnl[row]),
+                "unrealized_pnl": value(unrealized[i]),
+                "cash": float(self.cash[row]),
+            }
+            for i, row in enumerate(rows)
+        ]
+        realized = float(self.realized_pnl[rows].sum())
+        open_pnl = float(np.nansum(unrealized))
+        return {
+            "positions": positions,
+            "cash": float(self.cash[rows].sum()),
+            "realized_pnl": realized,
+            "unrealized_pnl": open_pnl,
+            "total_pnl": realized + open_pnl,
+        }
+
+    def get_totals(self) -> Dict[str, Dict[str, float]]:
+        """PnL de tous les utilisateurs, agrégé en une passe (np.bincount)"""
+        n_users = len(self.users)
+        user_index = self.user_index[:self.n_rows]
+        realized = np.bincount(user_index, weights=self.realized_pnl[:self.n_rows], minlength=n_users)
+        unrealized = np.bincount(user_index, weights=np.nan_to_num(self.unrealized_pnl()), minlength=n_users)
+        return {
+            user: {
+                "realized_pnl": float(realized[index]),
+                "unrealized_pnl": float(unrealized[index]),
+                "total_pnl": float(realized[index] + unrealized[index]),
+            }
+            for user, index in self.users.items()
+        }
@@ -0,0 +1,198 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+# Priorités des requêtes REST vers les exchanges (la plus petite passe en premier)
+PRIORITY_TRADING = 0   # ordres (profil de volume VWAP)
+PRIORITY_NORMAL = 1    # requêtes des clients
+PRIORITY_BULK = 2      # téléchargements d'historique (/klines/batch)
+
+request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def use_priority(priority: int):
+    """Priorité des requêtes faites dans ce bloc (et dans les tâches qui y sont créées)"""
+    previous = request_priority.set(priority)
+    try:
+        yield
+    finally:
+        request_priority.reset(previous)
+
+
+class PriorityTicket:
+    """
+    Priorité d'une requête partagée par plusieurs appelants (RequestCoalescer) :
+    relevée quand un appelant plus prioritaire rejoint la requête, y compris
+    pendant son attente dans un TokenBucket.
+    """
+
+    __slots__ = ("priority", "waiting")
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.waiting = None  # (seau, poids, future) tant que la requête attend son poids
+
+    def raise_to(self, priority: int):
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        if self.waiting is not None:
+            bucket, weight, future = self.waiting
+            bucket.requeue(priority, weight, future)
+
+
+# Ticket de la requête partagée exécutée par la tâche courante
+request_ticket: ContextVar[Optional[PriorityTicket]] = ContextVar("request_ticket", default=None)
+
+
+class TokenBucket:
+    """
+    Limiteur de débit d'un exchange : seau de capacity unités de poids,
+    rempli de refill_per_second unités par seconde.
+
+    Une requête attend que son poids soit disponible. Les requêtes en attente
+    sont servies par priorité puis dans leur ordre d'arrivée, une requête
+    prioritaire ne peut donc pas être affamée par un téléchargement en masse.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters = []  # tas de (priorité, ordre d'arrivée, poids, future)
+        self._counter = itertools.count()
+        self._dispatcher = None
+
+        # Compteurs
+        self.granted = 0
+        self.waited = 0
+        self.penalties = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def _try_take(self, weight: float) -> bool:
+        self._refill()
+        if time.monotonic() < self.blocked_until or self.tokens < weight:
+            return False
+        self.tokens -= weight
+        self.granted += 1
+        return True
+
+    async def acquire(self, weight: float = 1, priority: int = None):
+        """Attend que weight unités soient disponibles"""
+        weight = min(weight, self.capacity)
+        ticket = request_ticket.get() if priority is None else None
+        if priority is None:
+            priority = ticket.priority if ticket is not None else request_priority.get()
+        if not self.waiters and self._try_take(weight):
+            return
+
+        self.waited += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self._counter), weight, future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        if ticket is None:
+            await future
+            return
+        ticket.waiting = (self, weight, future)
+        try:
+            await future
+        finally:
+            ticket.waiting = None
+
+    def requeue(self, priority: int, weight: float, future: asyncio.Future):
+        """Remet en file une requête en attente avec une priorité plus haute (l'ancienne entrée est ignorée une fois servie)"""
+        if not future.done():
+            heapq.heappush(self.waiters, (priority, next(self._counter), weight, future))
+
+    async def _dispatch(self):
+        """Sert les requêtes en attente au fur et à mesure du remplissage du seau"""
+        while self.waiters:
+            _, _, weight, future = self.waiters[0]
+            if future.done():
+                # Requête annulée pendant l'attente
+                heapq.heappop(self.waiters)
+                continue
+            if self._try_take(weight):
+                heapq.heappop(self.waiters)
+                future.set_result(None)
+                continue
+            delay = max(self.blocked_until - time.monotonic(), (weight - self.tokens) / self.refill_per_second)
+            await asyncio.sleep(max(delay, 0.001))
+
+    def sync_used_weight(self, used_weight: float):
+        """Recale le seau sur le poids consommé annoncé par l'exchange (autres process sur la même IP)"""
+        self._refill()
+        self.tokens = min(self.tokens, max(self.capacity - used_weight, 0))
+
+    def penalize(self, retry_after: float):
+        """Suspend les requêtes après un refus de l'exchange (HTTP 429/418)"""
+        self.penalties += 1
+        self.tokens = 0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "capacity": self.capacity,
+            "available": round(self.tokens, 2),
+            "waiting": len(self.waiters),
+            "granted": self.granted,
+            "waited": self.waited,
+            "penalties": self.penalties,
+            "blocked_for": round(max(self.blocked_until - time.monotonic(), 0), 2),
+        }
+
+
+class RequestCoalescer:
+    """
+    Fusionne les requêtes identiques en cours : le premier appelant lance la
+    requête, les suivants attendent le même résultat au lieu de la dupliquer.
+    La requête prend la priorité du plus prioritaire de ses appelants.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[Hashable, Tuple[asyncio.Task, PriorityTicket]] = {}
+        self.coalesced = 0
+
+    @staticmethod
+    async def _run_with_ticket(ticket: PriorityTicket, request: Callable[[], Awaitable[Any]]):
+        # Contexte propre à la tâche : le ticket n'est pas visible de l'appelant
+        request_ticket.set(ticket)
+        return await request()
+
+    def _forget(self, key: Hashable, done: asyncio.Task):
+        entry = self.in_flight.get(key)
+        if entry is not None and entry[0] is done:
+            del self.in_flight[key]
+
+    async def run(self, key: Hashable, request: Callable[[], Awaitable[Any]]):
+        priority = request_priority.get()
+        entry = self.in_flight.get(key)
+        if entry is None:
+            ticket = PriorityTicket(priority)
+            task = asyncio.create_task(self._run_with_ticket(ticket, request))
+            self.in_flight[key] = (task, ticket)
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            task, ticket = entry
+            self.coalesced += 1
+            # Une requête interactive qui rejoint un téléchargement en masse ne l'attend pas derrière la file
+            ticket.raise_to(priority)
+        # shield : un appelant annulé n'annule pas la requête des autres
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self.in_flight), "coalesced": self.coalesced}
@@ -0,0 +1,231 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Optional, Dict, Any, List, Tuple
+
+
+class SharedStateStore:
+    """
+    Etat partagé entre les workers uvicorn : tokens de session, derniers
+    statuts connus des ordres, indexés par propriétaire, et exécutions
+    enregistrées dans les portefeuilles.
+
+    Stocké dans une base SQLite en mode WAL, accessible par tous les
+    processus de la machine.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tokens (
+                username TEXT PRIMARY KEY,
+                token TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS orders (
+                order_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                owner TEXT,
+                symbol TEXT,
+                created_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS order_commands (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id TEXT NOT NULL,
+                command TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS order_commands_order_id ON order_commands (order_id);
+            CREATE TABLE IF NOT EXISTS fills (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                worker TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                signed_quantity REAL NOT NULL,
+                price REAL NOT NULL,
+                fee REAL NOT NULL
+            );
+        """)
+        # Bases créées avant l'indexation des ordres par propriétaire
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(orders)")}
+        for column, column_type in (("owner", "TEXT"), ("symbol", "TEXT"), ("created_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE orders ADD COLUMN {column} {column_type}")
+        # Pagination par (created_at, order_id) décroissants, filtrée par statut ou symbole
+        self._conn.executescript("""
+            CREATE INDEX IF NOT EXISTS orders_owner ON orders (owner, created_at, order_id);
+            CREATE INDEX IF NOT EXISTS orders_owner_status ON orders (owner, status, created_at, order_id);
+            CREATE INDEX IF NOT EXISTS orders_owner_symbol ON orders (owner, symbol, created_at, order_id);
+            CREATE INDEX IF NOT EXISTS orders_updated_at ON orders (updated_at);
+        """)
+
+    @classmethod
+    def from_env(cls) -> Optional["SharedStateStore"]:
+        """Store configuré par SHARED_STATE_DB, None en mode mono-process"""
+        path = os.environ.get("SHARED_STATE_DB")
+        return cls(path) if path else None
+
+    def _execute(self, query: str, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    # Tokens
+    def get_token(self, username: str) -> Optional[str]:
+        rows = self._execute("SELECT token FROM tokens WHERE username = ?", (username,))
+        return rows[0][0] if rows else None
+
+    def set_token(self, username: str, token: str):
+        self._execute("INSERT OR REPLACE INTO tokens (username, token) VALUES (?, ?)", (username, token))
+
+    def delete_token(self, username: str):
+        self._execute("DELETE FROM tokens WHERE username = ?", (username,))
+
+    def get_or_create_token(self, username: str, token: str) -> str:
+        """
+        Token de username, token s'il n'en a pas encore : insertion et relecture dans une
+        transaction, deux workers qui connectent le même user en même temps renvoient le même token
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("INSERT OR IGNORE INTO tokens (username, token) VALUES (?, ?)", (username, token))
+                return self._conn.execute("SELECT token FROM tokens WHERE username = ?", (username,)).fetchone()[0]
+
+    def get_username(self, token: str) -> Optional[str]:
+        """User d'un token (index unique sur token)"""
+        rows = self._execute("SELECT username FROM tokens WHERE token = ?", (token,))
+        return rows[0][0] if rows else None
+
+    def all_tokens(self) -> Dict[str, str]:
+        return dict(self._execute("SELECT username, token FROM tokens"))
+
+    # Ordres
+    @staticmethod
+    def _order_row(order_id: str, status: Dict[str, Any], now: float):
+        return (
+            order_id, status["status"], json.dumps(status), now,
+            status.get("owner"), status.get("symbol"), status.get("created_at", now)
+        )
+
+    def save_order(self, order_id: str, status: Dict[str, Any]):
+        self._execute(
+            "INSERT OR REPLACE INTO orders (order_id, status, payload, updated_at, owner, symbol, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._order_row(order_id, status, time.time())
+        )
+
+    def save_orders(self, orders: List[Tuple[str, Dict[str, Any]]]):
+        """Enregistre plusieurs ordres en une seule transaction"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO orders (order_id, status, payload, updated_at, owner, symbol, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [self._order_row(order_id, status, now) for order_id, status in orders]
+                )
+
+    def load_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._execute("SELECT payload FROM orders WHERE order_id = ?", (order_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def list_orders(self, owner: str, status: str = None, symbol: str = None,
+                    before: Tuple[float, str] = None, limit: int = 50) -> List[Tuple[str, Dict[str, Any]]]:
+        """Ordres de owner du plus récent au plus ancien, avant la position before (created_at, order_id)"""
+        query = "SELECT order_id, payload FROM orders WHERE owner = ?"
+        params = [owner]
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        if symbol is not None:
+            query += " AND symbol = ?"
+            params.append(symbol)
+        if before is not None:
+            query += " AND (created_at, order_id) < (?, ?)"
+            params.extend(before)
+        query += " ORDER BY created_at DESC, order_id DESC LIMIT ?"
+        params.append(limit)
+        return [(order_id, json.loads(payload)) for order_id, payload in self._execute(query, params)]
+
+    def orders_updated_since(self, since: float, limit: int = 5000) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Ordres (de tous les workers) modifiés après since, du plus ancien au plus récent : [(order_id, updated_at, statut)]"""
+        rows = self._execute(
+            "SELECT order_id, updated_at, payload FROM orders WHERE updated_at > ? ORDER BY updated_at LIMIT ?",
+            (since, limit)
+        )
+        return [(order_id, updated_at, json.loads(payload)) for order_id, updated_at, payload in rows]
+
+    def push_order_command(self, order_id: str, command: Dict[str, Any]):
+        """Commande (annulation, modification) pour l'ordre exécuté par un autre worker"""
+        self._execute("INSERT INTO order_commands (order_id, command) VALUES (?, ?)", (order_id, json.dumps(command)))
+
+    def pop_order_commands(self, order_id: str) -> List[Dict[str, Any]]:
+        """Lit et consomme les commandes en attente pour un ordre, dans leur ordre d'envoi"""
+        rows = self._execute("SELECT id, command FROM order_commands WHERE order_id = ? ORDER BY id", (order_id,))
+        if rows:
+            # Seul le worker qui exécute l'ordre consomme ses commandes
+            self._execute("DELETE FROM order_commands WHERE order_id = ? AND id <= ?", (order_id, rows[-1][0]))
+        return [json.loads(command) for _, command in rows]
+
+    def pending_command_order_ids(self) -> List[str]:
+        """Ordres ayant des commandes en attente (une requête pour tous les ordres du worker)"""
+        return [order_id for order_id, in self._execute("SELECT DISTINCT order_id FROM order_commands")]
+
+    # Exécutions
+    def save_fills(self, worker: str, fills: List[Tuple[str, str, float, float, float]]):
+        """Exécutions du worker [(owner, symbol, quantité signée, prix, frais)], en une seule transaction"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT INTO fills (worker, owner, symbol, signed_quantity, price, fee) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(worker, *fill) for fill in fills]
+                )
+
+    def fills_after(self, last_id: int, limit: int = 10000) -> List[Tuple[int, str, str, str, float, float, float]]:
+        """Exécutions de tous les workers d'id > last_id : [(id, worker, owner, symbol, quantité signée, prix, frais)]"""
+        return self._execute(
+            "SELECT id, worker, owner, symbol, signed_quantity, price, fee FROM fills WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, limit)
+        )
+
+
+class SharedTokens(MutableMapping):
+    """Dict username -> token adossé au store, pour AuthenticationManager.tokens"""
+
+    def __init__(self, store: SharedStateStore):
+        self.store = store
+
+    def __getitem__(self, username):
+        token = self.store.get_token(username)
+        if token is None:
+            raise KeyError(username)
+        return token
+
+    def __setitem__(self, username, token):
+        self.store.set_token(username, token)
+
+    def __delitem__(self, username):
+        if self.store.get_token(username) is None:
+            raise KeyError(username)
+        self.store.delete_token(username)
+
+    def __contains__(self, username):
+        return self.store.get_token(username) is not None
+
+    def __iter__(self):
+        return iter(self.store.all_tokens())
+
+    def __len__(self):
+        return len(self.store.all_tokens())
+
+    def items(self):
+        return self.store.all_tokens().items()
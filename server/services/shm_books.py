@@ -0,0 +1,120 @@
+import os
+import time
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Dict, Any, Tuple
+import numpy as np
+
+
+SHM_MAGIC = b"CRYPTOBK"
+SHM_VERSION = 1
+
+
+def get_shm_name():
+    """Nom du segment de mémoire partagée, None si la publication est désactivée"""
+    return os.environ.get("SHM_BOOKS_NAME")
+
+
+def book_dtypes(depth: int, ring: int):
+    """
+    Layout fixe du segment (little-endian), partagé avec client/shm_book_reader.py :
+
+    header    : magic, version, nombre de slots, profondeur, taille de l'anneau
+    directory : (exchange, symbol) de chaque slot
+    slots     : compteur de version (seqlock) + anneau des derniers carnets
+    """
+    header = np.dtype([
+        ("magic", "S8"), ("version", "<u4"), ("n_slots", "<u4"),
+        ("depth", "<u4"), ("ring", "<u4"), ("reserved", "V40"),
+    ])
+    directory = np.dtype([("exchange", "S16"), ("symbol", "S16")])
+    entry = np.dtype([
+        ("timestamp", "<f8"), ("n_bids", "<u4"), ("n_asks", "<u4"),
+        ("bids", "<f8", (depth, 2)), ("asks", "<f8", (depth, 2)),
+    ])
+    slot = np.dtype([("seq", "<u8"), ("entries", entry, (ring,))])
+    return header, directory, slot
+
+
+class SharedMemoryBookPublisher:
+    """
+    Publie chaque carnet standardisé dans un segment de mémoire partagée,
+    lisible sans sérialisation par les process locaux (client.shm_book_reader).
+
+    Chaque (exchange, symbole) a son slot. Le compteur seq est impair pendant
+    l'écriture et pair une fois le carnet publié ; le carnet courant est dans
+    entries[(seq // 2 - 1) % ring].
+    """
+
+    def __init__(self, name: str = None, n_slots: int = 256, depth: int = 20, ring: int = 4):
+        self.name = name or get_shm_name()
+        self.n_slots = n_slots
+        self.depth = depth
+        self.ring = ring
+        header_dtype, directory_dtype, slot_dtype = book_dtypes(depth, ring)
+        size = header_dtype.itemsize + n_slots * (directory_dtype.itemsize + slot_dtype.itemsize)
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:
+            # Segment laissé par un précédent lancement
+            stale = shared_memory.SharedMemory(name=self.name)
+            stale.unlink()
+            stale.close()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+
+        offset = 0
+        self.header = np.ndarray((1,), dtype=header_dtype, buffer=self.shm.buf, offset=offset)
+        offset += header_dtype.itemsize
+        self.directory = np.ndarray((n_slots,), dtype=directory_dtype, buffer=self.shm.buf, offset=offset)
+        offset += n_slots * directory_dtype.itemsize
+        self.slots = np.ndarray((n_slots,), dtype=slot_dtype, buffer=self.shm.buf, offset=offset)
+
+        self.slots["seq"] = 0
+        self.directory[:] = (b"", b"")
+        self.header[0] = (SHM_MAGIC, SHM_VERSION, n_slots, depth, ring, b"\0" * 40)
+        self.slot_index: Dict[Tuple[str, str], int] = {}
+        print(f"[SharedMemoryBooks] Segment {self.name} créé ({size} octets)")
+
+    def attach(self, subscription_manager):
+        """Publie les carnets de toutes les connexions du subscription manager"""
+        for exchange, connector in subscription_manager.exchange_connectors.items():
+            connector.book_listeners.append(partial(self.publish, exchange))
+
+    def _get_slot(self, exchange: str, symbol: str):
+        key = (exchange, symbol)
+        index = self.slot_index.get(key)
+        if index is None:
+            if len(self.slot_index) >= self.n_slots:
+                return None
+            index = len(self.slot_index)
+            # Le slot est publié dans le répertoire avant son premier carnet (seq encore à 0)
+            self.directory[index] = (exchange.encode()[:16], symbol.encode()[:16])
+            self.slot_index[key] = index
+        return index
+
+    def publish(self, exchange: str, symbol: str, book: Dict[str, Any]):
+        index = self._get_slot(exchange, symbol)
+        if index is None:
+            return
+        slot = self.slots[index:index + 1]
+        seq = int(slot["seq"][0])
+        entry = slot["entries"][0, (seq // 2) % self.ring]
+
+        bids = book.get("bids", [])[:self.depth]
+        asks = book.get("asks", [])[:self.depth]
+
+        slot["seq"] = seq + 1  # écriture en cours
+        entry["timestamp"] = time.time()
+        entry["n_bids"] = len(bids)
+        entry["n_asks"] = len(asks)
+        if bids:
+            entry["bids"][:len(bids)] = bids
+        if asks:
+            entry["asks"][:len(asks)] = asks
+        slot["seq"] = seq + 2  # carnet publié
+
+    def close(self):
+        self.header = self.directory = self.slots = None
+        self.shm.close()
+        self.shm.unlink()
@@ -1,20 +1,22 @@
-from typing import Dict
-from server.connectors.kraken import KrakenWSConnection
-from server.connectors.binance import BinanceWSConnection
+from typing import Dict, Tuple
 from server.connectors.base_connector import BaseExchangeWSConnection
+from server.connectors.registry import ConnectorRegistry, connector_registry
 import asyncio
 
 class SubscriptionManager:
     
-    def __init__(self):
-        
+    def __init__(self, registry: ConnectorRegistry = None):
+        # Connecteurs WebSocket des seuls exchanges activés
+        registry = registry or connector_registry
         self.exchange_connectors : Dict[str, BaseExchangeWSConnection] = {
-            "kraken": KrakenWSConnection(),
-            "binance": BinanceWSConnection()
+            exchange: registry.ws(exchange) for exchange in registry.names
         }
         self.subscriptions: Dict[str, Dict[str, int]] = {
-            "kraken": {},
-            "binance": {}
+            exchange: {} for exchange in self.exchange_connectors
+        }
+        # (symbole, intervalle) -> nombre de clients abonnés au flux de klines
+        self.kline_subscriptions: Dict[str, Dict[Tuple[str, str], int]] = {
+            exchange: {} for exchange in self.exchange_connectors
         }
     
     async def connect(self):
@@ -39,4 +41,19 @@ class SubscriptionManager:
                 self.subscriptions[exchange][symbol] -= 1
                 if self.subscriptions[exchange][symbol] <= 0:
                     del self.subscriptions[exchange][symbol]
-                    await self.exchange_connectors[exchange].unsubscribe_symbol(symbol)
\ No newline at end of file
+                    await self.exchange_connectors[exchange].unsubscribe_symbol(symbol)
+
+    async def add_kline_subscription(self, exchange: str, symbol: str, interval: str):
+        key = (symbol, interval)
+        count = self.kline_subscriptions[exchange].get(key, 0)
+        self.kline_subscriptions[exchange][key] = count + 1
+        if count == 0:
+            await self.exchange_connectors[exchange].subscribe_klines(symbol, interval)
+
+    async def remove_kline_subscription(self, exchange: str, symbol: str, interval: str):
+        key = (symbol, interval)
+        if key in self.kline_subscriptions[exchange]:
+            self.kline_subscriptions[exchange][key] -= 1
+            if self.kline_subscriptions[exchange][key] <= 0:
+                del self.kline_subscriptions[exchange][key]
+                await self.exchange_connectors[exchange].unsubscribe_klines(symbol, interval)
@@ -0,0 +1,216 @@
+import math
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from server.services.order_router import fee_model
+
+
+class RingStats:
+    """
+    Fenêtre glissante des size dernières valeurs, dans un anneau de taille fixe.
+
+    La somme et la somme des carrés sont mises à jour en O(1) à chaque valeur ;
+    elles sont recalculées exactement à chaque tour de l'anneau pour que les
+    erreurs d'arrondi ne s'accumulent pas.
+    """
+
+    __slots__ = ("values", "index", "count", "total", "total_sq")
+
+    def __init__(self, size: int):
+        self.values = [0.0] * size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, value: float):
+        size = len(self.values)
+        if self.count == size:
+            old = self.values[self.index]
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.total += value
+        self.total_sq += value * value
+        self.index += 1
+        if self.index == size:
+            self.index = 0
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def std(self) -> Optional[float]:
+        if self.count < 2:
+            return None
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class SymbolTicker:
+    """
+    Meilleurs prix d'un symbole sur chaque exchange et statistiques glissantes :
+    EWMA du spread consolidé, volatilité des rendements du mid et déséquilibre
+    du carnet (volumes bid / ask des depth premiers niveaux).
+    """
+
+    def __init__(self, symbol: str, window: int, alpha: float, depth: int):
+        self.symbol = symbol
+        self.alpha = alpha
+        self.depth = depth
+        # exchange -> (bid, ask, volume bid, volume ask)
+        self.venues: Dict[str, Tuple[float, float, float, float]] = {}
+        self.mid: Optional[float] = None
+        self.spread_ewma: Optional[float] = None
+        self.returns = RingStats(window)
+        self.imbalances = RingStats(window)
+        self.updates = 0
+        self.last: Optional[Dict[str, Any]] = None
+
+    def update(self, exchange: str, book: Dict[str, Any]) -> bool:
+        """Intègre le carnet d'un exchange, True si un meilleur prix a changé"""
+        bids, asks = book.get("bids"), book.get("asks")
+        depth = self.depth
+        quote = (
+            bids[0][0] if bids else math.nan,
+            asks[0][0] if asks else math.nan,
+            sum(size for _, size in bids[:depth]) if bids else 0.0,
+            sum(size for _, size in asks[:depth]) if asks else 0.0,
+        )
+        previous = self.venues.get(exchange)
+        self.venues[exchange] = quote
+        self.updates += 1
+
+        bid, ask, bid_volume, ask_volume = self._consolidated()
+        if bid == bid and ask == ask:
+            spread = ask - bid
+            self.spread_ewma = spread if self.spread_ewma is None else self.alpha * spread + (1 - self.alpha) * self.spread_ewma
+            mid = (bid + ask) / 2
+            if self.mid is not None and mid > 0 and self.mid > 0:
+                self.returns.push(math.log(mid / self.mid))
+            self.mid = mid
+        if bid_volume + ask_volume > 0:
+            self.imbalances.push((bid_volume - ask_volume) / (bid_volume + ask_volume))
+
+        # nan != nan : un côté vide compte comme un changement
+        return previous is None or previous[0] != quote[0] or previous[1] != quote[1]
+
+    def _consolidated(self) -> Tuple[float, float, float, float]:
+        bid, ask, bid_volume, ask_volume = -math.inf, math.inf, 0.0, 0.0
+        for venue_bid, venue_ask, venue_bid_volume, venue_ask_volume in self.venues.values():
+            if venue_bid > bid:
+                bid = venue_bid
+            if venue_ask < ask:
+                ask = venue_ask
+            bid_volume += venue_bid_volume
+            ask_volume += venue_ask_volume
+        return (bid if bid != -math.inf else math.nan, ask if ask != math.inf else math.nan, bid_volume, ask_volume)
+
+    def arbitrage(self) -> Optional[Dict[str, Any]]:
+        """
+        Plus grand écart entre le bid d'un exchange et l'ask d'un autre (positif :
+        acheter sur buy et revendre sur sell rapporte), brut et net des frais taker
+        """
+        best = None
+        for sell, (bid, _, _, _) in self.venues.items():
+            for buy, (_, ask, _, _) in self.venues.items():
+                if buy == sell or bid != bid or ask != ask:
+                    continue
+                gap = bid - ask
+                if best is None or gap > best[0]:
+                    best = (gap, buy, ask, sell, bid)
+        if best is None:
+            return None
+        gap, buy, ask, sell, bid = best
+        net_gap = bid * (1 - fee_model(sell).taker_rate) - ask * (1 + fee_model(buy).taker_rate)
+        return {
+            "buy_exchange": buy,
+            "sell_exchange": sell,
+            "gap": gap,
+            "gap_bps": gap / self.mid * 1e4 if self.mid else None,
+            "net_gap": net_gap,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        bid, ask, bid_volume, ask_volume = self._consolidated()
+
+        def value(x):
+            return None if x != x else x
+
+        volatility = self.returns.std()
+        spread = ask - bid
+        self.last = {
+            "type": "ticker",
+            "symbol": self.symbol,
+            "timestamp": time.time(),
+            "bid": value(bid),
+            "ask": value(ask),
+            "mid": self.mid,
+            "spread": value(spread),
+            "spread_bps": value(spread / self.mid * 1e4) if self.mid else None,
+            "venues": {exchange: {"bid": value(quote[0]), "ask": value(quote[1])} for exchange, quote in self.venues.items()},
+            "arbitrage": self.arbitrage(),
+            "spread_ewma": self.spread_ewma,
+            "mid_volatility_bps": volatility * 1e4 if volatility is not None else None,
+            "imbalance": (bid_volume - ask_volume) / (bid_volume + ask_volume) if bid_volume + ask_volume > 0 else None,
+            "imbalance_mean": self.imbalances.mean(),
+            "updates": self.updates,
+        }
+        return self.last
+
+
+class TickerService:
+    """
+    Flux "ticker" : meilleur bid / ask, spread, mid, écarts d'arbitrage entre
+    exchanges et statistiques glissantes, calculés à chaque mise à jour des
+    carnets de chaque exchange.
+
+    Seuls les symboles suivis par au moins un client sont calculés. Le message
+    est construit une fois par mise à jour et partagé par tous les abonnés ; il
+    n'est produit que si un meilleur prix a changé (les statistiques intègrent
+    toutes les mises à jour).
+    """
+
+    def __init__(self, window: int = 500, alpha: float = 0.05, depth: int = 5):
+        self.window = window
+        self.alpha = alpha
+        self.depth = depth
+        self.tickers: Dict[str, SymbolTicker] = {}
+        # symbole -> callbacks callback(message)
+        self.listeners: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+
+    def attach(self, subscription_manager):
+        """Suit les carnets de toutes les connexions"""
+        for exchange, connector in subscription_manager.exchange_connectors.items():
+            connector.book_listeners.append(partial(self.on_order_book, exchange))
+
+    def subscribe(self, symbol: str, callback: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        """Ajoute un abonné, renvoie le dernier ticker connu du symbole (None si aucun)"""
+        ticker = self.tickers.get(symbol)
+        if ticker is None:
+            ticker = self.tickers[symbol] = SymbolTicker(symbol, self.window, self.alpha, self.depth)
+        self.listeners.setdefault(symbol, []).append(callback)
+        return ticker.last
+
+    def unsubscribe(self, symbol: str, callback: Callable[[Dict[str, Any]], None]):
+        """Retire un abonné ; sans abonné, l'état du symbole est abandonné"""
+        listeners = self.listeners.get(symbol)
+        if listeners is None or callback not in listeners:
+            return
+        listeners.remove(callback)
+        if not listeners:
+            del self.listeners[symbol]
+            del self.tickers[symbol]
+
+    def on_order_book(self, exchange: str, symbol: str, book: Dict[str, Any]):
+        ticker = self.tickers.get(symbol)
+        if ticker is None:
+            return
+        if not ticker.update(exchange, book):
+            return
+        message = ticker.snapshot()
+        for listener in self.listeners.get(symbol, ()):
+            listener(message)
@@ -1,83 +1,338 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Set
+from typing import Set, Tuple, Dict, Any
+from functools import partial
 import json
 import asyncio
 from server.services.subscription_manager import SubscriptionManager
+from server.services.outbound_queue import ConflatingQueue
 from server.auth.auth_manager import AuthenticationManager
+from server.services.loop_monitor import loop_monitor
+from server.services.intervals import interval_to_seconds, format_interval
+
+# Derniers ordres de l'utilisateur envoyés à l'abonnement au canal "orders"
+ORDER_SNAPSHOT_LIMIT = 200
 
 class ClientWebSocketManager:
-    
-    def __init__(self, websocket: WebSocket, auth_manager:AuthenticationManager):
+
+    # Clients connectés, pour le suivi des files sortantes
+    clients: Set["ClientWebSocketManager"] = set()
+
+    def __init__(
+            self,
+            websocket: WebSocket,
+            auth_manager:AuthenticationManager,
+            max_pending: int = 256,
+            max_lag_seconds: float = 10.0,
+            send_timeout: float = 5.0,
+            portfolio=None,
+            orders=None,
+            tickers=None,
+            order_feed=None
+    ):
         self.websocket = websocket
         self.subscriptions: Set[str] = set()
+        # Flux de klines : (exchange, symbole, intervalle)
+        self.kline_subscriptions: Set[Tuple[str, str, str]] = set()
+        self.kline_listeners = {}
         self.authenticated = False
+        self.username = None
         self.auth_manager = auth_manager
-        
+
+        # Portefeuille poussé à chaque changement (canal "portfolio")
+        self.portfolio = portfolio
+        self.portfolio_subscribed = False
+        self.portfolio_version = None
+
+        # Ordres de l'utilisateur modifiés depuis le dernier envoi (canal "orders") :
+        # un ordre exécuté cent fois dans la seconde n'est envoyé qu'une fois
+        self.orders = orders
+        # Ordres des autres workers, relus dans le store partagé (mode multi-worker)
+        self.order_feed = order_feed
+        self.orders_subscribed = False
+        self.changed_orders: Dict[str, Any] = {}
+
+        # Tickers (meilleurs prix et statistiques) poussés à chaque changement de prix (canal "ticker")
+        self.tickers = tickers
+        self.ticker_subscriptions: Set[str] = set()
+
+        # File sortante bornée : le producteur ne bloque jamais sur l'envoi
+        self.outbound = ConflatingQueue(max_pending=max_pending)
+        self.max_lag_seconds = max_lag_seconds
+        self.send_timeout = send_timeout
+        self.disconnect_reason = None
+
 
     async def handle(self, subscription_manager: SubscriptionManager):
         await self.websocket.accept()
-        sender_task = asyncio.create_task(self.send_aggregated_data(subscription_manager))
+        ClientWebSocketManager.clients.add(self)
+        tasks = [
+            asyncio.create_task(self.receive_messages(subscription_manager)),
+            asyncio.create_task(self.send_aggregated_data(subscription_manager)),
+            asyncio.create_task(self.write_outbound()),
+        ]
+        try:
+            # Le premier qui s'arrête (déconnexion côté réception ou envoi, client trop lent) ferme la session
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            ClientWebSocketManager.clients.discard(self)
+            for symbol in self.subscriptions:
+                await subscription_manager.remove_subscription(symbol)
+            self.subscriptions.clear()
+            for key in self.kline_subscriptions:
+                await subscription_manager.remove_kline_subscription(*key)
+            self.kline_subscriptions.clear()
+            for exchange, listener in self.kline_listeners.items():
+                subscription_manager.exchange_connectors[exchange].kline_listeners.remove(listener)
+            self.kline_listeners.clear()
+            self.unsubscribe_orders()
+            for symbol in self.ticker_subscriptions:
+                self.tickers.unsubscribe(symbol, self.on_ticker)
+                await subscription_manager.remove_subscription(symbol)
+            self.ticker_subscriptions.clear()
+            if self.disconnect_reason is not None:
+                await self.force_disconnect()
+
+    async def receive_messages(self, subscription_manager: SubscriptionManager):
         try:
             while True:
                 msg = await self.websocket.receive_text()
                 data = json.loads(msg)
                 action = data.get("action")
                 symbol = data.get("symbol", "").upper()
-                
-                if action =="authenticate": 
-                    self.authenticated = True
+
+                if action =="authenticate":
                     token = data.get("token")
-                    try: 
+                    try:
                         username = self.auth_manager.verify_token(token, raise_http=False)
                     except:
-                        await self.websocket.send_text(json.dumps({"error": "Invalid token"}))
+                        self.outbound.put_control({"error": "Invalid token"})
                         username = None
                         pass
                     if username is not None:
-                        self.auth_manager = True    
-                        await self.websocket.send_text(json.dumps({"authenticated": True}))
+                        self.authenticated = True
+                        self.username = username
+                        self.outbound.put_control({"authenticated": True})
                     continue
-                
-                if not self.authenticated: 
+
+                if not self.authenticated:
                     continue
-                
-                if action == "subscribe":
-                    self.subscriptions.add(symbol)
-                    await subscription_manager.add_subscription(symbol)
+
+                if data.get("channel") == "klines":
+                    await self.handle_klines_action(action, data, subscription_manager)
+                elif data.get("channel") == "portfolio" and self.portfolio is not None:
+                    self.portfolio_subscribed = action == "subscribe"
+                    self.portfolio_version = None
+                elif data.get("channel") == "orders" and self.orders is not None:
+                    if action == "subscribe":
+                        self.subscribe_orders()
+                    else:
+                        self.unsubscribe_orders()
+                elif data.get("channel") == "ticker" and self.tickers is not None:
+                    await self.handle_ticker_action(action, symbol, subscription_manager)
+                elif action == "subscribe":
+                    if symbol not in self.subscriptions:
+                        self.subscriptions.add(symbol)
+                        await subscription_manager.add_subscription(symbol)
                 elif action == "unsubscribe":
                     if symbol in self.subscriptions:
                         self.subscriptions.remove(symbol)
                         await subscription_manager.remove_subscription(symbol)
         except WebSocketDisconnect:
             print("[Client] Disconnected")
-        finally:
-            sender_task.cancel()
+
+    async def handle_klines_action(self, action: str, data: Dict[str, Any], subscription_manager: SubscriptionManager):
+        """
+        {"action": "subscribe"|"unsubscribe", "channel": "klines", "exchange": "binance", "symbol": "BTCUSDT", "interval": "1m"}
+        Les bougies en cours et clôturées sont poussées au fil de l'eau (type "kline").
+        """
+        exchange = data.get("exchange", "").lower()
+        symbol = data.get("symbol", "").upper()
+        connector = subscription_manager.exchange_connectors.get(exchange)
+        try:
+            interval_seconds = interval_to_seconds(data.get("interval", "1m"))
+        except ValueError:
+            interval_seconds = None
+        if connector is None or interval_seconds not in connector.kline_intervals:
+            self.outbound.put_control({"error": f"Unsupported klines stream: {exchange} {data.get('interval')}"})
+            return
+        key = (exchange, symbol, format_interval(interval_seconds))
+
+        if action == "subscribe" and key not in self.kline_subscriptions:
+            if exchange not in self.kline_listeners:
+                self.kline_listeners[exchange] = partial(self.on_kline, exchange)
+                connector.kline_listeners.append(self.kline_listeners[exchange])
+            self.kline_subscriptions.add(key)
+            await subscription_manager.add_kline_subscription(*key)
+            # Bougie en cours déjà connue si un autre client suit ce flux
+            current = connector.klines.get(key[1:])
+            if current is not None:
+                self.on_kline(exchange, symbol, key[2], current, False)
+        elif action == "unsubscribe" and key in self.kline_subscriptions:
+            self.kline_subscriptions.remove(key)
+            await subscription_manager.remove_kline_subscription(*key)
+
+    def on_kline(self, exchange: str, symbol: str, interval: str, kline: Dict[str, Any], closed: bool):
+        if (exchange, symbol, interval) not in self.kline_subscriptions:
+            return
+        # Conflation par bougie : les mises à jour d'une bougie en cours se remplacent,
+        # une bougie clôturée n'est jamais écrasée par la suivante
+        self.outbound.put(("kline", exchange, symbol, interval, kline["timestamp"]), {
+            "type": "kline",
+            "exchange": exchange,
+            "symbol": symbol,
+            "interval": interval,
+            "closed": closed,
+            **kline
+        })
+
+    async def handle_ticker_action(self, action: str, symbol: str, subscription_manager: SubscriptionManager):
+        """
+        {"action": "subscribe"|"unsubscribe", "channel": "ticker", "symbol": "BTCUSDT"}
+        Les carnets des exchanges sont suivis sans être envoyés : seul le ticker est poussé (type "ticker").
+        """
+        if action == "subscribe" and symbol not in self.ticker_subscriptions:
+            self.ticker_subscriptions.add(symbol)
+            await subscription_manager.add_subscription(symbol)
+            # Dernier ticker déjà connu si un autre client suit ce symbole
+            last = self.tickers.subscribe(symbol, self.on_ticker)
+            if last is not None:
+                self.on_ticker(last)
+        elif action == "unsubscribe" and symbol in self.ticker_subscriptions:
+            self.ticker_subscriptions.remove(symbol)
+            self.tickers.unsubscribe(symbol, self.on_ticker)
+            await subscription_manager.remove_subscription(symbol)
+
+    def on_ticker(self, ticker: Dict[str, Any]):
+        # Conflation par symbole : un client lent reçoit directement le dernier ticker
+        self.outbound.put(("ticker", ticker["symbol"]), ticker)
+
+    def subscribe_orders(self):
+        """
+        {"action": "subscribe", "channel": "orders"} : les derniers ordres de l'utilisateur, terminés
+        compris, sont envoyés, puis chaque ordre modifié (exécution, statut, modification) au plus une
+        fois par seconde. En mode multi-worker, les ordres des autres workers viennent du store partagé.
+        """
+        if self.orders_subscribed:
+            return
+        self.orders_subscribed = True
+        self.orders.update_listeners.append(self.on_order_update)
+        if self.order_feed is not None:
+            self.order_feed.listeners.append(self.on_remote_order_update)
+            # Statut en mémoire pour les ordres du worker, plus récent que celui du store
+            page = [
+                (order_id, self.orders.get(order_id, status))
+                for order_id, status in self.order_feed.store.list_orders(self.username, limit=ORDER_SNAPSHOT_LIMIT)
+            ]
+        else:
+            page, _ = self.orders.query(self.username, limit=ORDER_SNAPSHOT_LIMIT)
+        # Du plus ancien au plus récent : le client affiche le plus récent en dernier reçu
+        self.changed_orders.update(reversed(page))
+
+    def unsubscribe_orders(self):
+        if self.orders_subscribed:
+            self.orders_subscribed = False
+            self.orders.update_listeners.remove(self.on_order_update)
+            if self.order_feed is not None:
+                self.order_feed.listeners.remove(self.on_remote_order_update)
+            self.changed_orders.clear()
+
+    def on_order_update(self, order_id: str, order):
+        if order.owner == self.username:
+            self.changed_orders[order_id] = order
+
+    def on_remote_order_update(self, order_id: str, status: Dict[str, Any]):
+        if status.get("owner") == self.username:
+            self.changed_orders[order_id] = status
 
     async def send_aggregated_data(self, subscription_manager: SubscriptionManager):
         while True:
             await asyncio.sleep(1)
-            data_to_send = []
-            for symbol in self.subscriptions: 
-                order_books = []
-                for exchange in subscription_manager.exchange_connectors:
-                    order_book = subscription_manager.exchange_connectors[exchange].order_book
-                    if not symbol in order_book:
-                        continue
-                    order_books.append(order_book[symbol])
-                     
-                merged_order_book = {"bids": [], "asks": []}
-                for order_book in order_books:
-                    merged_order_book["bids"].extend(order_book["bids"])
-                    merged_order_book["asks"].extend(order_book["asks"])
-                
-                merged_order_book["bids"].sort(key=lambda x: x[0], reverse=True)
-                merged_order_book["asks"].sort(key=lambda x: x[0])
-                
-                data_to_send.append({
-                    "type":"order_book",
-                    "symbol": symbol,
-                    **merged_order_book
-                })
-                
-            if len(data_to_send)>0:
-                await self.websocket.send_text(json.dumps(data_to_send))
\ No newline at end of file
+            with loop_monitor.section("ws.merge_books"):
+                data_to_send = self.aggregate_order_books(subscription_manager)
+
+            # Conflation : seul le dernier carnet par symbole reste en attente
+            for book in data_to_send:
+                self.outbound.put((book["type"], book["symbol"]), book)
+
+            # Portefeuille renvoyé seulement après une exécution de l'utilisateur ou un mouvement du mid d'un de ses symboles
+            if self.portfolio_subscribed:
+                version = self.portfolio.user_version(self.username)
+                if version != self.portfolio_version:
+                    self.portfolio_version = version
+                    self.outbound.put(("portfolio",), {"type": "portfolio", **self.portfolio.get_portfolio(self.username)})
+
+            # Statut sans la liste des exécutions, conflaté par ordre ; ordre du worker ou
+            # dernier statut connu (dict) d'un ordre d'un autre worker
+            changed_orders, self.changed_orders = self.changed_orders, {}
+            for order_id, order in changed_orders.items():
+                status = dict(order) if isinstance(order, dict) else order.get_status()
+                status.pop("executions", None)
+                self.outbound.put(("order", order_id), {"type": "order", "order_id": order_id, **status})
+
+            if self.outbound.lag() > self.max_lag_seconds:
+                self.disconnect_reason = f"client trop lent ({self.outbound.lag():.1f}s de retard)"
+                return
+
+    async def write_outbound(self):
+        """Vide la file sortante vers le client, chaque client a son propre writer"""
+        while True:
+            control, data = await self.outbound.get_batch()
+            try:
+                for message in control:
+                    await asyncio.wait_for(self.websocket.send_text(json.dumps(message)), self.send_timeout)
+                if data:
+                    with loop_monitor.section("ws.encode"):
+                        payload = json.dumps(data)
+                    await asyncio.wait_for(self.websocket.send_text(payload), self.send_timeout)
+            except asyncio.TimeoutError:
+                self.disconnect_reason = f"envoi bloqué plus de {self.send_timeout}s"
+                return
+            except Exception:
+                # Déconnexion détectée côté envoi
+                print("[Client] Disconnected")
+                return
+
+    async def force_disconnect(self):
+        """Ferme la connexion d'un client qui ne suit plus"""
+        print(f"[Client] Déconnexion forcée : {self.disconnect_reason}")
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1008, reason="Slow consumer"), self.send_timeout)
+        except Exception:
+            pass
+
+    def get_stats(self):
+        return {
+            "authenticated": self.authenticated,
+            "username": self.username,
+            "subscriptions": sorted(self.subscriptions),
+            "kline_subscriptions": sorted("/".join(key) for key in self.kline_subscriptions),
+            "ticker_subscriptions": sorted(self.ticker_subscriptions),
+            **self.outbound.get_stats(),
+        }
+
+    def aggregate_order_books(self, subscription_manager: SubscriptionManager):
+        data_to_send = []
+        for symbol in self.subscriptions:
+            order_books = []
+            for exchange in subscription_manager.exchange_connectors:
+                order_book = subscription_manager.exchange_connectors[exchange].order_book
+                if not symbol in order_book:
+                    continue
+                order_books.append(order_book[symbol])
+
+            merged_order_book = {"bids": [], "asks": []}
+            for order_book in order_books:
+                merged_order_book["bids"].extend(order_book["bids"])
+                merged_order_book["asks"].extend(order_book["asks"])
+
+            merged_order_book["bids"].sort(key=lambda x: x[0], reverse=True)
+            merged_order_book["asks"].sort(key=lambda x: x[0])
+
+            data_to_send.append({
+                "type":"order_book",
+                "symbol": symbol,
+                **merged_order_book
+            })
+        return data_to_send
\ No newline at end of file
@@ -0,0 +1,65 @@
+import argparse
+import json
+import subprocess
+import sys
+
+
+# Modules qu'un serveur headless ne doit jamais charger au démarrage
+FORBIDDEN_MODULES = ["tkinter", "gui", "matplotlib", "pandas", "numpy"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str):
+    """Importe le module dans un interpréteur neuf : (durée, modules interdits chargés, sortie -X importtime)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, forbidden=FORBIDDEN_MODULES)],
+        capture_output=True, text=True, check=True
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return probe["elapsed"], probe["loaded"], result.stderr
+
+
+def slowest_imports(importtime_output: str, count: int = 10):
+    """Imports les plus coûteux (temps cumulé, en ms) d'après la sortie de -X importtime"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du temps d'import du serveur headless")
+    parser.add_argument("--module", default="server.main", help="Module importé au démarrage")
+    parser.add_argument("--budget", type=float, default=1.0, help="Temps d'import maximum, en secondes")
+    parser.add_argument("--runs", type=int, default=5, help="Nombre de mesures (la meilleure est retenue)")
+    args = parser.parse_args()
+
+    measures = [measure(args.module) for _ in range(args.runs)]
+    best, loaded, importtime_output = min(measures, key=lambda m: m[0])
+
+    print(f"Import de {args.module} : {best * 1000:.0f} ms (meilleur de {args.runs}, budget {args.budget * 1000:.0f} ms)")
+    for cumulative, name in slowest_imports(importtime_output):
+        print(f"  {cumulative:8.1f} ms  {name}")
+
+    failed = False
+    if loaded:
+        print(f"ERREUR : modules chargés au démarrage alors qu'ils ne devraient pas l'être : {loaded}")
+        failed = True
+    if best > args.budget:
+        print("ERREUR : budget de démarrage dépassé")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+from werkzeug.security import generate_password_hash
+from server.auth.auth_manager import AuthenticationManager
+from server.services.shared_store import SharedStateStore
+
+
+def make_manager(store=None):
+    manager = AuthenticationManager(store)
+    manager._users = {"alice": generate_password_hash("secret")}
+    return manager
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_token_is_verified_by_lookup(tmp_path, shared):
+    manager = make_manager(SharedStateStore(str(tmp_path / "shared.db")) if shared else None)
+    token = manager.authenticate_user("alice", "secret")
+    assert manager.authenticate_user("alice", "secret") == token
+    assert manager.verify_token(token) == "alice"
+    with pytest.raises(HTTPException):
+        manager.verify_token("unknown")
+    assert manager.authenticate_user("alice", "wrong") is None
+
+
+def test_workers_logging_in_concurrently_share_first_token(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first, second = SharedStateStore(path), SharedStateStore(path)
+    # Les deux workers ont vérifié l'absence de token avant d'en créer un
+    token = first.get_or_create_token("alice", "token-1")
+    assert second.get_or_create_token("alice", "token-2") == token == "token-1"
+    assert second.get_username("token-1") == "alice"
+    assert second.get_username("token-2") is None
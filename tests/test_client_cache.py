@@ -0,0 +1,61 @@
+import asyncio
+import time
+from client.client_side import ClientSide
+
+MINUTE_NS = 60 * 1_000_000_000
+
+
+def make_klines(start_ns: int, count: int):
+    return [{"timestamp": start_ns + i * MINUTE_NS, "close": float(i)} for i in range(count)]
+
+
+class FakeServer:
+    """Bougies 1m jusqu'à maintenant, renvoyées par _fetch comme /klines"""
+
+    def __init__(self, now_ns: int):
+        self.now_ns = now_ns - now_ns % MINUTE_NS
+        self.limits = []
+
+    async def fetch(self, path, params=None, binary=False, etag=None):
+        limit = params["limit"]
+        self.limits.append(limit)
+        return make_klines(self.now_ns - (limit - 1) * MINUTE_NS, limit), None
+
+
+def make_client(server: FakeServer) -> ClientSide:
+    client = ClientSide(cache=True, cache_ttls={"klines": 0.0})
+    client._fetch = server.fetch
+    return client
+
+
+def test_stale_series_is_replaced_instead_of_leaving_a_hole():
+    async def scenario():
+        server = FakeServer(time.time_ns())
+        client = make_client(server)
+        # Série en cache vieille de 100 bougies, plus que limit
+        old = make_klines(server.now_ns - 200 * MINUTE_NS, 50)
+        client.cache.store(("klines", "binance", "BTCUSDT", "1m"), "klines", old)
+
+        klines = await client._get_klines_incremental("binance", "BTCUSDT", "1m", 10)
+        assert server.limits == [10]
+        assert len(klines) == 10
+        series = client.cache.get(("klines", "binance", "BTCUSDT", "1m")).value
+        steps = {b["timestamp"] - a["timestamp"] for a, b in zip(series, series[1:])}
+        assert steps == {MINUTE_NS}
+
+    asyncio.run(scenario())
+
+
+def test_recent_series_is_extended():
+    async def scenario():
+        server = FakeServer(time.time_ns())
+        client = make_client(server)
+        recent = make_klines(server.now_ns - 20 * MINUTE_NS, 20)
+        client.cache.store(("klines", "binance", "BTCUSDT", "1m"), "klines", recent)
+
+        klines = await client._get_klines_incremental("binance", "BTCUSDT", "1m", 10)
+        assert server.limits[0] < 10
+        assert klines[-1]["timestamp"] == server.now_ns
+        assert len(client.cache.get(("klines", "binance", "BTCUSDT", "1m")).value) == 21
+
+    asyncio.run(scenario())
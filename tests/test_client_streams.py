@@ -0,0 +1,26 @@
+import asyncio
+import pytest
+from client.client_side import ClientSide, normalize_interval
+
+
+@pytest.mark.parametrize("interval, expected", [
+    ("1m", "1m"), ("60m", "1h"), ("15min", "15m"), ("1440m", "1d"), ("7d", "1w"), ("90s", "90s"), ("1M", "1M"),
+])
+def test_normalize_interval_matches_server_notation(interval, expected):
+    assert normalize_interval(interval) == expected
+
+
+def test_klines_stream_receives_normalized_server_messages():
+    async def scenario():
+        client = ClientSide()
+        stream = client.klines("Binance", "btcusdt", "60m")
+        next_kline = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        assert client.kline_subscriptions == {("binance", "BTCUSDT", "1h")}
+        # Message tel qu'émis par le serveur
+        client._push_event({"type": "kline", "exchange": "binance", "symbol": "BTCUSDT", "interval": "1h", "timestamp": 0, "closed": False})
+        kline = await asyncio.wait_for(next_kline, 1)
+        assert kline["interval"] == "1h"
+        await stream.aclose()
+
+    asyncio.run(scenario())
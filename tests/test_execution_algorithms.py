@@ -0,0 +1,60 @@
+import pytest
+from server.services.execution_algorithms import TWAPOrder
+from server.services.instruments import Instrument, instrument_table
+
+
+class FakeConnection:
+    def __init__(self, order_book):
+        self.order_book = order_book
+
+
+class FakeSubscriptionManager:
+    def __init__(self, books):
+        self.exchange_connectors = {exchange: FakeConnection(book) for exchange, book in books.items()}
+
+
+@pytest.fixture
+def btc_lot():
+    """BTCUSDT sur un exchange de test : lot et quantité minimale de 0.001"""
+    instrument_table.add("testex", [Instrument("testex", "BTC", "USDT", "BTCUSDT", lot_size=0.001, min_quantity=0.001)])
+    yield
+    instrument_table.by_symbol.pop("testex", None)
+    instrument_table.by_native.pop("testex", None)
+
+
+def make_twap(quantity, slices, asks):
+    manager = FakeSubscriptionManager({"testex": {"BTCUSDT": {"bids": [], "asks": asks}}})
+    return TWAPOrder(manager, "testex", "BTCUSDT", "buy", quantity, slices=slices, duration_seconds=slices)
+
+
+def test_last_lot_is_executed(btc_lot):
+    # Régression : l'ordre était déclaré exécuté avec un lot restant
+    order = make_twap(0.002, 2, [[100.0, 1.0]])
+    order.execute(0.0)
+    assert order.status == "active"
+    assert order.executed_quantity == pytest.approx(0.001)
+    order.execute(1.0)
+    assert order.status == "completed"
+    assert order.executed_quantity == pytest.approx(0.002)
+
+
+def test_completed_when_remainder_below_lot(btc_lot):
+    order = make_twap(0.0015, 1, [[100.0, 1.0]])
+    executions = order.execute(0.0)
+    assert [execution["quantity"] for execution in executions] == [pytest.approx(0.001)]
+    assert order.status == "completed"
+
+
+def test_fill_rounded_down_to_lot(btc_lot):
+    order = make_twap(1.0, 1, [[100.0, 0.0025]])
+    executions = order.execute(0.0)
+    assert executions[0]["quantity"] == pytest.approx(0.002)
+    assert order.status == "active"
+
+
+def test_price_averaged_over_rounded_quantity(btc_lot):
+    # 0.0025 parcourus (0.0015 à 100, 0.001 à 200), 0.002 exécutés : 0.0015 à 100 et 0.0005 à 200
+    order = make_twap(0.0025, 1, [[100.0, 0.0015], [200.0, 1.0]])
+    executions = order.execute(0.0)
+    assert executions[0]["quantity"] == pytest.approx(0.002)
+    assert executions[0]["price"] == pytest.approx(125.0)
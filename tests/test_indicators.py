@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from server.services import indicators
+from server.services.kline_store import KlineStore
+
+
+def make_bars(count: int, interval_seconds: int, start: int = 1_700_000_000 + 3 * 3600):
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    return {
+        "timestamp": (start + interval_seconds * np.arange(count)) * 1_000_000_000,
+        "open": close,
+        "high": close + rng.uniform(0, 2, count),
+        "low": close - rng.uniform(0, 2, count),
+        "close": close,
+        "volume": rng.uniform(1, 10, count),
+    }
+
+
+def window(bars, start, stop):
+    return {name: values[start:stop].copy() for name, values in bars.items()}
+
+
+@pytest.mark.parametrize("interval_seconds", [300, 3600, 7 * 3600])
+def test_incremental_vwap_matches_full_recompute(interval_seconds):
+    bars = make_bars(2000, interval_seconds)
+    limit = 100
+    warmup = indicators.warmup("vwap", None, interval_seconds)
+    store = KlineStore()
+    key = ("binance", "BTCUSDT", "x")
+    # Deux requêtes successives, la seconde reprend les valeurs en cache de la première
+    for stop in (1900, 1950):
+        columns = store.compute_indicators(key, window(bars, stop - limit - warmup, stop), [("vwap", None)])
+        expected = indicators.vwap(window(bars, 0, stop))[-limit:]
+        np.testing.assert_allclose(columns["vwap"][-limit:], expected)
+
+
+def test_vwap_warmup_reaches_start_of_day():
+    assert indicators.warmup("vwap", None, 300) == 287
+    assert indicators.warmup("vwap", None, 7 * 3600) == 3
+    assert indicators.warmup("vwap", None, 86_400) == 0
+    assert indicators.warmup("vwap", None, None) == 0
@@ -0,0 +1,56 @@
+import pytest
+from server.services.instruments import Instrument, InstrumentTable, parse_kraken_asset_pairs
+
+KRAKEN_ASSET_PAIRS = {
+    "error": [],
+    "result": {
+        "XXBTZUSD": {"altname": "XBTUSD", "wsname": "XBT/USD", "pair_decimals": 1, "lot_decimals": 8, "ordermin": "0.0001"},
+        "XBTUSDT": {"altname": "XBTUSDT", "wsname": "XBT/USDT", "pair_decimals": 1, "lot_decimals": 8, "ordermin": "0.0001"},
+        "XBTUSDC": {"altname": "XBTUSDC", "wsname": "XBT/USDC", "pair_decimals": 2, "lot_decimals": 8, "ordermin": "0.0001"},
+        "USDCUSD": {"altname": "USDCUSD", "wsname": "USDC/USD", "pair_decimals": 4, "lot_decimals": 2, "ordermin": "5"},
+        "XXBTZUSD.d": {"altname": "XBTUSD.d"},
+    },
+}
+
+
+@pytest.fixture
+def kraken():
+    table = InstrumentTable()
+    table.add("kraken", parse_kraken_asset_pairs(KRAKEN_ASSET_PAIRS))
+    return table
+
+
+@pytest.mark.parametrize("symbol, native, ws_name", [
+    ("BTCUSD", "XBTUSD", "XBT/USD"),
+    ("BTCUSDT", "XBTUSDT", "XBT/USDT"),
+    ("BTCUSDC", "XBTUSDC", "XBT/USDC"),
+    ("USDCUSD", "USDCUSD", "USDC/USD"),
+])
+def test_kraken_names_map_both_ways(kraken, symbol, native, ws_name):
+    assert kraken.to_native("kraken", symbol) == native
+    assert kraken.to_native("kraken", symbol, ws=True) == ws_name
+    assert kraken.to_symbol("kraken", native) == symbol
+    assert kraken.to_symbol("kraken", ws_name) == symbol
+
+
+def test_dark_pool_pairs_are_ignored(kraken):
+    assert sorted(kraken.symbols("kraken")) == ["BTCUSD", "BTCUSDC", "BTCUSDT", "USDCUSD"]
+
+
+@pytest.mark.parametrize("quantity, rounded", [
+    (12.349, 12.34),
+    (5.0, 5.0),
+    (4.99, 0.0),
+])
+def test_quantity_rounded_down_to_lot(kraken, quantity, rounded):
+    # USDCUSD : lot de 0.01, quantité minimale 5
+    assert kraken.round_quantity("kraken", "USDCUSD", quantity) == pytest.approx(rounded)
+
+
+def test_lot_rounding_absorbs_float_error():
+    # 0.3 / 0.1 = 2.9999999999999996 ne doit pas perdre un lot
+    assert Instrument("kraken", "ETH", "EUR", "ETHEUR", lot_size=0.1).round_quantity(0.3) == 0.3
+
+
+def test_unknown_symbol_quantity_unchanged(kraken):
+    assert kraken.round_quantity("kraken", "ETHEUR", 0.123456789) == 0.123456789
@@ -0,0 +1,27 @@
+import numpy as np
+from server.services.kline_store import KlineStore
+
+
+def bars(*timestamps):
+    return {
+        "timestamp": np.array(timestamps, dtype=np.int64),
+        **{name: np.ones(len(timestamps)) for name in ("open", "high", "low", "close", "volume")},
+    }
+
+
+def test_least_recently_used_series_evicted():
+    store = KlineStore(max_series=2)
+    store.merge(("binance", "BTCUSDT", 60), bars(0))
+    store.merge(("binance", "ETHUSDT", 60), bars(0))
+    # BTCUSDT redevient la plus récente
+    store.merge(("binance", "BTCUSDT", 60), bars(60))
+    store.merge(("kraken", "BTCUSDT", 60), bars(0))
+    assert list(store.series) == [("binance", "BTCUSDT", 60), ("kraken", "BTCUSDT", 60)]
+
+
+def test_indicator_cache_bounded():
+    store = KlineStore(max_indicators=3)
+    columns = bars(0, 60, 120)
+    for window in range(1, 6):
+        store.compute_indicators(("binance", "BTCUSDT", "1m"), dict(columns), [("sma", window)])
+    assert [key[-1] for key in store.indicator_cache] == [3, 4, 5]
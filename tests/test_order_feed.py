@@ -0,0 +1,44 @@
+import pytest
+
+from server.services.order_registry import OrderRegistry, SharedOrderFeed
+from server.services.shared_store import SharedStateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStateStore(str(tmp_path / "shared.db"))
+
+
+def status(owner, state):
+    return {"owner": owner, "symbol": "BTCUSDT", "status": state, "created_at": 1.0}
+
+
+def test_feed_relays_each_remote_update_once(store):
+    feed = SharedOrderFeed(store, OrderRegistry())
+    received = []
+    feed.listeners.append(lambda order_id, order: received.append((order_id, order["status"])))
+    feed.since = 0.0
+
+    store.save_order("remote", status("alice", "active"))
+    feed.poll()
+    # Relu dans la marge de recouvrement : pas de doublon
+    feed.poll()
+    store.save_order("remote", status("alice", "completed"))
+    feed.poll()
+
+    assert received == [("remote", "active"), ("remote", "completed")]
+
+
+def test_feed_skips_orders_of_this_worker(store):
+    registry = OrderRegistry()
+    registry.orders["local"] = object()
+    feed = SharedOrderFeed(store, registry)
+    received = []
+    feed.listeners.append(lambda order_id, order: received.append(order_id))
+    feed.since = 0.0
+
+    store.save_order("local", status("alice", "active"))
+    store.save_order("remote", status("bob", "active"))
+    feed.poll()
+
+    assert received == ["remote"]
@@ -0,0 +1,52 @@
+from server.services.order_registry import OrderRegistry
+
+
+class FakeOrder:
+    def __init__(self, owner, symbol, created_at):
+        self.owner = owner
+        self.symbol = symbol
+        self.created_at = created_at
+        self._status = "active"
+        self.status_listeners = []
+        self.fill_listeners = []
+        self.change_listeners = []
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, status):
+        previous, self._status = self._status, status
+        for listener in self.status_listeners:
+            listener(previous, status)
+
+
+def test_finished_orders_evicted_after_retention():
+    registry = OrderRegistry(retention_seconds=60, max_finished=100)
+    done, active = FakeOrder("alice", "BTCUSDT", 1.0), FakeOrder("alice", "BTCUSDT", 2.0)
+    registry.add("done", done)
+    registry.add("active", active)
+    done.status = "completed"
+
+    registry.evict(now=registry.finished["done"] + 30)
+    assert "done" in registry
+
+    registry.evict(now=registry.finished["done"] + 61)
+    assert "done" not in registry
+    page, _ = registry.query("alice")
+    assert [order_id for order_id, _ in page] == ["active"]
+    assert registry.query("alice", status="completed") == ([], None)
+
+
+def test_oldest_finished_orders_evicted_above_cap():
+    registry = OrderRegistry(retention_seconds=3600, max_finished=2)
+    orders = {f"order_{i}": FakeOrder("bob", "ETHUSDT", float(i)) for i in range(4)}
+    for order_id, order in orders.items():
+        registry.add(order_id, order)
+        order.status = "cancelled"
+
+    registry.evict()
+
+    assert sorted(registry.orders) == ["order_2", "order_3"]
+    assert registry.by_owner["bob"] == [(2.0, "order_2"), (3.0, "order_3")]
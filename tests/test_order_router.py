@@ -0,0 +1,58 @@
+import pytest
+
+from server.connectors.registry import ConnectorRegistry, ExchangeSpec, connector_registry
+from server.services.order_router import route
+
+
+@pytest.fixture
+def venues():
+    """Deux exchanges de test : "cheap" sans frais, "dear" à 1% de frais taker"""
+    for name, fee in (("cheap", 0.0), ("dear", 0.01)):
+        connector_registry.register(ExchangeSpec(name, "tests:Rest", "tests:WS", taker_fee=fee))
+    yield
+    for name in ("cheap", "dear"):
+        connector_registry.specs.pop(name)
+        connector_registry.taker_fees.pop(name, None)
+
+
+def test_buy_walks_best_price_net_of_fees_first(venues):
+    books = {
+        "dear": {"asks": [[100.0, 1.0]], "bids": []},
+        "cheap": {"asks": [[100.5, 1.0], [102.0, 1.0]], "bids": []},
+    }
+    fills = route(books, "buy", 1.5)
+    # 100.5 sans frais < 100.0 + 1% < 102.0
+    assert fills == [("cheap", 1.0, 100.5), ("dear", 0.5, 100.0)]
+
+
+def test_sell_walks_best_price_net_of_fees_first(venues):
+    books = {
+        "dear": {"bids": [[101.0, 1.0]], "asks": []},
+        "cheap": {"bids": [[100.5, 1.0]], "asks": []},
+    }
+    fills = route(books, "sell", 1.0)
+    assert fills == [("cheap", 1.0, 100.5)]
+
+
+def test_limit_price_applies_to_displayed_price(venues):
+    books = {
+        "dear": {"asks": [[100.0, 1.0], [100.4, 1.0]], "bids": []},
+        "cheap": {"asks": [[100.3, 1.0], [100.6, 1.0]], "bids": []},
+    }
+    fills = dict((venue, (quantity, price)) for venue, quantity, price in route(books, "buy", 5.0, limit_price=100.4))
+    assert fills["cheap"] == (1.0, 100.3)
+    assert fills["dear"][0] == pytest.approx(2.0)
+    assert fills["dear"][1] == pytest.approx(100.2)
+
+
+def test_taker_fee_from_connector_class_or_config(tmp_path):
+    registry = ConnectorRegistry([
+        ExchangeSpec("binance", "server.connectors.binance:BinanceConnector", "server.connectors.binance:BinanceWSConnection"),
+    ])
+    assert registry.taker_fee("binance") == pytest.approx(0.001)
+    assert registry.taker_fee("unknown") == 0.0
+
+    config = tmp_path / "exchanges.ini"
+    config.write_text("[binance]\ntaker_fee = 0.00075\n")
+    registry.load_config(str(config))
+    assert registry.taker_fee("binance") == pytest.approx(0.00075)
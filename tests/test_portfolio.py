@@ -0,0 +1,60 @@
+import pytest
+
+from server.services.portfolio import PortfolioLedger
+from server.services.shared_store import SharedStateStore
+
+
+class FakeOrder:
+    def __init__(self, owner, symbol, side):
+        self.owner = owner
+        self.symbol = symbol
+        self.side = side
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStateStore(str(tmp_path / "shared.db"))
+
+
+def test_workers_share_fills_through_store(store):
+    first, second = PortfolioLedger(store=store), PortfolioLedger(store=store)
+
+    first.on_fill(FakeOrder("alice", "BTCUSDT", "buy"), {"quantity": 2.0, "price": 100.0, "fee": 0.5})
+    second.on_fill(FakeOrder("alice", "BTCUSDT", "sell"), {"quantity": 1.0, "price": 110.0})
+    first.sync()
+    second.sync()
+    first.sync()
+
+    for ledger in (first, second):
+        position, = ledger.get_portfolio("alice")["positions"]
+        assert position["quantity"] == pytest.approx(1.0)
+        assert position["average_price"] == pytest.approx(100.0)
+        assert position["realized_pnl"] == pytest.approx(10.0 - 0.5)
+
+
+def test_new_worker_replays_stored_fills(store):
+    worker = PortfolioLedger(store=store)
+    worker.on_fill(FakeOrder("bob", "ETHUSDT", "buy"), {"quantity": 3.0, "price": 10.0})
+    worker.sync()
+
+    restarted = PortfolioLedger(store=store)
+    restarted.sync()
+
+    position, = restarted.get_portfolio("bob")["positions"]
+    assert position["quantity"] == pytest.approx(3.0)
+    assert position["cash"] == pytest.approx(-30.0)
+
+
+def test_user_version_changes_only_for_own_fills_and_symbols():
+    ledger = PortfolioLedger()
+    ledger.on_fill(FakeOrder("alice", "BTCUSDT", "buy"), {"quantity": 1.0, "price": 100.0})
+    ledger.on_fill(FakeOrder("bob", "ETHUSDT", "buy"), {"quantity": 1.0, "price": 10.0})
+    alice, bob = ledger.user_version("alice"), ledger.user_version("bob")
+
+    ledger.on_order_book("binance", "ETHUSDT", {"bids": [[10.0, 1.0]], "asks": [[10.2, 1.0]]})
+    assert ledger.user_version("alice") == alice
+    assert ledger.user_version("bob") != bob
+
+    ledger.on_fill(FakeOrder("alice", "BTCUSDT", "sell"), {"quantity": 1.0, "price": 101.0})
+    assert ledger.user_version("alice") != alice
+    assert ledger.user_version("unknown") == 0
@@ -0,0 +1,32 @@
+import asyncio
+from server.services.rate_limiter import (
+    TokenBucket, RequestCoalescer, use_priority, PRIORITY_BULK, PRIORITY_TRADING
+)
+
+
+def test_joining_caller_raises_priority_of_coalesced_request():
+    async def scenario():
+        bucket = TokenBucket(capacity=1, refill_per_second=20)
+        bucket.tokens = 0
+        coalescer = RequestCoalescer()
+        served = []
+
+        async def request(name):
+            await bucket.acquire(1)
+            served.append(name)
+            return name
+
+        with use_priority(PRIORITY_BULK):
+            bulk = asyncio.create_task(coalescer.run("klines", lambda: request("bulk")))
+        normal = asyncio.create_task(request("normal"))
+        await asyncio.sleep(0.01)
+        # Un ordre rejoint le téléchargement en masse en attente
+        with use_priority(PRIORITY_TRADING):
+            trading = asyncio.create_task(coalescer.run("klines", lambda: request("duplicate")))
+
+        results = await asyncio.gather(bulk, normal, trading)
+        assert results == ["bulk", "normal", "bulk"]
+        assert served == ["bulk", "normal"]
+        assert coalescer.in_flight == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,31 @@
+import asyncio
+import concurrent.futures
+import pytest
+from client.sync_client import SyncClient
+
+
+async def slow_events(delay: float, count: int = 2):
+    for i in range(count):
+        await asyncio.sleep(delay)
+        yield i
+
+
+@pytest.fixture
+def client():
+    client = SyncClient(timeout=0.5)
+    yield client
+    client.close()
+
+
+def test_iteration_waits_longer_than_timeout(client):
+    # Aucun évènement pendant plus de timeout : l'itération attend
+    assert list(client._iterate(slow_events(1.0))) == [0, 1]
+
+
+def test_generator_closed_after_interrupted_step(client):
+    generator = slow_events(5.0)
+    with pytest.raises(concurrent.futures.TimeoutError):
+        client._run(generator.__anext__(), timeout=0.1)
+    # Le __anext__ en cours est annulé avant aclose()
+    client._run(client._aclose(generator))
+    assert generator.ag_frame is None
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from server.services.ticker import RingStats
+
+
+@pytest.mark.parametrize("count", [1, 2, 7, 50, 123])
+def test_ring_stats_match_numpy(count):
+    rng = np.random.default_rng(count)
+    values = 30_000 + rng.normal(0, 5, count)
+    stats = RingStats(50)
+    for value in values:
+        stats.push(float(value))
+
+    window = values[-50:]
+    assert stats.mean() == pytest.approx(window.mean(), rel=1e-12)
+    if len(window) < 2:
+        assert stats.std() is None
+    else:
+        assert stats.std() == pytest.approx(window.std(ddof=1), rel=1e-6)
+
+
+def test_empty_ring_stats():
+    stats = RingStats(10)
+    assert stats.mean() is None
+    assert stats.std() is None